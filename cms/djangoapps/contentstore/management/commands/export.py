@@ -4,13 +4,16 @@ Script for exporting courseware from Mongo to a tar.gz file
 import os
 
 from django.core.management.base import BaseCommand, CommandError
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import ASSET_EXPORT_WORKERS, export_course_to_xml
 from xmodule.modulestore.django import modulestore
 from opaque_keys.edx.keys import CourseKey
 from xmodule.contentstore.django import contentstore
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
+# Suffix of the file, next to the exported directory, recording the static assets written by incremental exports.
+ASSET_MANIFEST_SUFFIX = '.assets_manifest.json'
+
 
 class Command(BaseCommand):
     """
@@ -21,6 +24,17 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('course_id')
         parser.add_argument('output_path')
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only write the static assets which changed since the last incremental export to output_path'
+        )
+        parser.add_argument(
+            '--asset-export-workers',
+            type=int,
+            default=ASSET_EXPORT_WORKERS,
+            help='Number of static asset files written concurrently'
+        )
 
     def handle(self, *args, **options):
         """Execute the command"""
@@ -45,4 +59,12 @@ class Command(BaseCommand):
         root_dir = os.path.dirname(output_path)
         course_dir = os.path.splitext(os.path.basename(output_path))[0]
 
-        export_course_to_xml(modulestore(), contentstore(), course_key, root_dir, course_dir)
+        asset_manifest_file = None
+        if options['incremental']:
+            # Kept next to the exported directory, so that it isn't part of the export.
+            asset_manifest_file = os.path.abspath(output_path) + ASSET_MANIFEST_SUFFIX
+
+        export_course_to_xml(
+            modulestore(), contentstore(), course_key, root_dir, course_dir,
+            asset_export_workers=options['asset_export_workers'], asset_manifest_file=asset_manifest_file,
+        )
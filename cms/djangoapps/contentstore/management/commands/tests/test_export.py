@@ -1,6 +1,7 @@
 """
 Tests for exporting courseware to the desired path
 """
+import os
 import unittest
 import shutil
 import ddt
@@ -12,6 +13,8 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.django import modulestore
 
+from contentstore.management.commands.export import ASSET_MANIFEST_SUFFIX
+
 
 class TestArgParsingCourseExport(unittest.TestCase):
     """
@@ -65,6 +68,20 @@ class TestCourseExport(ModuleStoreTestCase):
         for output_dir in [self.temp_dir_1, self.temp_dir_2]:
             call_command('export', course_id, output_dir)
 
+    def test_export_course_incremental(self):
+        """
+        Test that an incremental export keeps its manifest outside of the exported directory
+        """
+        course = CourseFactory.create()
+        manifest_file = os.path.abspath(self.temp_dir_1) + ASSET_MANIFEST_SUFFIX
+        self.addCleanup(os.remove, manifest_file)
+
+        call_command('export', unicode(course.id), self.temp_dir_1, incremental=True, asset_export_workers=2)
+
+        self.assertTrue(os.path.isfile(manifest_file))
+        for __, __, filenames in os.walk(self.temp_dir_1):
+            self.assertNotIn(os.path.basename(manifest_file), filenames)
+
     def test_course_key_not_found(self):
         """
         Test export command with a valid course key that doesn't exist
@@ -278,6 +278,13 @@ for database_name in DATABASES:
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
 CONTENTSTORE = AUTH_TOKENS['CONTENTSTORE']
 DOC_STORE_CONFIG = AUTH_TOKENS['DOC_STORE_CONFIG']
+
+ASSET_DISK_CACHE_DIR = ENV_TOKENS.get('ASSET_DISK_CACHE_DIR', ASSET_DISK_CACHE_DIR)
+ASSET_DISK_CACHE_MAX_BYTES = ENV_TOKENS.get('ASSET_DISK_CACHE_MAX_BYTES', ASSET_DISK_CACHE_MAX_BYTES)
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES', COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES
+)
+
 # Datadog for events!
 DATADOG = AUTH_TOKENS.get("DATADOG", {})
 DATADOG.update(ENV_TOKENS.get("DATADOG", {}))
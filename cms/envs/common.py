@@ -186,6 +186,11 @@ FEATURES = {
 
 ENABLE_JASMINE = False
 
+# Number of keep-alive connections to the comments service kept by each process,
+# which Studio uses to create the comments service users of new accounts.
+# Note: Ensure it has a matching value in lms/envs/common.py
+COMMENTS_SERVICE_POOL_SIZE = 10
+
 ############################# SOCIAL MEDIA SHARING #############################
 SOCIAL_SHARING_SETTINGS = {
     # Note: Ensure 'CUSTOM_COURSE_URLS' has a matching value in lms/envs/common.py
@@ -399,6 +404,20 @@ MODULESTORE = {
     }
 }
 
+# Directory on the local disk in which course assets too large for the cache
+# are kept, so that they are not streamed from the contentstore on every
+# request.  None disables the disk cache.
+ASSET_DISK_CACHE_DIR = None
+# Maximum total size, in bytes, of the assets kept in ASSET_DISK_CACHE_DIR,
+# beyond which the least recently used assets are removed.
+ASSET_DISK_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Maximum total size, in bytes, of the split modulestore course structures
+# kept unpickled in each process in front of the 'course_structure_cache', as
+# estimated from their pickled size.  The structure of a course with 20,000
+# blocks takes about 26MB.  0 disables the in-process cache.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
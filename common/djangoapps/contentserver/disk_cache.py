@@ -0,0 +1,223 @@
+"""
+A bounded cache of course assets on the local disk.
+
+Assets too large to be kept in the cache are spooled from the
+contentstore to a file on the local disk the first time they are
+requested, and served from that file afterwards.  Files are named after
+the asset location and a digest of its content, so that a re-uploaded
+asset never serves a stale copy, and the least recently used files are
+removed whenever the total size exceeds the configured bound.
+"""
+import errno
+from hashlib import sha1
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+
+from xmodule.contentstore.content import StaticContent, STREAM_DATA_CHUNK_SIZE
+
+# Fraction of its max_bytes that a cache is brought down to when evicting,
+# so that the directory is walked at most once per this many bytes added.
+EVICTION_TARGET = 0.9
+
+# Total size of the files of each cache directory, as of the last time this
+# process walked it, plus the size of the files it added since.  Files added
+# by other processes are only counted once the directory is walked again, so
+# a cache can exceed its bound by as much as they added in the meantime.
+_DIRECTORY_SIZES = {}
+_DIRECTORY_SIZES_LOCK = threading.Lock()
+
+
+def get_asset_disk_cache():
+    """
+    Returns the AssetDiskCache configured by the ASSET_DISK_CACHE_DIR and
+    ASSET_DISK_CACHE_MAX_BYTES settings, or None if it is disabled.
+    """
+    directory = getattr(settings, 'ASSET_DISK_CACHE_DIR', None)
+    if not directory:
+        return None
+    return AssetDiskCache(directory, settings.ASSET_DISK_CACHE_MAX_BYTES)
+
+
+def content_digest(content):
+    """
+    Returns a digest identifying the data of the given content: the md5
+    recorded by the contentstore if there is one, otherwise a digest of
+    its upload time and length.
+    """
+    digest = getattr(content, 'content_digest', None)
+    if digest:
+        return digest
+    return sha1(u'{}/{}'.format(content.last_modified_at, content.length)).hexdigest()
+
+
+class DiskCachedContent(StaticContent):
+    """
+    StaticContent whose data is kept in a file of an AssetDiskCache.
+
+    Only the metadata and the name of the file are kept, so instances can
+    be kept in the cache and shared among hosts, each of which needs to
+    check that the file exists on its own disk before streaming the data.
+    """
+    def __init__(self, content, path):
+        super(DiskCachedContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+        )
+        self.path = path
+
+    def exists(self):
+        """
+        Returns whether the file holding the data exists, marking it as
+        recently used.  It does not, for instance, once it was evicted or
+        if it was never spooled on this host.
+        """
+        try:
+            os.utime(self.path, None)
+        except OSError as exception:
+            if exception.errno != errno.ENOENT:
+                raise
+            return False
+        return True
+
+    def open(self):
+        """
+        Returns a new file object of the data, which the caller closes.
+        Raises IOError if the file no longer exists.
+        """
+        return open(self.path, 'rb')
+
+    @property
+    def data(self):
+        with self.open() as data_file:
+            return data_file.read()
+
+    def stream_data(self):
+        with self.open() as data_file:
+            while True:
+                chunk = data_file.read(STREAM_DATA_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        with self.open() as data_file:
+            data_file.seek(first_byte)
+            remaining = last_byte - first_byte + 1
+            while remaining > 0:
+                chunk = data_file.read(min(remaining, STREAM_DATA_CHUNK_SIZE))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class AssetDiskCache(object):
+    """
+    A directory of asset files bounded in total size, from which the
+    least recently used files are evicted first.
+    """
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, location, digest):
+        """
+        Returns the path of the file for the given asset location and
+        content digest.
+        """
+        key = sha1(u'{}/{}'.format(location, digest).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, content):
+        """
+        Returns a DiskCachedContent for the given content if its data is
+        already in the cache, otherwise None.  Only the metadata of the
+        given content is used.
+        """
+        cached_content = DiskCachedContent(content, self.path(content.location, content_digest(content)))
+        return cached_content if cached_content.exists() else None
+
+    def add(self, content):
+        """
+        Returns a DiskCachedContent for the given content,
+        spooling its data to the cache unless it is there already.
+        Returns None, without reading the data, if the content is too
+        large to fit in the cache.
+        """
+        if content.length is None or content.length > self.max_bytes:
+            return None
+
+        cached_content = self.get(content)
+        if cached_content is not None:
+            return cached_content
+
+        path = self.path(content.location, content_digest(content))
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory)
+        except OSError as exception:
+            if exception.errno != errno.EEXIST:
+                raise
+
+        # Write to a temporary file and rename it once complete, so that
+        # concurrent requests never read a partially written file.
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temp_file:
+                for chunk in content.stream_data():
+                    temp_file.write(chunk)
+            os.rename(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        # Only walk the directory to evict files once the size counted by
+        # this process exceeds the bound, or if it was never counted.
+        with _DIRECTORY_SIZES_LOCK:
+            total_size = _DIRECTORY_SIZES.get(self.directory)
+            if total_size is not None:
+                total_size = _DIRECTORY_SIZES[self.directory] = total_size + content.length
+        if total_size is None or total_size > self.max_bytes:
+            self.evict()
+        return DiskCachedContent(content, path)
+
+    def evict(self):
+        """
+        Removes the least recently used files until the total size of
+        the cache is within EVICTION_TARGET of max_bytes.
+        """
+        entries = []
+        total_size = 0
+        for dirpath, __, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size > self.max_bytes:
+            entries.sort()
+            for __, size, path in entries:
+                if total_size <= self.max_bytes * EVICTION_TARGET:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Already removed by another process.
+                    pass
+                total_size -= size
+
+        with _DIRECTORY_SIZES_LOCK:
+            _DIRECTORY_SIZES[self.directory] = total_size
@@ -3,9 +3,10 @@ Middleware to serve assets.
 """
 
 import logging
+from uuid import uuid4
 
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden, StreamingHttpResponse
 )
 from student.models import CourseEnrollment
 
@@ -18,11 +19,25 @@ from cache_toolbox.core import get_cached_content, set_cached_content
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
+from .disk_cache import DiskCachedContent, get_asset_disk_cache
+
 # TODO: Soon as we have a reasonable way to serialize/deserialize AssetKeys, we need
 # to change this file so instead of using course_id_partial, we're just using asset keys
 
 log = logging.getLogger(__name__)
 
+# Assets smaller than this many bytes are kept in the cache in full;
+# larger ones can only be kept in the disk cache.
+MAX_CACHED_CONTENT_LENGTH = 1048576
+
+# Requests for more byte ranges than this, once overlapping and adjacent
+# ranges are merged, get the full content rather than a multipart response.
+MAX_BYTE_RANGES = 10
+
+# Requests for several byte ranges which together cover more than this
+# fraction of the content also get the full content.
+MAX_BYTE_RANGES_COVERAGE = 0.9
+
 
 class StaticContentServer(object):
     def process_request(self, request):
@@ -43,6 +58,9 @@ class StaticContentServer(object):
 
             # first look in our cache so we don't have to round-trip to the DB
             content = get_cached_content(loc)
+            if isinstance(content, DiskCachedContent) and not content.exists():
+                # only the metadata is in the cache, and the data is not on this host's disk
+                content = None
             if content is None:
                 # nope, not in cache, let's fetch from DB
                 try:
@@ -55,10 +73,14 @@ class StaticContentServer(object):
                 # since we fetched it from DB, let's cache it going forward, but only if it's < 1MB
                 # this is because I haven't been able to find a means to stream data out of memcached
                 if content.length is not None:
-                    if content.length < 1048576:
+                    if content.length < MAX_CACHED_CONTENT_LENGTH:
                         # since we've queried as a stream, let's read in the stream into memory to set in cache
                         content = content.copy_to_in_mem()
                         set_cached_content(content)
+                    else:
+                        # larger assets are spooled to the local disk, if enabled, and only their
+                        # metadata is cached
+                        content = self._add_to_disk_cache(content)
             else:
                 # NOP here, but we may wish to add a "cache-hit" counter in the future
                 pass
@@ -96,10 +118,6 @@ class StaticContentServer(object):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # Data from cache (StaticContent) has no easy byte management, so we use the DB instead (StaticContentStream)
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -112,42 +130,131 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
-                        log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                        )
                     else:
-                        first, last = ranges[0]
+                        satisfiable_ranges = merge_byte_ranges([
+                            (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                        ])
 
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                        if not satisfiable_ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                        elif len(satisfiable_ranges) == 1:
+                            first, last = satisfiable_ranges[0]
+                            response = StreamingHttpResponse(content.stream_data_in_range(first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
+                            response['Content-Type'] = content.content_type
                             response.status_code = 206  # Partial Content
-                        else:
+                        elif (
+                            len(satisfiable_ranges) > MAX_BYTE_RANGES or
+                            sum(last - first + 1 for first, last in satisfiable_ranges) >
+                            content.length * MAX_BYTE_RANGES_COVERAGE
+                        ):
+                            # Guard against amplification attacks with many (overlapping) ranges
+                            # by responding with the full content instead (CVE-2011-3192).
                             log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                                u"Too many ranges in Range header: %s for content: %s", header_value, unicode(loc)
                             )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                        else:
+                            # Content for multiple ranges is sent as a multipart message.
+                            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                            response = multipart_byteranges_response(content, satisfiable_ranges)
+                            response.status_code = 206  # Partial Content
 
-            # If Range header is absent or syntactically invalid return a full content response.
+            # If Range header is absent, syntactically invalid or asks for too many ranges
+            # return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, DiskCachedContent):
+                    # lets the server send the file directly, e.g. with sendfile,
+                    # and closes it once sent
+                    response = FileResponse(content.open())
+                else:
+                    response = HttpResponse(content.stream_data())
                 response['Content-Length'] = content.length
+                response['Content-Type'] = content.content_type
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
             response['Last-Modified'] = last_modified_at_str
 
             return response
 
+    def _add_to_disk_cache(self, content):
+        """
+        Spools the given content, fetched from the DB as a stream, to the
+        local disk cache and caches its metadata.  Returns the content to
+        serve: the DiskCachedContent, or the given content if the disk
+        cache is disabled or the content does not fit in it.
+        """
+        disk_cache = get_asset_disk_cache()
+        if disk_cache is None:
+            return content
+        cached_content = disk_cache.add(content)
+        if cached_content is None:
+            return content
+        content.close()
+        set_cached_content(cached_content)
+        return cached_content
+
+
+def merge_byte_ranges(ranges):
+    """
+    Returns the given (first, last) byte ranges sorted, with any
+    overlapping or adjacent ranges merged into one.
+    """
+    merged_ranges = []
+    for first, last in sorted(ranges):
+        if merged_ranges and first <= merged_ranges[-1][1] + 1:
+            merged_ranges[-1] = (merged_ranges[-1][0], max(merged_ranges[-1][1], last))
+        else:
+            merged_ranges.append((first, last))
+    return merged_ranges
+
+
+def multipart_byteranges_response(content, ranges):
+    """
+    Returns a streaming multipart/byteranges response with a part for
+    each of the given (first, last) byte ranges of the content.
+    """
+    boundary = uuid4().hex
+    part_headers = [
+        (
+            '--{boundary}\r\n'
+            'Content-Type: {content_type}\r\n'
+            'Content-Range: bytes {first}-{last}/{length}\r\n'
+            '\r\n'
+        ).format(
+            boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+        )
+        for first, last in ranges
+    ]
+    closing_boundary = '--{boundary}--\r\n'.format(boundary=boundary)
+
+    def stream_parts():
+        """
+        Streams each part's headers followed by its range of data.
+        """
+        for part_header, (first, last) in zip(part_headers, ranges):
+            yield part_header
+            for chunk in content.stream_data_in_range(first, last):
+                yield chunk
+            yield '\r\n'
+        yield closing_boundary
+
+    response = StreamingHttpResponse(stream_parts())
+    response['Content-Type'] = 'multipart/byteranges; boundary={}'.format(boundary)
+    response['Content-Length'] = str(
+        sum(
+            len(part_header) + (last - first + 1) + len('\r\n')
+            for part_header, (first, last) in zip(part_headers, ranges)
+        ) + len(closing_boundary)
+    )
+    return response
+
 
 def parse_range_header(header_value, content_length):
     """
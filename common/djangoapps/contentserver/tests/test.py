@@ -4,20 +4,27 @@ Tests for StaticContentServer
 import copy
 import ddt
 import logging
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
 
+from mock import patch
+
 from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
 
+from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
-from contentserver.middleware import parse_range_header
+from cache_toolbox.core import del_cached_content
+from contentserver.disk_cache import DiskCachedContent
+from contentserver.middleware import MAX_BYTE_RANGES, merge_byte_ranges, parse_range_header
 from student.models import CourseEnrollment
 
 log = logging.getLogger(__name__)
@@ -146,7 +153,7 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart message with a part per range.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
@@ -154,6 +161,61 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
             first=first_byte, last=last_byte)
         )
 
+        self.assertEqual(resp.status_code, 206)
+        self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        body = ''.join(resp.streaming_content)
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        for first, last in [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]:
+            self.assertIn(
+                'Content-Range: bytes {first}-{last}/{length}'.format(
+                    first=first, last=last, length=self.length_unlocked
+                ),
+                body
+            )
+
+    def test_range_request_multiple_ranges_one_satisfiable(self):
+        """
+        Test that unsatisfiable ranges among multiple ranges are ignored.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, {first}-'.format(
+            first=self.length_unlocked)
+        )
+
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{length}'.format(length=self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '10')
+
+    def test_range_request_overlapping_ranges(self):
+        """
+        Test that overlapping and adjacent ranges are merged.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=10-19, 0-9, 5-14, 100-109, 105-')
+
+        self.assertEqual(resp.status_code, 206)
+        body = ''.join(resp.streaming_content)
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        self.assertEqual(body.count('Content-Range: '), 2)
+        for first, last in [(0, 19), (100, self.length_unlocked - 1)]:
+            self.assertIn(
+                'Content-Range: bytes {first}-{last}/{length}'.format(
+                    first=first, last=last, length=self.length_unlocked
+                ),
+                body
+            )
+
+    @ddt.data(
+        # too many ranges
+        ', '.join('{}-{}'.format(first, first) for first in range(0, 4 * (MAX_BYTE_RANGES + 1), 4)),
+        # many overlapping ranges covering most of the file
+        ', '.join(['0-99'] * 1000 + ['102-']),
+    )
+    def test_range_request_excessive_ranges(self, byte_ranges):
+        """
+        Test that requests with excessive ranges result in a 200 OK full content response.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=' + byte_ranges)
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
@@ -192,6 +254,96 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
         )
         self.assertEqual(resp.status_code, 416)
 
+    def test_range_request_cached_content(self):
+        """
+        Test that range requests for content from the cache are not fetched from the DB again.
+        """
+        self.client.get(self.url_unlocked)
+        with patch.object(AssetManager, 'find') as mock_find:
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9')
+        self.assertFalse(mock_find.called)
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(''.join(resp.streaming_content), self.contentstore.find(self.unlocked_asset).data[:10])
+
+
+@ddt.ddt
+@override_settings(CONTENTSTORE=TEST_DATA_CONTENTSTORE)
+@patch('contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0)
+class DiskCachedContentTest(ModuleStoreTestCase):
+    """
+    Tests that assets too large for the cache are served from the disk cache.
+    """
+
+    def setUp(self):
+        super(DiskCachedContentTest, self).setUp()
+        self.disk_cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.disk_cache_dir)
+
+        self.client = Client()
+        self.contentstore = contentstore()
+        store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.mongo)  # pylint: disable=protected-access
+        self.course_key = store.make_course_key('edX', 'toy', '2012_Fall')
+        import_course_from_xml(
+            store, self.user.id, TEST_DATA_DIR, ['toy'],
+            static_content_store=self.contentstore, verbose=True
+        )
+
+        self.asset_key = self.course_key.make_asset_key('asset', 'another_static.txt')
+        self.url = unicode(self.asset_key)
+        del_cached_content(self.asset_key)
+        self.addCleanup(del_cached_content, self.asset_key)
+        self.data = self.contentstore.find(self.asset_key).data
+
+    def get(self, **kwargs):
+        """
+        Requests the asset with the disk cache enabled.
+        """
+        with override_settings(ASSET_DISK_CACHE_DIR=self.disk_cache_dir, ASSET_DISK_CACHE_MAX_BYTES=len(self.data)):
+            return self.client.get(self.url, **kwargs)
+
+    def test_served_from_disk(self):
+        resp = self.get()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(''.join(resp.streaming_content), self.data)
+
+        with patch.object(AssetManager, 'find') as mock_find:
+            resp = self.get()
+        self.assertFalse(mock_find.called)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Length'], str(len(self.data)))
+        self.assertEqual(''.join(resp.streaming_content), self.data)
+
+    def test_evicted_from_disk(self):
+        self.get()
+        shutil.rmtree(self.disk_cache_dir)
+
+        resp = self.get()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(''.join(resp.streaming_content), self.data)
+
+    def test_not_modified(self):
+        last_modified = self.get()['Last-Modified']
+        with patch.object(DiskCachedContent, 'open') as mock_open:
+            resp = self.get(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 304)
+        # the file is only opened to send its data
+        self.assertFalse(mock_open.called)
+
+    @ddt.data(
+        ('bytes=0-9', [(0, 9)]),
+        ('bytes=5-9, -3', [(5, 9), (-3, None)]),
+    )
+    @ddt.unpack
+    def test_range_request(self, header_value, expected_ranges):
+        self.get()
+        with patch.object(AssetManager, 'find') as mock_find:
+            resp = self.get(HTTP_RANGE=header_value)
+        self.assertFalse(mock_find.called)
+        self.assertEqual(resp.status_code, 206)
+        body = ''.join(resp.streaming_content)
+        for first, last in expected_ranges:
+            self.assertIn(self.data[first:last + 1 if last is not None else None], body)
+
 
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
@@ -221,6 +373,18 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertEqual(len(ranges), excepted_ranges_length)
         self.assertEqual(ranges, expected_ranges)
 
+    @ddt.data(
+        ([], []),
+        ([(100, 199)], [(100, 199)]),
+        ([(200, 299), (100, 199)], [(100, 299)]),
+        ([(100, 199), (150, 249), (0, 9)], [(0, 9), (100, 249)]),
+        ([(100, 199), (120, 129), (201, 299)], [(100, 199), (201, 299)]),
+        ([(0, 9999)] * 100, [(0, 9999)]),
+    )
+    @ddt.unpack
+    def test_merge_byte_ranges(self, ranges, expected_ranges):
+        self.assertEqual(merge_byte_ranges(ranges), expected_ranges)
+
     @ddt.data(
         ('bytes=one-20', ValueError, 'invalid literal for int()'),
         ('bytes=-one', ValueError, 'invalid literal for int()'),
@@ -0,0 +1,82 @@
+"""
+Tests for the contentserver disk cache.
+"""
+import os
+import pickle
+import shutil
+from StringIO import StringIO
+import tempfile
+import unittest
+
+from mock import patch
+from opaque_keys.edx.locator import AssetLocator, CourseLocator
+from xmodule.contentstore.content import StaticContentStream
+
+from contentserver.disk_cache import AssetDiskCache
+
+
+class AssetDiskCacheTestCase(unittest.TestCase):
+    """
+    Tests for AssetDiskCache.
+    """
+
+    def setUp(self):
+        super(AssetDiskCacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.disk_cache = AssetDiskCache(self.directory, max_bytes=25)
+
+    def make_content(self, name, data, digest='digest'):
+        """
+        Returns a StaticContentStream of the given data.
+        """
+        location = AssetLocator(CourseLocator('org', 'course', 'run'), 'asset', name)
+        return StaticContentStream(
+            location, name, 'text/plain', StringIO(data), length=len(data), content_digest=digest
+        )
+
+    def test_add(self):
+        cached_content = self.disk_cache.add(self.make_content('a', '0123456789'))
+        self.assertEqual(cached_content.data, '0123456789')
+        self.assertEqual(''.join(cached_content.stream_data_in_range(2, 4)), '234')
+
+        self.assertEqual(self.disk_cache.get(self.make_content('a', '')).data, '0123456789')
+        self.assertIsNone(self.disk_cache.get(self.make_content('a', '', digest='other')))
+        self.assertIsNone(self.disk_cache.get(self.make_content('b', '')))
+
+    def test_too_large(self):
+        self.assertIsNone(self.disk_cache.add(self.make_content('a', '0' * 26)))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_least_recently_used_evicted(self):
+        for name in ('a', 'b'):
+            self.disk_cache.add(self.make_content(name, '0123456789'))
+        # make 'b' the least recently used
+        os.utime(self.disk_cache.path(self.make_content('b', '').location, 'digest'), (0, 0))
+
+        self.disk_cache.add(self.make_content('c', '0123456789'))
+
+        self.assertIsNotNone(self.disk_cache.get(self.make_content('a', '')))
+        self.assertIsNone(self.disk_cache.get(self.make_content('b', '')))
+        self.assertIsNotNone(self.disk_cache.get(self.make_content('c', '')))
+
+    def test_evicts_only_once_full(self):
+        # the size of the directory is counted on the first addition...
+        self.disk_cache.add(self.make_content('a', '0123456789'))
+        with patch('contentserver.disk_cache.os.walk', wraps=os.walk) as mock_walk:
+            # ... so it isn't walked again until it exceeds max_bytes
+            self.disk_cache.add(self.make_content('b', '0123456789'))
+            self.assertFalse(mock_walk.called)
+            self.disk_cache.add(self.make_content('c', '0123456789'))
+            self.assertTrue(mock_walk.called)
+
+        self.assertEqual(
+            len([cached for cached in 'abc' if self.disk_cache.get(self.make_content(cached, '')) is not None]), 2
+        )
+
+    def test_pickled(self):
+        cached_content = self.disk_cache.add(self.make_content('a', '0123456789'))
+        unpickled_content = pickle.loads(pickle.dumps(cached_content))
+        self.assertEqual(unpickled_content.path, cached_content.path)
+        self.assertTrue(unpickled_content.exists())
+        self.assertEqual(unpickled_content.data, '0123456789')
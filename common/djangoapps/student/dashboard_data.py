@@ -0,0 +1,236 @@
+"""
+Loading of the data the student dashboard shows about a user's enrollments.
+"""
+from collections import defaultdict
+import logging
+
+from django.conf import settings
+from django.db.models.query import prefetch_related_objects
+from opaque_keys.edx.keys import CourseKey
+
+from bulk_email.models import CourseAuthorization
+from certificates.models import GeneratedCertificate, certificate_status
+from course_modes.models import CourseMode
+from shoppingcart.models import CourseRegistrationCode
+from student.helpers import check_verify_status_by_course
+from student.models import CourseEnrollmentAttribute
+
+
+log = logging.getLogger(__name__)
+
+
+class DashboardData(object):
+    """
+    The data shown on the dashboard about each of a user's enrollments.
+
+    The data for all the enrollments is loaded when the object is created,
+    with a number of database queries which doesn't depend on the number of
+    enrollments: the course modes, certificates, registration code
+    redemptions, verification statuses, credit statuses and bulk email
+    authorizations of all the enrolled courses are each loaded at once.
+    """
+
+    def __init__(self, user, course_enrollments):
+        """
+        Arguments:
+            user (User): The user whose dashboard is shown.
+            course_enrollments (list[CourseEnrollment]): The enrollments shown
+                on the dashboard.
+        """
+        self.user = user
+        course_ids = [enrollment.course_id for enrollment in course_enrollments]
+
+        # The unexpired modes of each course, as returned by `modes_for_course`
+        # with `only_selectable=False`, except that a course with only expired
+        # modes has no modes rather than the default one.
+        __, self.course_modes = CourseMode.all_and_unexpired_modes_for_courses(course_ids)
+
+        self.certificates = {
+            certificate.course_id: certificate
+            for certificate in GeneratedCertificate.objects.filter(user=user, course_id__in=course_ids)
+        }
+
+        self.redeemed_registration_codes = defaultdict(list)
+        redeemed_registration_codes = CourseRegistrationCode.objects.filter(
+            course_id__in=course_ids,
+            registrationcoderedemption__redeemed_by=user
+        ).select_related('invoice_item__invoice')
+        for registration_code in redeemed_registration_codes:
+            self.redeemed_registration_codes[registration_code.course_id].append(registration_code)
+
+        self.email_enabled_course_ids = frozenset()
+        if settings.FEATURES['ENABLE_INSTRUCTOR_EMAIL']:
+            self.email_enabled_course_ids = frozenset(
+                CourseAuthorization.instructor_email_enabled_for_courses(course_ids)
+            )
+
+        self.verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
+        self.credit_statuses = credit_statuses(user, course_enrollments)
+
+        # `CourseEnrollment.refundable` reads the order number of the enrollment
+        # from its attributes.
+        prefetch_related_objects(course_enrollments, ['attributes'])
+
+    def course_modes_dict(self, course_id):
+        """
+        Returns the unexpired modes of the course, keyed by their slugs.
+        """
+        return {mode.slug: mode for mode in self.course_modes[course_id]}
+
+    def selectable_course_modes_dict(self, course_id):
+        """
+        Returns the modes `CourseMode.modes_for_course_dict` would return for
+        the course.
+        """
+        modes = [
+            mode for mode in self.course_modes[course_id]
+            if mode.slug not in CourseMode.CREDIT_MODES
+        ]
+        return {mode.slug: mode for mode in modes or [CourseMode.DEFAULT_MODE]}
+
+    def cert_status(self, course_id):
+        """
+        Returns the status of the user's certificate in the course, as
+        `certificates.models.certificate_status_for_student` would.
+        """
+        return certificate_status(self.certificates.get(course_id), course_modes=self.course_modes[course_id])
+
+    def refundable(self, enrollment):
+        """
+        Returns whether the enrollment is refundable.
+        """
+        return enrollment.refundable(
+            user_already_has_certs_for=frozenset(self.certificates),
+            modes=self.course_modes[enrollment.course_id]
+        )
+
+    def is_paid_course(self, enrollment):
+        """
+        Returns whether the course of the enrollment is paid.
+        """
+        return enrollment.is_paid_course(modes_dict=self.selectable_course_modes_dict(enrollment.course_id))
+
+
+def credit_statuses(user, course_enrollments):
+    """
+    Retrieve the status for credit courses.
+
+    A credit course is a course for which a user can purchased
+    college credit.  The current flow is:
+
+    1. User becomes eligible for credit (submits verifications, passes the course, etc.)
+    2. User purchases credit from a particular credit provider.
+    3. User requests credit from the provider, usually creating an account on the provider's site.
+    4. The credit provider notifies us whether the user's request for credit has been accepted or rejected.
+
+    The dashboard is responsible for communicating the user's state in this flow.
+
+    Arguments:
+        user (User): The currently logged-in user.
+        course_enrollments (list[CourseEnrollment]): List of enrollments for the
+            user.
+
+    Returns: dict
+
+    The returned dictionary has keys that are `CourseKey`s and values that
+    are dictionaries with:
+
+        * eligible (bool): True if the user is eligible for credit in this course.
+        * deadline (datetime): The deadline for purchasing and requesting credit for this course.
+        * purchased (bool): Whether the user has purchased credit for this course.
+        * provider_name (string): The display name of the credit provider.
+        * provider_status_url (string): A URL the user can visit to check on their credit request status.
+        * request_status (string): Either "pending", "approved", or "rejected"
+        * error (bool): If true, an unexpected error occurred when retrieving the credit status,
+            so the user should contact the support team.
+
+    Example:
+    >>> credit_statuses(user, course_enrollments)
+    {
+        CourseKey.from_string("edX/DemoX/Demo_Course"): {
+            "course_key": "edX/DemoX/Demo_Course",
+            "eligible": True,
+            "deadline": 2015-11-23 00:00:00 UTC,
+            "purchased": True,
+            "provider_name": "Hogwarts",
+            "provider_status_url": "http://example.com/status",
+            "request_status": "pending",
+            "error": False
+        }
+    }
+
+    """
+    from openedx.core.djangoapps.credit import api as credit_api
+
+    # Feature flag off
+    if not settings.FEATURES.get("ENABLE_CREDIT_ELIGIBILITY"):
+        return {}
+
+    request_status_by_course = {
+        request["course_key"]: request["status"]
+        for request in credit_api.get_credit_requests_for_user(user.username)
+    }
+
+    credit_enrollments = {
+        enrollment.course_id: enrollment
+        for enrollment in course_enrollments
+        if enrollment.mode == "credit"
+    }
+
+    # When a user purchases credit in a course, the user's enrollment
+    # mode is set to "credit" and an enrollment attribute is set
+    # with the ID of the credit provider.  We retrieve *all* such attributes
+    # here to minimize the number of database queries.
+    purchased_credit_providers = {
+        attribute.enrollment.course_id: attribute.value
+        for attribute in CourseEnrollmentAttribute.objects.filter(
+            namespace="credit",
+            name="provider_id",
+            enrollment__in=credit_enrollments.values()
+        ).select_related("enrollment")
+    }
+
+    provider_info_by_id = {
+        provider["id"]: provider
+        for provider in credit_api.get_credit_providers()
+    }
+
+    statuses = {}
+    for eligibility in credit_api.get_eligibilities_for_user(user.username):
+        course_key = CourseKey.from_string(unicode(eligibility["course_key"]))
+        status = {
+            "course_key": unicode(course_key),
+            "eligible": True,
+            "deadline": eligibility["deadline"],
+            "purchased": course_key in credit_enrollments,
+            "provider_name": None,
+            "provider_status_url": None,
+            "provider_id": None,
+            "request_status": request_status_by_course.get(course_key),
+            "error": False,
+        }
+
+        # If the user has purchased credit, then include information about the credit
+        # provider from which the user purchased credit.
+        # We retrieve the provider's ID from the an "enrollment attribute" set on the user's
+        # enrollment when the user's order for credit is fulfilled by the E-Commerce service.
+        if status["purchased"]:
+            provider_id = purchased_credit_providers.get(course_key)
+            if provider_id is None:
+                status["error"] = True
+                log.error(
+                    u"Could not find credit provider associated with credit enrollment "
+                    u"for user %s in course %s.  The user will not be able to see his or her "
+                    u"credit request status on the student dashboard.  This attribute should "
+                    u"have been set when the user purchased credit in the course.",
+                    user.id, course_key
+                )
+            else:
+                provider_info = provider_info_by_id.get(provider_id, {})
+                status["provider_name"] = provider_info.get("display_name")
+                status["provider_status_url"] = provider_info.get("status_url")
+                status["provider_id"] = provider_id
+
+        statuses[course_key] = status
+
+    return statuses
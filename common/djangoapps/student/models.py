@@ -1341,11 +1341,15 @@ class CourseEnrollment(models.Model):
     def enrollments_for_user(cls, user):
         return CourseEnrollment.objects.filter(user=user, is_active=1)
 
-    def is_paid_course(self):
+    def is_paid_course(self, modes_dict=None):
         """
         Returns True, if course is paid
+
+        Keyword Arguments:
+            modes_dict (dict): If provided, the selectable course modes of the
+                course, used instead of querying the database.
         """
-        paid_course = CourseMode.is_white_label(self.course_id)
+        paid_course = CourseMode.is_white_label(self.course_id, modes_dict=modes_dict)
         if paid_course or CourseMode.is_professional_slug(self.mode):
             return True
 
@@ -1365,10 +1369,17 @@ class CourseEnrollment(models.Model):
         """Changes this `CourseEnrollment` record's mode to `mode`.  Saves immediately."""
         self.update_enrollment(mode=mode)
 
-    def refundable(self):
+    def refundable(self, user_already_has_certs_for=None, modes=None):
         """
         For paid/verified certificates, students may receive a refund if they have
         a verified certificate and the deadline for refunds has not yet passed.
+
+        Keyword Arguments:
+            user_already_has_certs_for (set of `CourseKey`): If provided, the
+                courses in which the user has a certificate, used instead of
+                querying the database.
+            modes (list of `Mode`): If provided, the unexpired modes of the
+                course, used instead of querying the database.
         """
         # In order to support manual refunds past the deadline, set can_refund on this object.
         # On unenrolling, the "UNENROLL_DONE" signal calls CertificateItem.refund_cert_callback(),
@@ -1379,7 +1390,10 @@ class CourseEnrollment(models.Model):
             return True
 
         # If the student has already been given a certificate they should not be refunded
-        if GeneratedCertificate.certificate_for_student(self.user, self.course_id) is not None:
+        if user_already_has_certs_for is None:
+            if GeneratedCertificate.certificate_for_student(self.user, self.course_id) is not None:
+                return False
+        elif self.course_id in user_already_has_certs_for:
             return False
 
         # If it is after the refundable cutoff date they should not be refunded.
@@ -1387,7 +1401,7 @@ class CourseEnrollment(models.Model):
         if refund_cutoff_date and datetime.now(UTC) > refund_cutoff_date:
             return False
 
-        course_mode = CourseMode.mode_for_course(self.course_id, 'verified')
+        course_mode = CourseMode.mode_for_course(self.course_id, 'verified', modes=modes)
         if course_mode is None:
             return False
         else:
@@ -1395,12 +1409,16 @@ class CourseEnrollment(models.Model):
 
     def refund_cutoff_date(self):
         """ Calculate and return the refund window end date. """
-        try:
-            attribute = self.attributes.get(namespace='order', name='order_number')
-        except ObjectDoesNotExist:
+        # The attributes are filtered here rather than in the database, so
+        # that they can be prefetched for many enrollments at once.
+        order_numbers = [
+            attribute.value for attribute in self.attributes.all()
+            if attribute.namespace == 'order' and attribute.name == 'order_number'
+        ]
+        if not order_numbers:
             return None
 
-        order_number = attribute.value
+        order_number = order_numbers[0]
         order = ecommerce_api_client(self.user).orders(order_number).get()
         refund_window_start_date = max(
             datetime.strptime(order['date_placed'], ECOMMERCE_DATE_FORMAT),
@@ -0,0 +1,100 @@
+"""
+Tests of the loading of the student dashboard data.
+"""
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from bulk_email.models import CourseAuthorization
+from certificates.models import CertificateStatuses, certificate_status_for_student
+from certificates.tests.factories import GeneratedCertificateFactory
+from course_modes.models import CourseMode
+from course_modes.tests.factories import CourseModeFactory
+from student.dashboard_data import DashboardData
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory, CourseEnrollmentFactory
+
+
+@patch.dict(settings.FEATURES, {
+    'ENABLE_INSTRUCTOR_EMAIL': True,
+    'REQUIRE_COURSE_EMAIL_AUTH': True,
+    'ENABLE_CREDIT_ELIGIBILITY': True,
+})
+class DashboardDataTest(TestCase):
+    """
+    Tests of DashboardData.
+    """
+    def setUp(self):
+        super(DashboardDataTest, self).setUp()
+        self.user = UserFactory.create()
+        self.num_courses = 0
+
+    def enroll(self, num_courses):
+        """
+        Enroll the user in `num_courses` more courses, with a variety of
+        course modes and certificates, and return all of the user's enrollments.
+        """
+        for __ in range(num_courses):
+            course_id = CourseLocator('edX', 'course{}'.format(self.num_courses), 'run')
+            if self.num_courses % 2:
+                CourseModeFactory.create(course_id=course_id, mode_slug=CourseMode.HONOR, min_price=10)
+                CourseModeFactory.create(course_id=course_id, mode_slug=CourseMode.CREDIT_MODE)
+                CourseAuthorization.objects.create(course_id=course_id, email_enabled=True)
+                GeneratedCertificateFactory.create(
+                    user=self.user,
+                    course_id=course_id,
+                    status=CertificateStatuses.downloadable,
+                    download_url='http://www.example.com/certificate.pdf'
+                )
+            else:
+                CourseModeFactory.create(course_id=course_id, mode_slug=CourseMode.VERIFIED)
+            CourseEnrollmentFactory.create(user=self.user, course_id=course_id, mode=CourseMode.VERIFIED)
+            self.num_courses += 1
+
+        return list(CourseEnrollment.enrollments_for_user(self.user))
+
+    def load(self, enrollments):
+        """
+        Load and use all of the dashboard data about the enrollments.
+        """
+        dashboard_data = DashboardData(self.user, enrollments)
+        for enrollment in enrollments:
+            dashboard_data.course_modes_dict(enrollment.course_id)
+            dashboard_data.cert_status(enrollment.course_id)
+            dashboard_data.refundable(enrollment)
+            dashboard_data.is_paid_course(enrollment)
+        return dashboard_data
+
+    def count_queries(self, enrollments):
+        """
+        Return the number of queries made to load the dashboard data, once
+        any caches have been filled.
+        """
+        self.load(enrollments)
+        with CaptureQueriesContext(connection) as queries:
+            self.load(enrollments)
+        return len(queries)
+
+    def test_number_of_queries_is_fixed(self):
+        num_queries = self.count_queries(self.enroll(1))
+        self.assertEqual(self.count_queries(self.enroll(4)), num_queries)
+
+    def test_data_matches_course_by_course_data(self):
+        enrollments = self.enroll(4)
+        dashboard_data = self.load(enrollments)
+
+        for enrollment in enrollments:
+            course_id = enrollment.course_id
+            self.assertEqual(
+                dashboard_data.cert_status(course_id),
+                certificate_status_for_student(self.user, course_id)
+            )
+            self.assertEqual(dashboard_data.refundable(enrollment), enrollment.refundable())
+            self.assertEqual(dashboard_data.is_paid_course(enrollment), enrollment.is_paid_course())
+            self.assertEqual(
+                course_id in dashboard_data.email_enabled_course_ids,
+                CourseAuthorization.instructor_email_enabled(course_id)
+            )
@@ -50,7 +50,7 @@ from course_modes.models import CourseMode
 from shoppingcart.api import order_history
 from student.models import (
     Registration, UserProfile,
-    PendingEmailChange, CourseEnrollment, CourseEnrollmentAttribute, unique_id_for_user,
+    PendingEmailChange, CourseEnrollment, unique_id_for_user,
     CourseEnrollmentAllowed, UserStanding, LoginFailures,
     create_comments_service_user, PasswordHistory, UserSignupSource,
     DashboardConfiguration, LinkedInAddToProfileConfiguration, ManualEnrollmentAudit, ALLOWEDTOENROLL_TO_ENROLLED)
@@ -65,7 +65,6 @@ from certificates.api import (  # pylint: disable=import-error
 
 from xmodule.modulestore.django import modulestore
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from opaque_keys.edx.locator import CourseLocator
 from xmodule.modulestore import ModuleStoreEnum
@@ -84,7 +83,7 @@ from external_auth.login_and_register import (
     register as external_auth_register
 )
 
-from bulk_email.models import Optout, CourseAuthorization
+from bulk_email.models import Optout
 from lang_pref import LANGUAGE_KEY
 
 import track.views
@@ -107,13 +106,13 @@ from util.password_policy_validators import (
 import third_party_auth
 from third_party_auth import pipeline, provider
 from student.helpers import (
-    check_verify_status_by_course,
     auth_pipeline_urls, get_next_url_for_login_page,
     DISABLE_UNENROLL_CERT_STATES,
 )
 from student.cookies import set_logged_in_cookies, delete_logged_in_cookies
+from student.dashboard_data import DashboardData
 from student.models import anonymous_id_for_user
-from shoppingcart.models import DonationConfiguration, CourseRegistrationCode
+from shoppingcart.models import DonationConfiguration
 
 from embargo import api as embargo_api
 
@@ -183,7 +182,7 @@ def process_survey_link(survey_link, user):
     return survey_link.format(UNIQUE_ID=unique_id_for_user(user))
 
 
-def cert_info(user, course_overview, course_mode):
+def cert_info(user, course_overview, course_mode, cert_status=None):
     """
     Get the certificate info needed to render the dashboard section for the given
     student and course.
@@ -192,6 +191,8 @@ def cert_info(user, course_overview, course_mode):
         user (User): A user.
         course_overview (CourseOverview): A course.
         course_mode (str): The enrollment mode (honor, verified, audit, etc.)
+        cert_status (dict): The status of the user's certificate, as returned
+            by `certificate_status_for_student`.  Loaded if not provided.
 
     Returns:
         dict: Empty dict if certificates are disabled or hidden, or a dictionary with keys:
@@ -206,12 +207,9 @@ def cert_info(user, course_overview, course_mode):
     """
     if not course_overview.may_certify():
         return {}
-    return _cert_info(
-        user,
-        course_overview,
-        certificate_status_for_student(user, course_overview.id),
-        course_mode
-    )
+    if cert_status is None:
+        cert_status = certificate_status_for_student(user, course_overview.id)
+    return _cert_info(user, course_overview, cert_status, course_mode)
 
 
 def reverification_info(statuses):
@@ -539,15 +537,12 @@ def dashboard(request):
     # sort the enrollment pairs by the enrollment date
     course_enrollments.sort(key=lambda x: x.created, reverse=True)
 
-    # Retrieve the course modes for each course
-    enrolled_course_ids = [enrollment.course_id for enrollment in course_enrollments]
-    __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
+    # Load the course modes, certificates, verification and credit statuses, etc.
+    # of all the enrolled courses at once, rather than course by course.
+    dashboard_data = DashboardData(user, course_enrollments)
     course_modes_by_course = {
-        course_id: {
-            mode.slug: mode
-            for mode in modes
-        }
-        for course_id, modes in unexpired_course_modes.iteritems()
+        enrollment.course_id: dashboard_data.course_modes_dict(enrollment.course_id)
+        for enrollment in course_enrollments
     }
 
     # Check to see if the student has recently enrolled in a course.
@@ -609,9 +604,12 @@ def dashboard(request):
     #
     # If a course is not included in this dictionary,
     # there is no verification messaging to display.
-    verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
+    verify_status_by_course = dashboard_data.verify_status_by_course
     cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview, enrollment.mode)
+        enrollment.course_id: cert_info(
+            request.user, enrollment.course_overview, enrollment.mode,
+            cert_status=dashboard_data.cert_status(enrollment.course_id)
+        )
         for enrollment in course_enrollments
     }
 
@@ -620,7 +618,7 @@ def dashboard(request):
         enrollment.course_id for enrollment in course_enrollments if (
             settings.FEATURES['ENABLE_INSTRUCTOR_EMAIL'] and
             modulestore().get_modulestore_type(enrollment.course_id) != ModuleStoreEnum.Type.xml and
-            CourseAuthorization.instructor_email_enabled(enrollment.course_id)
+            enrollment.course_id in dashboard_data.email_enabled_course_ids
         )
     )
 
@@ -634,24 +632,21 @@ def dashboard(request):
 
     show_refund_option_for = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.refundable()
+        if dashboard_data.refundable(enrollment)
     )
 
     block_courses = frozenset(
         enrollment.course_id for enrollment in course_enrollments
         if is_course_blocked(
             request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
+            dashboard_data.redeemed_registration_codes[enrollment.course_id],
             enrollment.course_id
         )
     )
 
     enrolled_courses_either_paid = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.is_paid_course()
+        if dashboard_data.is_paid_course(enrollment)
     )
 
     # If there are *any* denied reverifications that have not been toggled off,
@@ -686,7 +681,7 @@ def dashboard(request):
         'show_courseware_links_for': show_courseware_links_for,
         'all_course_modes': course_mode_info,
         'cert_statuses': cert_statuses,
-        'credit_statuses': _credit_statuses(user, course_enrollments),
+        'credit_statuses': dashboard_data.credit_statuses,
         'show_email_settings_for': show_email_settings_for,
         'reverifications': reverifications,
         'verification_status': verification_status,
@@ -793,131 +788,6 @@ def _update_email_opt_in(request, org):
         preferences_api.update_email_opt_in(request.user, org, email_opt_in_boolean)
 
 
-def _credit_statuses(user, course_enrollments):
-    """
-    Retrieve the status for credit courses.
-
-    A credit course is a course for which a user can purchased
-    college credit.  The current flow is:
-
-    1. User becomes eligible for credit (submits verifications, passes the course, etc.)
-    2. User purchases credit from a particular credit provider.
-    3. User requests credit from the provider, usually creating an account on the provider's site.
-    4. The credit provider notifies us whether the user's request for credit has been accepted or rejected.
-
-    The dashboard is responsible for communicating the user's state in this flow.
-
-    Arguments:
-        user (User): The currently logged-in user.
-        course_enrollments (list[CourseEnrollment]): List of enrollments for the
-            user.
-
-    Returns: dict
-
-    The returned dictionary has keys that are `CourseKey`s and values that
-    are dictionaries with:
-
-        * eligible (bool): True if the user is eligible for credit in this course.
-        * deadline (datetime): The deadline for purchasing and requesting credit for this course.
-        * purchased (bool): Whether the user has purchased credit for this course.
-        * provider_name (string): The display name of the credit provider.
-        * provider_status_url (string): A URL the user can visit to check on their credit request status.
-        * request_status (string): Either "pending", "approved", or "rejected"
-        * error (bool): If true, an unexpected error occurred when retrieving the credit status,
-            so the user should contact the support team.
-
-    Example:
-    >>> _credit_statuses(user, course_enrollments)
-    {
-        CourseKey.from_string("edX/DemoX/Demo_Course"): {
-            "course_key": "edX/DemoX/Demo_Course",
-            "eligible": True,
-            "deadline": 2015-11-23 00:00:00 UTC,
-            "purchased": True,
-            "provider_name": "Hogwarts",
-            "provider_status_url": "http://example.com/status",
-            "request_status": "pending",
-            "error": False
-        }
-    }
-
-    """
-    from openedx.core.djangoapps.credit import api as credit_api
-
-    # Feature flag off
-    if not settings.FEATURES.get("ENABLE_CREDIT_ELIGIBILITY"):
-        return {}
-
-    request_status_by_course = {
-        request["course_key"]: request["status"]
-        for request in credit_api.get_credit_requests_for_user(user.username)
-    }
-
-    credit_enrollments = {
-        enrollment.course_id: enrollment
-        for enrollment in course_enrollments
-        if enrollment.mode == "credit"
-    }
-
-    # When a user purchases credit in a course, the user's enrollment
-    # mode is set to "credit" and an enrollment attribute is set
-    # with the ID of the credit provider.  We retrieve *all* such attributes
-    # here to minimize the number of database queries.
-    purchased_credit_providers = {
-        attribute.enrollment.course_id: attribute.value
-        for attribute in CourseEnrollmentAttribute.objects.filter(
-            namespace="credit",
-            name="provider_id",
-            enrollment__in=credit_enrollments.values()
-        ).select_related("enrollment")
-    }
-
-    provider_info_by_id = {
-        provider["id"]: provider
-        for provider in credit_api.get_credit_providers()
-    }
-
-    statuses = {}
-    for eligibility in credit_api.get_eligibilities_for_user(user.username):
-        course_key = CourseKey.from_string(unicode(eligibility["course_key"]))
-        status = {
-            "course_key": unicode(course_key),
-            "eligible": True,
-            "deadline": eligibility["deadline"],
-            "purchased": course_key in credit_enrollments,
-            "provider_name": None,
-            "provider_status_url": None,
-            "provider_id": None,
-            "request_status": request_status_by_course.get(course_key),
-            "error": False,
-        }
-
-        # If the user has purchased credit, then include information about the credit
-        # provider from which the user purchased credit.
-        # We retrieve the provider's ID from the an "enrollment attribute" set on the user's
-        # enrollment when the user's order for credit is fulfilled by the E-Commerce service.
-        if status["purchased"]:
-            provider_id = purchased_credit_providers.get(course_key)
-            if provider_id is None:
-                status["error"] = True
-                log.error(
-                    u"Could not find credit provider associated with credit enrollment "
-                    u"for user %s in course %s.  The user will not be able to see his or her "
-                    u"credit request status on the student dashboard.  This attribute should "
-                    u"have been set when the user purchased credit in the course.",
-                    user.id, course_key
-                )
-            else:
-                provider_info = provider_info_by_id.get(provider_id, {})
-                status["provider_name"] = provider_info.get("display_name")
-                status["provider_status_url"] = provider_info.get("status_url")
-                status["provider_id"] = provider_id
-
-        statuses[course_key] = status
-
-    return statuses
-
-
 @transaction.non_atomic_requests
 @require_POST
 @outer_atomic(read_committed=True)
@@ -25,3 +25,13 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_batch(self, events):
+        """
+        Send a list of events to tracker.
+
+        Backends which can send several events at once more efficiently
+        than one by one should override this method.
+        """
+        for event in events:
+            self.send(event)
@@ -0,0 +1,195 @@
+"""
+Event tracker backend that sends events to other backends in batches, from
+a background thread.
+
+Sending an event only puts it in a bounded in-process queue, so that the
+request which emits it doesn't wait for the events to be serialized or
+stored.  A background thread takes the events from the queue and sends
+them to the wrapped backends in batches, using their `send_batch` method.
+The events still queued are sent when the process exits.  Celery worker
+processes exit without running `atexit` handlers, so they send them when
+Celery signals that they are shutting down.
+
+When the queue is full, which happens if the wrapped backends can't keep
+up, `send` waits for at most `put_timeout` seconds for room in the queue,
+then drops the event.
+
+Example configuration::
+
+  TRACKING_BACKENDS = {
+      'buffered': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backends': {
+                  'logger': {
+                      'ENGINE': 'track.backends.logger.LoggerBackend',
+                      'OPTIONS': {'name': 'tracking'},
+                  },
+              },
+              'max_queue_size': 10000,
+              'batch_size': 100,
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+from Queue import Queue, Empty, Full
+
+from celery.signals import worker_process_shutdown
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend which queues events, and sends them to its
+    backends in batches from a background thread.
+    """
+
+    def __init__(self, backends, max_queue_size=10000, batch_size=100, flush_interval=1.0, put_timeout=0,
+                 **kwargs):
+        """
+        :Parameters:
+
+          - `backends`: the backends to send the events to, configured as
+            in `TRACKING_BACKENDS`
+          - `max_queue_size`: maximum number of events waiting to be sent
+          - `batch_size`: maximum number of events sent to the backends at once
+          - `flush_interval`: maximum number of seconds to wait for more events
+            before sending a batch which isn't full
+          - `put_timeout`: number of seconds `send` waits for room in a full
+            queue, before dropping the event
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        # Imported here, since the tracker instantiates this backend when imported.
+        from track.tracker import _instantiate_backend_from_name
+
+        self.backends = {
+            name: _instantiate_backend_from_name(values['ENGINE'], values.get('OPTIONS', {}))
+            for name, values in backends.iteritems()
+            if values
+        }
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_queue_size = max_queue_size
+        self.queue = Queue(max_queue_size)
+
+        self._thread = None
+        self._thread_pid = None
+        self._thread_lock = threading.Lock()
+        self._thread_lock_pid = os.getpid()
+        self._stopped = threading.Event()
+
+        atexit.register(self.stop)
+        worker_process_shutdown.connect(self._on_worker_process_shutdown)
+
+    def send(self, event):
+        """Queue the event, to be sent by the background thread."""
+        self._ensure_thread()
+        try:
+            if self.put_timeout:
+                self.queue.put(event, timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait(event)
+        except Full:
+            dog_stats_api.increment('track.buffered.dropped')
+
+    def send_batch(self, events):
+        for event in events:
+            self.send(event)
+
+    def stop(self):
+        """Stop the background thread, then send all the queued events."""
+        self._stopped.set()
+        if self._thread_pid != os.getpid():
+            # Any queued events were queued by the process this one was
+            # forked from, which sends them.
+            return
+        self._thread.join(self.flush_interval * 2)
+        self.flush()
+
+    def _on_worker_process_shutdown(self, **kwargs):  # pylint: disable=unused-argument
+        """Send the queued events before a Celery worker process exits."""
+        self.stop()
+
+    def flush(self):
+        """Send all the queued events, from the current thread."""
+        while True:
+            events = self._get_batch(block=False)
+            if not events:
+                return
+            self._send_to_backends(events)
+
+    def _ensure_thread(self):
+        """
+        Start the background thread, if it isn't running in this process.
+
+        A process forked from one whose thread is running has no such thread,
+        so it starts its own, with its own queue: the events queued before the
+        fork are sent by the parent process, and the locks of the parent's
+        queue may have been held by its thread when the process was forked.
+        """
+        pid = os.getpid()
+        if self._thread_pid == pid:
+            return
+        if self._thread_lock_pid != pid:
+            self._thread_lock = threading.Lock()
+            self._thread_lock_pid = pid
+        with self._thread_lock:
+            if self._thread_pid != pid:
+                if self._thread_pid is not None:
+                    self.queue = Queue(self.max_queue_size)
+                    self._stopped = threading.Event()
+                self._thread = threading.Thread(target=self._run, name='track-buffered-backend')
+                self._thread.daemon = True
+                self._thread.start()
+                self._thread_pid = pid
+
+    def _run(self):
+        """Send the queued events in batches, until stopped."""
+        while not self._stopped.is_set():
+            events = self._get_batch(block=True)
+            if events:
+                self._send_to_backends(events)
+
+    def _get_batch(self, block):
+        """
+        Take up to `batch_size` events from the queue.  If `block`, wait for
+        up to `flush_interval` seconds for the first one.
+        """
+        events = []
+        try:
+            if block:
+                events.append(self.queue.get(timeout=self.flush_interval))
+            while len(events) < self.batch_size:
+                events.append(self.queue.get_nowait())
+        except Empty:
+            pass
+        return events
+
+    def _send_to_backends(self, events):
+        """Send the batch of events to all the backends."""
+        dog_stats_api.histogram('track.buffered.batch_size', len(events))
+        for name, backend in self.backends.iteritems():
+            try:
+                with dog_stats_api.timer('track.buffered.backend.{0}'.format(name)):
+                    backend.send_batch(events)
+            except Exception:  # pylint: disable=broad-except
+                # An exception in the background thread must not stop it, and
+                # the other backends should still get the events.
+                log.exception('Error sending events to event tracker backend %s', name)
+                dog_stats_api.increment('track.buffered.failed', len(events))
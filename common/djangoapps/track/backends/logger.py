@@ -49,3 +49,11 @@ class LoggerBackend(BaseBackend):
         event_str = event_str[:settings.TRACK_MAX_EVENT]
 
         self.event_logger.info(event_str)
+
+    def send_batch(self, events):
+        for event in events:
+            try:
+                self.send(event)
+            except UnicodeDecodeError:
+                # Already logged by send(): don't lose the rest of the batch.
+                pass
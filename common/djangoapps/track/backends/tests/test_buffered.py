@@ -0,0 +1,111 @@
+from __future__ import absolute_import
+
+import os
+import time
+
+from celery.signals import worker_process_shutdown
+from django.test import TestCase
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class BatchRecordingBackend(BaseBackend):
+    """Records the batches of events it is sent."""
+
+    def __init__(self, **kwargs):
+        super(BatchRecordingBackend, self).__init__(**kwargs)
+        self.batches = []
+
+    def send(self, event):
+        self.batches.append([event])
+
+    def send_batch(self, events):
+        self.batches.append(list(events))
+
+
+class FailingBackend(BaseBackend):
+    """Fails to send any event."""
+
+    def send(self, event):
+        raise Exception('Cannot send event')
+
+
+BACKENDS = {
+    'first': {'ENGINE': 'track.backends.tests.test_buffered.BatchRecordingBackend'},
+    'failing': {'ENGINE': 'track.backends.tests.test_buffered.FailingBackend'},
+    'second': {'ENGINE': 'track.backends.tests.test_buffered.BatchRecordingBackend'},
+}
+
+
+class TestBufferedBackend(TestCase):
+    def setUp(self):
+        super(TestBufferedBackend, self).setUp()
+        self.backend = BufferedBackend(BACKENDS, max_queue_size=5, batch_size=2, flush_interval=0.01)
+        self.addCleanup(self.backend.stop)
+
+    def batches(self, name):
+        return self.backend.backends[name].batches
+
+    def test_events_are_sent_in_batches(self):
+        with patch.object(self.backend, '_ensure_thread'):
+            for index in range(3):
+                self.backend.send({'test': index})
+
+            # Nothing is sent until the queue is flushed.
+            self.assertEqual(self.batches('first'), [])
+
+            self.backend.flush()
+
+        expected = [[{'test': 0}, {'test': 1}], [{'test': 2}]]
+        self.assertEqual(self.batches('first'), expected)
+        self.assertEqual(self.batches('second'), expected)
+
+    def test_events_are_dropped_when_queue_is_full(self):
+        with patch.object(self.backend, '_ensure_thread'):
+            with patch('track.backends.buffered.dog_stats_api') as mock_dog_stats_api:
+                for index in range(7):
+                    self.backend.send({'test': index})
+                mock_dog_stats_api.increment.assert_called_with('track.buffered.dropped')
+                self.assertEqual(mock_dog_stats_api.increment.call_count, 2)
+
+            self.backend.flush()
+
+        sent_events = [event for batch in self.batches('first') for event in batch]
+        self.assertEqual(sent_events, [{'test': index} for index in range(5)])
+
+    def test_background_thread_sends_events(self):
+        self.backend.send({'test': 1})
+
+        deadline = time.time() + 5
+        while not (self.batches('first') and self.batches('second')) and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.batches('first'), [[{'test': 1}]])
+        self.assertEqual(self.batches('second'), [[{'test': 1}]])
+
+    def test_forked_process_gets_its_own_queue(self):
+        self.backend.send({'test': 1})
+        parent_queue = self.backend.queue
+        parent_stopped = self.backend._stopped  # pylint: disable=protected-access
+        parent_thread = self.backend._thread  # pylint: disable=protected-access
+
+        with patch('track.backends.buffered.os.getpid', return_value=os.getpid() + 1):
+            self.backend.send({'test': 2})
+
+        self.assertIsNot(self.backend.queue, parent_queue)
+        self.assertEqual(self.backend.queue.maxsize, 5)
+        self.assertIsNot(self.backend._stopped, parent_stopped)  # pylint: disable=protected-access
+        self.assertIsNot(self.backend._thread, parent_thread)  # pylint: disable=protected-access
+
+    def test_events_are_sent_when_worker_process_shuts_down(self):
+        with patch.object(self.backend, 'stop') as mock_stop:
+            worker_process_shutdown.send(sender=None, pid=os.getpid(), exitcode=0)
+        mock_stop.assert_called_once_with()
+
+    def test_forked_process_does_not_send_parent_events(self):
+        with patch.object(self.backend, '_thread_pid', os.getpid() + 1):
+            with patch.object(self.backend, 'flush') as mock_flush:
+                self.backend.stop()
+        self.assertFalse(mock_flush.called)
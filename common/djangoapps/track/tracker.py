@@ -16,6 +16,10 @@ below::
       }
   }
 
+Backends are called in the thread sending the event.  To send the events
+from a background thread, in batches, wrap the backends in a
+`track.backends.buffered.BufferedBackend`.
+
 """
 
 import inspect
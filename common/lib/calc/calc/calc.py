@@ -4,9 +4,11 @@ Parser and evaluator for FormulaResponse and NumericalResponse
 Uses pyparsing to parse. Main function as of now is evaluator().
 """
 
+from collections import OrderedDict
 import math
 import operator
 import numbers
+import threading
 import numpy
 import scipy.constants
 import functions
@@ -72,6 +74,9 @@ SUFFIXES = {
     'c': 1e-2, 'm': 1e-3, 'u': 1e-6, 'n': 1e-9, 'p': 1e-12
 }
 
+# Maximum number of expressions kept parsed by `compile_expression`.
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
 
 class UndefinedVariable(Exception):
     """
@@ -216,6 +221,16 @@ def add_defaults(variables, functions, case_sensitive):
     return (all_variables, all_functions)
 
 
+EVALUATE_ACTIONS = {
+    'number': eval_number,
+    'atom': eval_atom,
+    'power': eval_power,
+    'parallel': eval_parallel,
+    'product': eval_product,
+    'sum': eval_sum
+}
+
+
 def evaluator(variables, functions, math_expr, case_sensitive=False):
     """
     Evaluate an expression; that is, take a string of math and return a float.
@@ -228,34 +243,171 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+_compiled_expressions = OrderedDict()
+_compiled_expressions_lock = threading.Lock()
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return the `CompiledExpression` for `math_expr`.
+
+    The most recently used expressions are kept, so that evaluating the same
+    expression with many different variables (e.g. for each sample of a
+    FormulaResponse) only parses it once.
+    """
+    key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(key, None)
+        if compiled is not None:
+            # Re-insert it as the most recently used.
+            _compiled_expressions[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+
+    with _compiled_expressions_lock:
+        _compiled_expressions[key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
+
+
+class CompiledExpression(object):
+    """
+    A math expression, parsed once and reduced to nested functions so that it
+    can be evaluated with any number of variables and functions.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        """
+        Parse `math_expr` and compile its tree.
+
+        Raise a `pyparsing.ParseException` if it cannot be parsed.
+        """
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+
+        self.parser = ParseAugmenter(math_expr, case_sensitive)
+        self.parser.parse_algebra()
+
+        if case_sensitive:
+            self.casify = lambda x: x
+        else:
+            self.casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        self._evaluate = self.compile_node(self.parser.tree)
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression with the given user-defined variables and
+        functions, in addition to the defaults.
+
+        Raise an UndefinedVariable if the expression uses any others.
+        """
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        self.parser.check_variables(all_variables, all_functions)
+        return self._evaluate(all_variables, all_functions)
+
+    def compile_node(self, node):
+        """
+        Return a function of (all_variables, all_functions) evaluating `node`.
+
+        Numbers are converted to floats here rather than on each evaluation.
+        Other nodes call the same evaluation actions `reduce_tree` would, with
+        the values of their child nodes.
+        """
+        if not isinstance(node, ParseResults):
+            # A terminal node, e.g. an operator; the actions expect a string.
+            return lambda all_variables, all_functions: node
+
+        node_name = node.getName()
+        if node_name == 'number':
+            value = eval_number(node)
+            return lambda all_variables, all_functions: value
+
+        if node_name == 'variable':
+            name = self.casify(node[0])
+            return lambda all_variables, all_functions: all_variables[name]
+
+        if node_name == 'function':
+            name = self.casify(node[0])
+            argument = self.compile_node(node[1])
+            return lambda all_variables, all_functions: all_functions[name](argument(all_variables, all_functions))
+
+        if node_name not in EVALUATE_ACTIONS:  # pragma: no cover
+            raise Exception(u"Unknown branch name '{}'".format(node_name))
+
+        action = EVALUATE_ACTIONS[node_name]
+        kids = [self.compile_node(kid) for kid in node]
+        return lambda all_variables, all_functions: action([kid(all_variables, all_functions) for kid in kids])
+
+
+_algebra_grammar = None
+
+
+def algebra_grammar():
+    """
+    Return the pyparsing grammar of algebraic expressions.
+
+    It is built on first use and shared by all parses, as building it takes
+    much longer than parsing a typical expression.
+    """
+    global _algebra_grammar  # pylint: disable=global-statement
+    if _algebra_grammar is not None:
+        return _algebra_grammar
+
+    # 0.33 or 7 or .34 or 16.
+    number_part = Word(nums)
+    inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
+    # pyparsing allows spaces between tokens--`Combine` prevents that.
+    inner_number = Combine(inner_number)
+
+    # SI suffixes and percent.
+    number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
+
+    # 0.33k or 17
+    plus_minus = Literal('+') | Literal('-')
+    number = Group(
+        Optional(plus_minus) +
+        inner_number +
+        Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
+        Optional(number_suffix)
+    )
+    number = number("number")
+
+    # Predefine recursive variables.
+    expr = Forward()
+
+    # Handle variables passed in. They must start with letters/underscores
+    # and may contain numbers afterward.
+    inner_varname = Word(alphas + "_", alphanums + "_")
+    varname = Group(inner_varname)("variable")
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+    # Same thing for functions.
+    function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
+
+    atom = number | function | varname | "(" + expr + ")"
+    atom = Group(atom)("atom")
+
+    # Do the following in the correct order to preserve order of operation.
+    pow_term = atom + ZeroOrMore("^" + atom)
+    pow_term = Group(pow_term)("power")
+
+    par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
+    par_term = Group(par_term)("parallel")
+
+    prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
+    prod_term = Group(prod_term)("product")
+
+    sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
+    sum_term = Group(sum_term)("sum")
+
+    # Finish the recursion.
+    expr << sum_term  # pylint: disable=pointless-statement
+    _algebra_grammar = expr + stringEnd
+    return _algebra_grammar
 
 
 class ParseAugmenter(object):
@@ -278,23 +430,6 @@ class ParseAugmenter(object):
         self.variables_used = set()
         self.functions_used = set()
 
-        def vpa(tokens):
-            """
-            When a variable is recognized, store it in `variables_used`.
-            """
-            varname = tokens[0][0]
-            self.variables_used.add(varname)
-
-        def fpa(tokens):
-            """
-            When a function is recognized, store it in `functions_used`.
-            """
-            varname = tokens[0][0]
-            self.functions_used.add(varname)
-
-        self.variable_parse_action = vpa
-        self.function_parse_action = fpa
-
     def parse_algebra(self):
         """
         Parse an algebraic expression into a tree.
@@ -302,62 +437,24 @@ class ParseAugmenter(object):
         Store a `pyparsing.ParseResult` in `self.tree` with proper groupings to
         reflect parenthesis and order of operations. Leave all operators in the
         tree and do not parse any strings of numbers into their float versions.
+        Store the names of the variables and functions it uses in
+        `self.variables_used` and `self.functions_used`.
 
         Adding the groups and result names makes the `repr()` of the result
         really gross. For debugging, use something like
           print OBJ.tree.asXML()
         """
-        # 0.33 or 7 or .34 or 16.
-        number_part = Word(nums)
-        inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
-        # pyparsing allows spaces between tokens--`Combine` prevents that.
-        inner_number = Combine(inner_number)
-
-        # SI suffixes and percent.
-        number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
-
-        # 0.33k or 17
-        plus_minus = Literal('+') | Literal('-')
-        number = Group(
-            Optional(plus_minus) +
-            inner_number +
-            Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
-            Optional(number_suffix)
-        )
-        number = number("number")
-
-        # Predefine recursive variables.
-        expr = Forward()
-
-        # Handle variables passed in. They must start with letters/underscores
-        # and may contain numbers afterward.
-        inner_varname = Word(alphas + "_", alphanums + "_")
-        varname = Group(inner_varname)("variable")
-        varname.setParseAction(self.variable_parse_action)
-
-        # Same thing for functions.
-        function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
-        function.setParseAction(self.function_parse_action)
-
-        atom = number | function | varname | "(" + expr + ")"
-        atom = Group(atom)("atom")
-
-        # Do the following in the correct order to preserve order of operation.
-        pow_term = atom + ZeroOrMore("^" + atom)
-        pow_term = Group(pow_term)("power")
-
-        par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
-        par_term = Group(par_term)("parallel")
-
-        prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
-        prod_term = Group(prod_term)("product")
-
-        sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
-        sum_term = Group(sum_term)("sum")
-
-        # Finish the recursion.
-        expr << sum_term  # pylint: disable=pointless-statement
-        self.tree = (expr + stringEnd).parseString(self.math_expr)[0]
+        self.tree = algebra_grammar().parseString(self.math_expr)[0]
+
+        nodes = [self.tree]
+        while nodes:
+            node = nodes.pop()
+            node_name = node.getName()
+            if node_name == 'variable':
+                self.variables_used.add(node[0])
+            elif node_name == 'function':
+                self.functions_used.add(node[0])
+            nodes.extend(kid for kid in node if isinstance(kid, ParseResults))
 
     def reduce_tree(self, handle_actions, terminal_converter=None):
         """
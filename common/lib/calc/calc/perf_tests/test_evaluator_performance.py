@@ -0,0 +1,87 @@
+"""
+Performance test of checking FormulaResponse answers with calc.evaluator,
+with and without the cache of compiled expressions.
+
+Timings are recorded by CodeBlockTimer in its sqlite database, as
+"FormulaCheck:<instructor answer>:<evaluator>".
+"""
+import random
+import unittest
+
+import numpy
+
+from calc import calc
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+numpy.seterr(all='ignore')
+
+# (instructor answer, student answer, variables) of typical formula problems.
+FORMULAS = (
+    ('m*g*h', 'g*m*h', ('m', 'g', 'h')),
+    ('sqrt(x^2 + y^2)', '(x^2 + y^2)^0.5', ('x', 'y')),
+    ('R1 || R2 + 2*R3', '1/(1/R1 + 1/R2) + R3 + R3', ('R1', 'R2', 'R3')),
+    ('A*exp(-t/tau)*cos(2*pi*f*t + phi)', 'A*cos(2*pi*f*t + phi)/exp(t/tau)', ('A', 't', 'tau', 'f', 'phi')),
+)
+
+# Number of random samples of the variables, as in a FormulaResponse's
+# samples attribute.
+NUM_SAMPLES = 20
+
+# Number of problem checks timed per formula.
+NUM_CHECKS = 50
+
+
+def check_formula(evaluate, expected, given, variables):
+    """
+    Check the given answer against the expected one the way
+    FormulaResponse.check_formula does, using `evaluate` as the evaluator.
+    """
+    var_dict_list = [
+        {var: random.uniform(1, 10) for var in variables}
+        for __ in range(NUM_SAMPLES)
+    ]
+    student_result = [evaluate(var_dict, {}, given) for var_dict in var_dict_list]
+    instructor_result = [evaluate(var_dict, {}, expected) for var_dict in var_dict_list]
+    return all(
+        abs(student - instructor) <= 1e-6 * abs(instructor)
+        for student, instructor in zip(student_result, instructor_result)
+    )
+
+
+def uncached_evaluator(variables, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate the expression parsing it every time, as calc.evaluator did
+    before it cached compiled expressions.
+    """
+    return calc.CompiledExpression(math_expr, case_sensitive).evaluate(variables, functions)
+
+
+@unittest.skip
+class EvaluatorPerformance(unittest.TestCase):
+    """
+    Times problem checks of formula answers.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def test_check_throughput(self):
+        if CodeBlockTimer is None:
+            raise unittest.SkipTest("CodeBlockTimer undefined.")
+
+        for expected, given, variables in FORMULAS:
+            self.assertTrue(check_formula(calc.evaluator, expected, given, variables))
+
+            with CodeBlockTimer("FormulaCheck:{}:uncached".format(expected)):
+                for __ in range(NUM_CHECKS):
+                    check_formula(uncached_evaluator, expected, given, variables)
+
+            with CodeBlockTimer("FormulaCheck:{}:cached".format(expected)):
+                for __ in range(NUM_CHECKS):
+                    check_formula(calc.evaluator, expected, given, variables)
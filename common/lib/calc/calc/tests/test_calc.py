@@ -3,8 +3,10 @@ Unit tests for calc.py
 """
 
 import unittest
+import mock
 import numpy
 import calc
+from calc import calc as calc_module
 from pyparsing import ParseException
 
 # numpy's default behavior when it evaluates a function outside its domain
@@ -559,3 +561,59 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompileExpressionTest(unittest.TestCase):
+    """
+    Test the cache of compiled expressions used by calc.evaluator
+    """
+
+    def setUp(self):
+        super(CompileExpressionTest, self).setUp()
+        calc_module._compiled_expressions.clear()  # pylint: disable=protected-access
+
+    def test_compiled_once(self):
+        """
+        Evaluating the same expression again should not parse it again
+        """
+        compiled = calc.compile_expression('x^2 + sin(y)')
+        self.assertIs(calc.compile_expression('x^2 + sin(y)'), compiled)
+        self.assertIsNot(calc.compile_expression('x^2 + sin(y)', case_sensitive=True), compiled)
+
+        with mock.patch.object(calc.ParseAugmenter, 'parse_algebra') as mock_parse_algebra:
+            for x_value in range(5):
+                self.assertAlmostEqual(
+                    calc.evaluator({'x': x_value, 'y': 0.0}, {}, 'x^2 + sin(y)'),
+                    x_value ** 2
+                )
+        self.assertFalse(mock_parse_algebra.called)
+
+    def test_least_recently_used_evicted(self):
+        """
+        Only the most recently used expressions should be kept
+        """
+        with mock.patch.object(calc_module, 'COMPILED_EXPRESSION_CACHE_SIZE', 2):
+            first = calc.compile_expression('1 + x')
+            second = calc.compile_expression('2 + x')
+            self.assertIs(calc.compile_expression('1 + x'), first)
+            calc.compile_expression('3 + x')
+
+            self.assertIs(calc.compile_expression('1 + x'), first)
+            self.assertIsNot(calc.compile_expression('2 + x'), second)
+
+    def test_parse_errors_not_cached(self):
+        """
+        Expressions which cannot be parsed should raise every time
+        """
+        for __ in range(2):
+            with self.assertRaises(ParseException):
+                calc.evaluator({}, {}, '1 +* 2')
+        self.assertEqual(len(calc_module._compiled_expressions), 0)  # pylint: disable=protected-access
+
+    def test_undefined_vars_checked_on_each_evaluation(self):
+        """
+        The variables defined may differ from one evaluation to the next
+        """
+        self.assertEqual(calc.evaluator({'x': 2}, {}, '3*x'), 6)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'x'):
+            calc.evaluator({}, {}, '3*x')
@@ -4,6 +4,7 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from . import worker_pool
 from dogapi import dog_stats_api
 
 import hashlib
@@ -70,6 +71,23 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def _worker_pool_exec_fn(pool, fallback_exec_fn):
+    """
+    Return a code executor which runs the code in the given pool of sandbox
+    workers, or with `fallback_exec_fn` if the pool can't run it.
+    """
+    def exec_fn(code, globals_dict, **kwargs):
+        """
+        Execute code like codejail.safe_exec.safe_exec.
+        """
+        try:
+            pool.safe_exec(code, globals_dict, **kwargs)
+        except worker_pool.WorkerPoolUnavailable:
+            dog_stats_api.increment('capa.safe_exec.worker_pool_unavailable')
+            fallback_exec_fn(code, globals_dict, **kwargs)
+    return exec_fn
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -132,6 +150,10 @@ def safe_exec(
         exec_fn = codejail_not_safe_exec
     else:
         exec_fn = codejail_safe_exec
+        pool = worker_pool.get_worker_pool()
+        if pool is not None:
+            # Try the pool of pre-started sandboxed Pythons first.
+            exec_fn = _worker_pool_exec_fn(pool, exec_fn)
 
     # Run the code!  Results are side effects in globals_dict.
     try:
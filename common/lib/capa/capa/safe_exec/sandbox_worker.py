@@ -0,0 +1,172 @@
+"""
+A long-running worker which executes jobs of Python code, run by the sandboxed Python.
+
+This file is not imported: its source is passed to the sandboxed Python by
+worker_pool.py, so it must only use the standard library.  The names of the
+modules to import once, before the first job, are given as arguments.
+
+Jobs are read from stdin and their results written to stdout, one JSON
+document per line.  A job is a dict with:
+
+    code: the code to execute
+    globals: the JSON globals of the code
+    python_path: the list of paths to add to sys.path, relative to the job's directory
+    extra_files: a list of [name, base64 encoded contents] of the files to create in the job's directory
+    limits: a dict of the CPU and VMEM limits, and the REALTIME limit, in seconds, of the job
+
+Each job is executed in a forked child process, in a new temporary directory,
+so that it can't affect the worker nor the other jobs.  The result of a job
+is a dict with either the resulting JSON globals in "globals" or the error
+message in "error".
+"""
+import base64
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+# The types of the globals returned by a job, as in codejail.safe_exec.
+OK_TYPES = (type(None), int, long, float, str, unicode, list, tuple, dict)
+BAD_KEYS = ("__builtins__",)
+
+
+def jsonable(value):
+    """
+    Can value be returned as a JSON global?
+    """
+    if not isinstance(value, OK_TYPES):
+        return False
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def set_limits(limits):
+    """
+    Limit the resources of the current process, as codejail does for each execution.
+    """
+    cpu = limits.get("CPU")
+    if cpu:
+        # Use the soft limit as the hard one, so that the process is killed once it is reached.
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+    vmem = limits.get("VMEM")
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+    # No subprocesses, and no files written.
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+
+
+def execute(job, result_fd):
+    """
+    Execute the job in the current (child) process, writing its result to result_fd.
+    """
+    try:
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, 0)
+        os.dup2(devnull, 1)
+        sys.path[:0] = job["python_path"]
+        set_limits(job["limits"])
+
+        globals_dict = job["globals"]
+        try:
+            exec job["code"] in globals_dict  # pylint: disable=exec-used
+        except BaseException:  # pylint: disable=broad-except
+            result = {
+                "error": "Couldn't execute jailed code: stdout: '', stderr: {!r} with status code: 1".format(
+                    traceback.format_exc()
+                )
+            }
+        else:
+            result = {
+                "globals": {
+                    key: value for key, value in globals_dict.iteritems()
+                    if key not in BAD_KEYS and jsonable(value)
+                }
+            }
+        data = json.dumps(result)
+        while data:
+            data = data[os.write(result_fd, data):]
+    finally:
+        os._exit(0)  # pylint: disable=protected-access
+
+
+def run_job(job):
+    """
+    Execute the job in a child process in a new temporary directory, and return its result.
+    """
+    job_dir = tempfile.mkdtemp(prefix="codejail-")
+    try:
+        for name, contents in job["extra_files"]:
+            with open(os.path.join(job_dir, name), "wb") as extra_file:
+                extra_file.write(base64.b64decode(contents))
+        os.chdir(job_dir)
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            execute(job, write_fd)
+        os.close(write_fd)
+
+        # Read the result until the child exits, killing it once it runs out of time.
+        deadline = time.time() + job["limits"].get("REALTIME", 3)
+        chunks = []
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                os.kill(pid, signal.SIGKILL)
+                break
+            readable, __, __ = select.select([read_fd], [], [], remaining)
+            if readable:
+                chunk = os.read(read_fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        os.close(read_fd)
+        __, status = os.waitpid(pid, 0)
+
+        if chunks and os.WIFEXITED(status):
+            return json.loads("".join(chunks))
+        return {
+            "error": "Couldn't execute jailed code: stdout: '', stderr: '' with status code: {}".format(
+                -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            )
+        }
+    finally:
+        os.chdir("/")
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def main(module_names):
+    """
+    Import the given modules, then run the jobs read from stdin until it is closed.
+    """
+    for module_name in module_names:
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    # The jobs are the only readers and writers of stdin and stdout.
+    jobs, results = sys.stdin, sys.stdout
+    sys.stdin = sys.stdout = open(os.devnull, "r+")
+
+    while True:
+        line = jobs.readline()
+        if not line:
+            break
+        results.write(json.dumps(run_job(json.loads(line))) + "\n")
+        results.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,114 @@
+"""Test worker_pool.py"""
+
+import sys
+import unittest
+
+from capa.safe_exec import worker_pool
+from capa.safe_exec.worker_pool import SandboxWorkerPool, WorkerPoolUnavailable
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException
+from mock import patch
+
+
+class TestSandboxWorkerPool(unittest.TestCase):
+    """
+    Run the workers with the current Python, as the current user.
+    """
+    def setUp(self):
+        super(TestSandboxWorkerPool, self).setUp()
+        self.pool = SandboxWorkerPool(sys.executable, size=1, max_jobs=2)
+        self.addCleanup(self.pool.stop)
+        limits_patcher = patch.dict(jail_code.LIMITS, {'REALTIME': 2})
+        limits_patcher.start()
+        self.addCleanup(limits_patcher.stop)
+
+    def test_set_values(self):
+        g = {'b': 2}
+        self.pool.safe_exec("a = 17 + b", g)
+        self.assertEqual(g['a'], 19)
+
+    def test_unjsonable_values_are_dropped(self):
+        g = {}
+        self.pool.safe_exec("import math\na = 1\nf = lambda: 1", g)
+        self.assertEqual(g['a'], 1)
+        self.assertNotIn('f', g)
+        self.assertNotIn('math', g)
+
+    def test_jobs_are_isolated(self):
+        g = {}
+        self.pool.safe_exec("import sys\nsys.leaked = 1", g)
+        self.pool.safe_exec("import sys\na = hasattr(sys, 'leaked')", g)
+        self.assertFalse(g['a'])
+
+    def test_raising_exceptions(self):
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", {})
+        self.assertIn("ZeroDivisionError", cm.exception.message)
+        # The worker survives the failure.
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    def test_realtime_limit(self):
+        with self.assertRaises(SafeExecException):
+            self.pool.safe_exec("while True: pass", {})
+
+    def test_limits_are_read_at_exec_time(self):
+        with patch.dict(jail_code.LIMITS, {'REALTIME': 1}):
+            with patch.object(worker_pool.SandboxWorker, 'run', return_value={'globals': {}}) as mock_run:
+                self.pool.safe_exec("a = 1", {})
+        job, timeout = mock_run.call_args[0]
+        self.assertEqual(job['limits']['REALTIME'], 1)
+        self.assertEqual(timeout, 1 + worker_pool.WORKER_GRACE_SECONDS)
+
+    def test_no_realtime_limit(self):
+        with patch.dict(jail_code.LIMITS, {'REALTIME': 0}):
+            with self.assertRaises(WorkerPoolUnavailable):
+                self.pool.safe_exec("a = 1", {})
+
+    def test_extra_files(self):
+        g = {}
+        self.pool.safe_exec(
+            "import constant\na = constant.THE_CONST\nb = open('data.txt').read()",
+            g,
+            python_path=['constant.py'],
+            extra_files=[('constant.py', 'THE_CONST = 23\n'), ('data.txt', 'hello')],
+        )
+        self.assertEqual(g['a'], 23)
+        self.assertEqual(g['b'], 'hello')
+
+    def test_python_path_outside_extra_files(self):
+        with self.assertRaises(WorkerPoolUnavailable):
+            self.pool.safe_exec("a = 1", {}, python_path=['/usr/lib/pylib'])
+
+    def test_workers_are_reused_then_replaced(self):
+        self.pool.safe_exec("a = 1", {})
+        worker = self.pool.idle_workers[0]
+        self.pool.safe_exec("a = 1", {})
+        # The worker ran its max_jobs, and was stopped.
+        self.assertEqual(self.pool.idle_workers, [])
+        self.assertFalse(worker.is_alive())
+
+    def test_busy_pool(self):
+        worker = self.pool._acquire()  # pylint: disable=protected-access
+        try:
+            with self.assertRaises(WorkerPoolUnavailable):
+                self.pool.safe_exec("a = 1", {})
+        finally:
+            self.pool._release(worker)  # pylint: disable=protected-access
+
+
+class TestGetWorkerPool(unittest.TestCase):
+    def setUp(self):
+        super(TestGetWorkerPool, self).setUp()
+        self.addCleanup(setattr, worker_pool, 'POOL_CONFIG', worker_pool.POOL_CONFIG)
+
+    def test_not_configured(self):
+        worker_pool.POOL_CONFIG = None
+        self.assertIsNone(worker_pool.get_worker_pool())
+
+    def test_configured(self):
+        worker_pool.configure(sys.executable, size=3)
+        pool = worker_pool.get_worker_pool()
+        self.assertEqual(pool.size, 3)
+        self.assertIs(worker_pool.get_worker_pool(), pool)
@@ -0,0 +1,247 @@
+"""
+A pool of long-running sandboxed Python processes which execute the code of
+capa.safe_exec, with the sandbox libraries already imported.
+
+Starting the sandboxed Python and importing numpy, scipy and the like for
+each execution takes far longer than most problem code itself.  Each worker
+of the pool is started once, the same way codejail starts the sandboxed
+Python, imports the assumed modules, and then executes each job in a forked
+child process with codejail's resource limits.  A worker is replaced after
+a number of jobs, or as soon as it misbehaves.
+
+The pool is disabled until configure() is called.  The resource limits of
+each execution are codejail's at the time, as set e.g. by
+ConfigureCodeJailMiddleware.  Executions which the pool can't run, e.g.
+because all its workers are busy, raise WorkerPoolUnavailable, upon which the
+caller should use codejail directly.
+"""
+import base64
+import json
+import logging
+import os
+import select
+import subprocess
+import threading
+import time
+
+from codejail import jail_code
+from codejail.safe_exec import json_safe, SafeExecException
+
+log = logging.getLogger(__name__)
+
+# Extra seconds given to a worker to report on a job which went over its
+# REALTIME limit, before the worker itself is considered stuck.
+WORKER_GRACE_SECONDS = 2
+
+# The source of the worker, passed to the sandboxed Python on its command line.
+worker_py_file = os.path.join(os.path.dirname(__file__), "sandbox_worker.py")
+with open(worker_py_file) as worker_file:
+    WORKER_PY = worker_file.read()
+
+
+class WorkerPoolUnavailable(Exception):
+    """
+    Raised when an execution can't be run by the worker pool.
+    """
+    pass
+
+
+class SandboxWorker(object):
+    """
+    A sandboxed Python process running sandbox_worker.py.
+    """
+    def __init__(self, python_bin, user, module_names):
+        cmd = []
+        if user:
+            cmd.extend(["sudo", "-u", user])
+        cmd.extend([python_bin, "-E", "-B", "-c", WORKER_PY])
+        cmd.extend(module_names)
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, close_fds=True)
+        self.jobs = 0
+
+    def run(self, job, timeout):
+        """
+        Send the job to the worker and return its result.  Raises WorkerPoolUnavailable,
+        and stops the worker, if it doesn't answer within timeout seconds.
+        """
+        self.jobs += 1
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+
+            # Read the result line without blocking past the timeout.
+            deadline = time.time() + timeout
+            chunks = []
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise WorkerPoolUnavailable("Sandbox worker timed out")
+                readable, __, __ = select.select([self.process.stdout], [], [], remaining)
+                if readable:
+                    chunk = os.read(self.process.stdout.fileno(), 65536)
+                    if not chunk:
+                        raise WorkerPoolUnavailable("Sandbox worker exited")
+                    chunks.append(chunk)
+                    if chunk.endswith("\n"):
+                        return json.loads("".join(chunks))
+        except (IOError, OSError, ValueError) as error:
+            self.stop()
+            raise WorkerPoolUnavailable("Sandbox worker failed: {}".format(error))
+        except WorkerPoolUnavailable:
+            self.stop()
+            raise
+
+    def is_alive(self):
+        """
+        Is the worker process still running?
+        """
+        return self.process.poll() is None
+
+    def stop(self):
+        """
+        Stop the worker process.
+        """
+        if self.is_alive():
+            try:
+                self.process.stdin.close()
+                self.process.kill()
+            except (IOError, OSError):
+                pass
+        self.process.wait()
+
+
+class SandboxWorkerPool(object):
+    """
+    Up to `size` sandbox workers, each of which runs at most `max_jobs` jobs.
+
+    Workers are started when needed, and only used by one thread at a time.
+    """
+    def __init__(self, python_bin, user=None, size=4, max_jobs=100, module_names=()):
+        self.python_bin = python_bin
+        self.user = user
+        self.size = size
+        self.max_jobs = max_jobs
+        self.module_names = list(module_names)
+        self.idle_workers = []
+        self.busy = 0
+        self.lock = threading.Lock()
+
+    def _acquire(self):
+        """
+        Return an idle worker, starting one if there is none and the pool isn't full.
+        """
+        with self.lock:
+            if self.idle_workers:
+                worker = self.idle_workers.pop()
+            elif self.busy < self.size:
+                worker = None
+            else:
+                raise WorkerPoolUnavailable("All sandbox workers are busy")
+            self.busy += 1
+
+        if worker is None or not worker.is_alive():
+            try:
+                worker = SandboxWorker(self.python_bin, self.user, self.module_names)
+            except OSError as error:
+                with self.lock:
+                    self.busy -= 1
+                raise WorkerPoolUnavailable("Couldn't start sandbox worker: {}".format(error))
+        return worker
+
+    def _release(self, worker):
+        """
+        Return the worker to the pool, unless it has run its last job.
+        """
+        if worker.jobs >= self.max_jobs:
+            worker.stop()
+            worker = None
+        with self.lock:
+            self.busy -= 1
+            if worker is not None and worker.is_alive():
+                self.idle_workers.append(worker)
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Execute code as codejail.safe_exec.safe_exec does, in a worker of the pool.
+
+        Raises WorkerPoolUnavailable if the execution can't be run by the pool,
+        e.g. because python_path names a file which isn't in extra_files, or
+        because codejail has no REALTIME limit for the pool to enforce.
+        """
+        extra_files = extra_files or []
+        extra_file_names = set(name for name, __ in extra_files)
+        python_path = python_path or []
+        if not all(path in extra_file_names for path in python_path):
+            raise WorkerPoolUnavailable("Only files in extra_files can be in python_path")
+
+        limits = dict(jail_code.LIMITS)
+        realtime = limits.get("REALTIME")
+        if not realtime:
+            raise WorkerPoolUnavailable("Only executions with a REALTIME limit can be run by the pool")
+        job = {
+            "code": code,
+            "globals": json_safe(globals_dict),
+            "python_path": python_path,
+            "extra_files": [[name, base64.b64encode(contents)] for name, contents in extra_files],
+            "limits": limits,
+        }
+
+        worker = self._acquire()
+        try:
+            result = worker.run(job, realtime + WORKER_GRACE_SECONDS)
+        finally:
+            self._release(worker)
+
+        if "error" in result:
+            log.debug("Sandbox worker job %s failed: %s", slug, result["error"])
+            raise SafeExecException(result["error"])
+        globals_dict.update(result["globals"])
+
+    def stop(self):
+        """
+        Stop all the idle workers.
+        """
+        with self.lock:
+            workers, self.idle_workers = self.idle_workers, []
+        for worker in workers:
+            worker.stop()
+
+
+# The configuration of the pool, and the pool of the current process.
+POOL_CONFIG = None
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+
+def configure(python_bin, user=None, size=4, max_jobs=100, module_names=()):
+    """
+    Enable the worker pool, with the given sandboxed Python and user as configured for
+    codejail.  `size` workers at most are started in each process, each running
+    `max_jobs` jobs before being replaced, after importing the modules in module_names.
+    """
+    global POOL_CONFIG  # pylint: disable=global-statement
+    POOL_CONFIG = {
+        "python_bin": python_bin,
+        "user": user,
+        "size": size,
+        "max_jobs": max_jobs,
+        "module_names": module_names,
+    }
+
+
+def get_worker_pool():
+    """
+    Return the worker pool of the current process, or None if the pool is not configured.
+
+    Workers are never shared between processes, so a process forked from one
+    which already has a pool gets a pool of its own.
+    """
+    global _POOL, _POOL_PID  # pylint: disable=global-statement
+    if POOL_CONFIG is None:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = SandboxWorkerPool(**POOL_CONFIG)
+            _POOL_PID = os.getpid()
+        return _POOL
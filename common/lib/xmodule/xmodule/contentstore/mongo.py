@@ -3,6 +3,7 @@ MongoDB/GridFS-level code for the contentstore.
 """
 import os
 import json
+from multiprocessing.pool import ThreadPool
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
@@ -109,7 +110,8 @@ class MongoContentStore(ContentStore):
                     location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
-                    length=fp.length, locked=getattr(fp, 'locked', False)
+                    length=fp.length, locked=getattr(fp, 'locked', False),
+                    content_digest=getattr(fp, 'md5', None)
                 )
             else:
                 with self.fs.get(content_id) as fp:
@@ -134,22 +136,35 @@ class MongoContentStore(ContentStore):
     def export(self, location, output_directory):
         content = self.find(location)
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
-
+        export_path = self._export_path(output_directory, content.name, content.import_path)
+        output_directory = os.path.dirname(export_path)
         if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
-
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
+            try:
+                os.makedirs(output_directory)
+            except OSError:
+                # created by another export in the meantime
+                if not os.path.isdir(output_directory):
+                    raise
 
         disk_fs = OSFS(output_directory)
 
-        with disk_fs.open(export_name, 'wb') as asset_file:
+        with disk_fs.open(os.path.basename(export_path), 'wb') as asset_file:
             asset_file.write(content.data)
 
-    def export_all_for_course(self, course_key, output_directory, assets_policy_file):
+    @staticmethod
+    def _export_path(output_directory, name, import_path):
+        """
+        Returns the path of the file to which the asset with the given name
+        and import_path is exported under output_directory.
+        """
+        if import_path is not None:
+            output_directory = output_directory + '/' + os.path.dirname(import_path)
+
+        # Escape invalid char from filename.
+        export_name = escape_invalid_characters(name=name, invalid_char_list=['/', '\\'])
+        return output_directory + '/' + export_name
+
+    def export_all_for_course(self, course_key, output_directory, assets_policy_file, workers=1, manifest_file=None):
         """
         Export all of this course's assets to the output_directory. Export all of the assets'
         attributes to the policy file.
@@ -159,27 +174,64 @@ class MongoContentStore(ContentStore):
             output_directory: the directory under which to put all the asset files
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
+            workers: the number of asset files written concurrently
+            manifest_file: if given, the filename of a manifest of the md5 and the path of each
+                exported asset. Assets whose md5 is the one recorded by the manifest of a previous
+                export to the same output_directory are not written again, and the files of assets
+                which no longer exist are removed.
         """
         policy = {}
+        manifest = {}
+        previous_manifest = {}
+        if manifest_file is not None and os.path.exists(manifest_file):
+            with open(manifest_file) as f:
+                previous_manifest = json.load(f)
+
         assets, __ = self.get_all_content_for_course(course_key)
 
+        to_export = []
         for asset in assets:
-            # TODO: On 6/19/14, I had to put a try/except around this
-            # to export a course. The course failed on JSON files in
-            # the /static/ directory placed in it with an import.
-            #
-            # If this hasn't been looked at in a while, remove this comment.
-            #
-            # When debugging course exports, this might be a good place
-            # to look. -- pmitros
-            self.export(asset['asset_key'], output_directory)
+            name = asset['asset_key'].name
+            export_path = self._export_path(output_directory, asset['displayname'], asset.get('import_path'))
+            manifest[name] = {'md5': asset['md5'], 'path': os.path.relpath(export_path, output_directory)}
+            if previous_manifest.get(name) != manifest[name] or not os.path.exists(export_path):
+                to_export.append(asset['asset_key'])
             for attr, value in asset.iteritems():
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].name, {})[attr] = value
+                    policy.setdefault(name, {})[attr] = value
+
+        # TODO: On 6/19/14, I had to put a try/except around this
+        # to export a course. The course failed on JSON files in
+        # the /static/ directory placed in it with an import.
+        #
+        # If this hasn't been looked at in a while, remove this comment.
+        #
+        # When debugging course exports, this might be a good place
+        # to look. -- pmitros
+        if workers > 1 and len(to_export) > 1:
+            pool = ThreadPool(workers)
+            try:
+                pool.map(lambda asset_key: self.export(asset_key, output_directory), to_export)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            for asset_key in to_export:
+                self.export(asset_key, output_directory)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+        if manifest_file is not None:
+            exported_paths = set(entry['path'] for entry in manifest.itervalues())
+            for entry in previous_manifest.itervalues():
+                stale_path = os.path.join(output_directory, entry['path'])
+                if entry['path'] not in exported_paths and os.path.exists(stale_path):
+                    os.remove(stale_path)
+
+            with open(manifest_file, 'w') as f:
+                json.dump(manifest, f, sort_keys=True, indent=4)
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
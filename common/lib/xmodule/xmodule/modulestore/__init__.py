@@ -328,10 +328,30 @@ class BulkOperationsMixin(object):
             bulk_ops_record.has_library_updated_item = False
 
 
-class EditInfo(object):
+class SlotsStateMixin(object):
+    """
+    Pickles the attributes of a class with __slots__ as a dict, so that
+    instances pickled before the class had __slots__ can still be unpickled.
+    """
+    __slots__ = ()
+
+    def __getstate__(self):
+        return {attr: getattr(self, attr) for attr in self.__slots__ if hasattr(self, attr)}
+
+    def __setstate__(self, state):
+        for attr, value in state.iteritems():
+            setattr(self, attr, value)
+
+
+class EditInfo(SlotsStateMixin):
     """
     Encapsulates the editing info of a block.
     """
+    __slots__ = (
+        'previous_version', 'update_version', 'source_version', 'edited_on', 'edited_by',
+        'original_usage', 'original_usage_version', '_subtree_edited_on', '_subtree_edited_by',
+    )
+
     def __init__(self, **kwargs):
         self.from_storable(kwargs)
 
@@ -408,12 +428,15 @@ class EditInfo(object):
         return not self == edit_info
 
 
-class BlockData(object):
+class BlockData(SlotsStateMixin):
     """
     Wrap the block data in an object instead of using a straight Python dictionary.
     Allows the storing of meta-information about a structure that doesn't persist along with
     the structure itself.
     """
+    # Large structures hold many BlockData, so they do without a __dict__.
+    __slots__ = ('definition_loaded', 'fields', 'block_type', 'definition', 'defaults', 'edit_info')
+
     def __init__(self, **kwargs):
         # Has the definition been loaded?
         self.definition_loaded = False
@@ -842,7 +865,7 @@ class ModuleStoreRead(ModuleStoreAssetBase):
             xblock, fields = (block, block.fields)
         elif isinstance(block, BlockData):
             # BlockData is an object - compare its attributes in dict form.
-            xblock, fields = (None, block.__dict__)
+            xblock, fields = (None, block.__getstate__())
         else:
             xblock, fields = (None, block)
 
@@ -109,17 +109,23 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             user_service=None,
             create_modulestore_instance=None,
             signal_handler=None,
+            cache_items=False,
             **kwargs
     ):
         """
         Initialize a MixedModuleStore. Here we look into our passed in kwargs which should be a
         collection of other modulestore configuration information
+
+        If cache_items is True, the xblocks returned by get_item are kept in the request cache
+        and returned again by later calls for the same usage key, branch and depth, until the
+        next write to their course through this modulestore.
         """
         super(MixedModuleStore, self).__init__(contentstore, **kwargs)
 
         if create_modulestore_instance is None:
             raise ValueError('MixedModuleStore constructor must be passed a create_modulestore_instance function')
 
+        self.cache_items = cache_items
         self.modulestores = []
         self.mappings = {}
 
@@ -198,6 +204,42 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         # return the default store
         return self.default_modulestore
 
+    def _get_item_cache(self, course_key):
+        """
+        Returns the dict of the xblocks of the given course cached during this request, or None
+        if items are not cached, e.g. outside of a request, where nothing clears the cache.
+        """
+        if not self.cache_items or getattr(self.request_cache, 'request', None) is None:
+            return None
+        course_key = self._clean_locator_for_mapping(course_key)
+        return self.request_cache.data.setdefault('item_cache', {}).setdefault(course_key, {})
+
+    def _clear_item_cache(self, course_key):
+        """
+        Removes the xblocks of the given course from the request cache, as they may be stale
+        after a write to the course.
+        """
+        if self.request_cache is not None:
+            course_key = self._clean_locator_for_mapping(course_key)
+            self.request_cache.data.get('item_cache', {}).pop(course_key, None)
+
+    def _record_item_lookup(self, hit):
+        """
+        Add to the count of the get_item calls during this request which were served from
+        the request cache (hits) or from the course's modulestore (misses).
+        """
+        lookups = self.request_cache.data.setdefault('item_lookups', {'hits': 0, 'misses': 0})
+        lookups['hits' if hit else 'misses'] += 1
+
+    def get_item_lookups(self):
+        """
+        Return the counts of get_item hits and misses of the request cache during this request,
+        as a dict with 'hits' and 'misses' keys.
+        """
+        if self.request_cache is None:
+            return {'hits': 0, 'misses': 0}
+        return dict(self.request_cache.data.get('item_lookups', {'hits': 0, 'misses': 0}))
+
     def _get_modulestore_by_type(self, modulestore_type):
         """
         This method should only really be used by tests and migration scripts when necessary.
@@ -225,12 +267,33 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._get_modulestore_for_courselike(usage_key.course_key)
         return store.has_item(usage_key, **kwargs)
 
-    @strip_key
     def get_item(self, usage_key, depth=0, **kwargs):
         """
         see parent doc
         """
         store = self._get_modulestore_for_courselike(usage_key.course_key)
+
+        # only plain lookups are cached; e.g. those for a given revision, or which
+        # keep the version or branch of the xblock's location, are not
+        item_cache = None
+        if not kwargs:
+            item_cache = self._get_item_cache(usage_key.course_key)
+        if item_cache is None:
+            return self._get_item(store, usage_key, depth, **kwargs)
+
+        get_branch_setting = getattr(store, 'get_branch_setting', None)
+        cache_key = (usage_key, get_branch_setting() if get_branch_setting else None, depth)
+        item = item_cache.get(cache_key)
+        self._record_item_lookup(hit=item is not None)
+        if item is None:
+            item = item_cache[cache_key] = self._get_item(store, usage_key, depth)
+        return item
+
+    @strip_key
+    def _get_item(self, store, usage_key, depth, **kwargs):
+        """
+        Returns the xblock from the given store, with the version and branch stripped from its location.
+        """
         return store.get_item(usage_key, depth, **kwargs)
 
     @strip_key
@@ -377,6 +440,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         """
         assert isinstance(course_key, CourseKey)
         store = self._get_modulestore_for_courselike(course_key)
+        self._clear_item_cache(course_key)
         return store.delete_course(course_key, user_id)
 
     @contract(asset_metadata='AssetMetadata', user_id='int|long', import_only=bool)
@@ -651,6 +715,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         # for a temporary period of time, we may want to hardcode dest_modulestore as split if there's a split
         # to have only course re-runs go to split. This code, however, uses the config'd priority
         dest_modulestore = self._get_modulestore_for_courselike(dest_course_id)
+        self._clear_item_cache(dest_course_id)
         if source_modulestore == dest_modulestore:
             return source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
 
@@ -684,6 +749,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                 in the newly created block
         """
         modulestore = self._verify_modulestore_support(course_key, 'create_item')
+        self._clear_item_cache(course_key)
         return modulestore.create_item(user_id, course_key, block_type, block_id=block_id, fields=fields, **kwargs)
 
     @strip_key
@@ -704,6 +770,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                 in the newly created block
         """
         modulestore = self._verify_modulestore_support(parent_usage_key.course_key, 'create_child')
+        self._clear_item_cache(parent_usage_key.course_key)
         return modulestore.create_child(user_id, parent_usage_key, block_type, block_id=block_id, fields=fields, **kwargs)
 
     @strip_key
@@ -714,6 +781,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Defer to the course's modulestore if it supports this method
         """
         store = self._verify_modulestore_support(course_key, 'import_xblock')
+        self._clear_item_cache(course_key)
         return store.import_xblock(user_id, course_key, block_type, block_id, fields, runtime)
 
     @strip_key
@@ -722,6 +790,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         See :py:meth `SplitMongoModuleStore.copy_from_template`
         """
         store = self._verify_modulestore_support(dest_key.course_key, 'copy_from_template')
+        self._clear_item_cache(dest_key.course_key)
         return store.copy_from_template(source_keys, dest_key, user_id)
 
     @strip_key
@@ -731,6 +800,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         (content, children, and metadata) attribute the change to the given user.
         """
         store = self._verify_modulestore_support(xblock.location.course_key, 'update_item')
+        self._clear_item_cache(xblock.location.course_key)
         return store.update_item(xblock, user_id, allow_not_found, **kwargs)
 
     @strip_key
@@ -739,6 +809,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Delete the given item from persistence. kwargs allow modulestore specific parameters.
         """
         store = self._verify_modulestore_support(location.course_key, 'delete_item')
+        self._clear_item_cache(location.course_key)
         return store.delete_item(location, user_id=user_id, **kwargs)
 
     def revert_to_published(self, location, user_id):
@@ -752,6 +823,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         :raises InvalidVersionError: if no published version exists for the location specified
         """
         store = self._verify_modulestore_support(location.course_key, 'revert_to_published')
+        self._clear_item_cache(location.course_key)
         return store.revert_to_published(location, user_id)
 
     def close_all_connections(self):
@@ -833,6 +905,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Returns the newly published item.
         """
         store = self._verify_modulestore_support(location.course_key, 'publish')
+        self._clear_item_cache(location.course_key)
         return store.publish(location, user_id, **kwargs)
 
     @strip_key
@@ -842,6 +915,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Returns the newly unpublished item.
         """
         store = self._verify_modulestore_support(location.course_key, 'unpublish')
+        self._clear_item_cache(location.course_key)
         return store.unpublish(location, user_id, **kwargs)
 
     def convert_to_draft(self, location, user_id):
@@ -852,6 +926,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         :param location: the location of the source (its revision must be None)
         """
         store = self._verify_modulestore_support(location.course_key, 'convert_to_draft')
+        self._clear_item_cache(location.course_key)
         return store.convert_to_draft(location, user_id)
 
     def has_changes(self, xblock):
@@ -70,6 +70,10 @@ BLOCK_TYPES_WITH_CHILDREN = list(set(
     name for name, class_ in XBlock.load_classes() if getattr(class_, 'has_children', False)
 ))
 
+# Number of times the cached metadata inheritance tree of a course is updated for
+# changes to single xblocks before being recomputed from scratch
+MAX_INCREMENTAL_INHERITANCE_UPDATES = 100
+
 # Allow us to call _from_deprecated_(son|string) throughout the file
 # pylint: disable=protected-access
 
@@ -665,9 +669,15 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             return ParentLocationCache()
 
-    def _compute_metadata_inheritance_tree(self, course_id):
+    def _compute_metadata_inheritance_tree(self, course_id, location=None):
         '''
-        Find all inheritable fields from all xblocks in the course which may define inheritable data
+        Find all inheritable fields from all xblocks in the course which may define inheritable data,
+        or only from the xblock at location if given.
+
+        Returns the compact form of the inheritance tree: a dict with the location url of the course
+        as 'root' and, as 'blocks', the own inheritable metadata and the children of each of these
+        xblocks keyed by location url. See _expand_metadata_inheritance_tree for the metadata each
+        xblock inherits.
         '''
         # get all collections in the course, this query should not return any leaf nodes
         course_id = self.fill_in_run(course_id)
@@ -675,8 +685,12 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             ('_id.tag', 'i4x'),
             ('_id.org', course_id.org),
             ('_id.course', course_id.course),
-            ('_id.category', {'$in': BLOCK_TYPES_WITH_CHILDREN})
         ])
+        if location is None:
+            query['_id.category'] = {'$in': BLOCK_TYPES_WITH_CHILDREN}
+        else:
+            query['_id.category'] = location.category
+            query['_id.name'] = location.name
         # if we're only dealing in the published branch, then only get published containers
         if self.get_branch_setting() == ModuleStoreEnum.Branch.published_only:
             query['_id.revision'] = None
@@ -693,67 +707,184 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
         # is a dictionary relative to that course
-        results_by_url = {}
+        blocks = {}
         root = None
 
         # now go through the results and order them by the location url
         for result in resultset:
             # manually pick it apart b/c the db has tag and we want as_published revision regardless
-            location = as_published(Location._from_deprecated_son(result['_id'], course_id.run))
+            result_location = as_published(Location._from_deprecated_son(result['_id'], course_id.run))
 
-            location_url = unicode(location)
-            if location_url in results_by_url:
+            location_url = unicode(result_location)
+            children = result.get('definition', {}).get('children', [])
+            if location_url in blocks:
                 # found either draft or live to complement the other revision
                 # FIXME this is wrong. If the child was moved in draft from one parent to the other, it will
                 # show up under both in this logic: https://openedx.atlassian.net/browse/TNL-1075
-                existing_children = results_by_url[location_url].get('definition', {}).get('children', [])
-                additional_children = result.get('definition', {}).get('children', [])
-                total_children = existing_children + additional_children
                 # use set to get rid of duplicates. We don't care about order; so, it shouldn't matter.
-                results_by_url[location_url].setdefault('definition', {})['children'] = set(total_children)
+                blocks[location_url]['children'] = list(set(blocks[location_url]['children'] + children))
             else:
-                results_by_url[location_url] = result
-            if location.category == 'course':
+                blocks[location_url] = {'metadata': result.get('metadata', {}), 'children': children}
+            if result_location.category == 'course':
                 root = location_url
 
-        # now traverse the tree and compute down the inherited metadata
+        return {'root': root, 'blocks': blocks, 'incremental_updates': 0}
+
+    def _expand_metadata_inheritance_tree(self, compact_tree, tree=None, location_url=None):
+        '''
+        Compute down the metadata inherited by each xblock of the given compact inheritance tree,
+        keyed by location url.
+
+        If given the tree previously expanded from an earlier version of compact_tree and the
+        location url of the only container which changed since, only the subtree of that container
+        is recomputed, into a copy of that tree.
+        '''
+        blocks = compact_tree['blocks']
+        root = compact_tree['root']
+        branch = self.get_branch_setting()
         metadata_to_inherit = {}
 
-        def _compute_inherited_metadata(url):
+        def _compute_inherited_metadata(parent_url, parent_metadata, url):
             """
             Helper method for computing inherited metadata for a specific location url
             """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
-
-        if root is not None:
-            _compute_inherited_metadata(root)
+            # recurse into the children, but only if we have the xblock in the
+            # compact tree. Remember it does not contain leaf nodes
+            if url in blocks:
+                my_metadata = copy.deepcopy(parent_metadata)
+                my_metadata.update(blocks[url]['metadata'])
+                my_metadata.pop('parent', None)
+                metadata_to_inherit[url] = my_metadata
+                for child in blocks[url]['children']:
+                    _compute_inherited_metadata(url, my_metadata, child)
+            else:
+                # this is likely a leaf node, so let's record what metadata we need to inherit
+                metadata_to_inherit[url] = parent_metadata.copy()
+            # WARNING: 'parent' is not part of inherited metadata, but
+            # we're piggybacking on this recursive traversal to grab
+            # and cache the child's parent, as a performance optimization.
+            # The 'parent' key will be popped out of the dictionary during
+            # CachingDescriptorSystem.load_item
+            metadata_to_inherit[url]['parent'] = {branch: parent_url}
+
+        if tree is not None and location_url != root:
+            if location_url not in tree:
+                # a container which isn't in the tree yet gets in once its parent is updated
+                metadata_to_inherit.update(tree)
+                return metadata_to_inherit
+
+            parent_url = tree[location_url].get('parent', {}).get(branch)
+            if parent_url == root:
+                parent_metadata = blocks[root]['metadata']
+            else:
+                parent_metadata = tree.get(parent_url)
+            # otherwise the tree was expanded for another branch
+            if parent_metadata is not None:
+                metadata_to_inherit.update(tree)
+                _compute_inherited_metadata(parent_url, parent_metadata, location_url)
+                return metadata_to_inherit
+
+        if root is not None and root in blocks:
+            for child in blocks[root]['children']:
+                _compute_inherited_metadata(root, blocks[root]['metadata'], child)
 
         return metadata_to_inherit
 
+    def _get_cached_compact_inheritance_tree(self, course_id):
+        '''
+        Return the compact inheritance tree of the course from the request cache or the caching
+        subsystem, or None if it isn't cached.
+        '''
+        if self.request_cache is not None:
+            compact_tree = self.request_cache.data.get('compact_metadata_inheritance', {}).get(unicode(course_id))
+            if compact_tree is not None:
+                return compact_tree
+
+        # then look in any caching subsystem (e.g. memcached), ignoring a tree which missed changes
+        compact_tree = None
+        if self.metadata_inheritance_cache_subsystem is not None:
+            tree_key = self._compact_inheritance_tree_cache_key(course_id)
+            version_key = self._inheritance_tree_version_cache_key(course_id)
+            cached = self.metadata_inheritance_cache_subsystem.get_many([tree_key, version_key])
+            compact_tree = cached.get(tree_key)
+            if compact_tree is not None and compact_tree.get('version') != cached.get(version_key):
+                compact_tree = None
+        else:
+            logging.warning(
+                'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
+                OK in localdev and testing environment. Not OK in production.'
+            )
+
+        if compact_tree is not None:
+            self._cache_metadata_inheritance_tree(course_id, compact_tree=compact_tree, in_subsystem=False)
+        return compact_tree
+
+    def _cache_metadata_inheritance_tree(self, course_id, compact_tree=None, tree=None, in_subsystem=True):
+        '''
+        Cache the given compact inheritance tree of the course in the request cache and, unless
+        in_subsystem is False, in the caching subsystem; and the given expanded tree in the
+        request cache.
+        '''
+        # now write out computed tree to caching subsystem (e.g. memcached), if available
+        if compact_tree is not None and in_subsystem and self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.set(
+                self._compact_inheritance_tree_cache_key(course_id), compact_tree
+            )
+
+        if self.request_cache is not None:
+            # we can't assume the inheritance parts of the request cache dict have been defined
+            if compact_tree is not None:
+                compact_trees = self.request_cache.data.setdefault('compact_metadata_inheritance', {})
+                compact_trees[unicode(course_id)] = compact_tree
+            if tree is not None:
+                self.request_cache.data.setdefault('metadata_inheritance', {})[unicode(course_id)] = tree
+
+    def _compact_inheritance_tree_cache_key(self, course_id):
+        '''
+        The key of the compact inheritance tree of the course in the caching subsystem.
+        '''
+        return u'compact_inheritance/{}'.format(course_id)
+
+    def _inheritance_tree_version_cache_key(self, course_id):
+        '''
+        The key of the number of changes to the inheritance tree of the course in the caching subsystem.
+        '''
+        return u'compact_inheritance_version/{}'.format(course_id)
+
+    def _get_inheritance_tree_version(self, course_id):
+        '''
+        Return the number of changes to the inheritance tree of the course counted in the caching
+        subsystem, or None if there is no caching subsystem.
+
+        A cached compact tree records the number of changes it reflects as its 'version', and is
+        only valid while no other change is counted.
+        '''
+        if self.metadata_inheritance_cache_subsystem is None:
+            return None
+        version_key = self._inheritance_tree_version_cache_key(course_id)
+        self.metadata_inheritance_cache_subsystem.add(version_key, 0)
+        return self.metadata_inheritance_cache_subsystem.get(version_key)
+
+    def _increment_inheritance_tree_version(self, course_id):
+        '''
+        Count a change to the inheritance tree of the course in the caching subsystem, and return
+        the new number of changes, or None if changes can't be counted.
+        '''
+        if self.metadata_inheritance_cache_subsystem is None:
+            return None
+        version_key = self._inheritance_tree_version_cache_key(course_id)
+        self.metadata_inheritance_cache_subsystem.add(version_key, 0)
+        try:
+            return self.metadata_inheritance_cache_subsystem.incr(version_key)
+        except ValueError:
+            # the key was evicted in the meantime, or the cache doesn't keep anything
+            return None
+
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
         Compute the metadata inheritance for the course.
         '''
-        tree = {}
+        compact_tree = None
 
         course_id = self.fill_in_run(course_id)
         if not force_refresh:
@@ -761,47 +892,97 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             if self.request_cache is not None and unicode(course_id) in self.request_cache.data.get('metadata_inheritance', {}):
                 return self.request_cache.data['metadata_inheritance'][unicode(course_id)]
 
-            # then look in any caching subsystem (e.g. memcached)
-            if self.metadata_inheritance_cache_subsystem is not None:
-                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
-            else:
-                logging.warning(
-                    'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
-                    OK in localdev and testing environment. Not OK in production.'
-                )
+            compact_tree = self._get_cached_compact_inheritance_tree(course_id)
 
-        if not tree:
+        if not compact_tree:
             # if not in subsystem, or we are on force refresh, then we have to compute
-            tree = self._compute_metadata_inheritance_tree(course_id)
-
-            # now write out computed tree to caching subsystem (e.g. memcached), if available
-            if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+            if force_refresh:
+                # the course changed, which invalidates any tree being computed concurrently
+                version = self._increment_inheritance_tree_version(course_id)
+            else:
+                version = self._get_inheritance_tree_version(course_id)
+            compact_tree = self._compute_metadata_inheritance_tree(course_id)
+            compact_tree['version'] = version
+            self._cache_metadata_inheritance_tree(course_id, compact_tree=compact_tree)
 
         # now populate a request_cache, if available. NOTE, we are outside of the
         # scope of the above if: statement so that after a memcache hit, it'll get
         # put into the request_cache
+        tree = self._expand_metadata_inheritance_tree(compact_tree)
+        self._cache_metadata_inheritance_tree(course_id, tree=tree)
+
+        return tree
+
+    def _update_cached_metadata_inheritance_tree(self, course_id, location):
+        '''
+        Update the cached metadata inheritance tree of the course for changes to the xblock at
+        location alone, rather than recomputing it from scratch: only the entry of that xblock is
+        reloaded, and only the metadata inherited within its subtree is recomputed. Changes to
+        leaf xblocks don't affect the tree at all.
+
+        Each update counts a change in the caching subsystem. If the cached tree doesn't reflect
+        exactly the changes counted before this one, another process changed the tree concurrently
+        and one of the updates could be lost, so the tree is recomputed from scratch. It is also
+        recomputed if it isn't cached yet or has been updated incrementally
+        MAX_INCREMENTAL_INHERITANCE_UPDATES times.
+        '''
+        course_id = self.fill_in_run(course_id)
+        if location.category not in BLOCK_TYPES_WITH_CHILDREN:
+            return self._get_cached_metadata_inheritance_tree(course_id)
+
+        version = self._increment_inheritance_tree_version(course_id)
+        if version is None:
+            compact_tree = self._get_cached_compact_inheritance_tree(course_id)
+        else:
+            compact_tree = self.metadata_inheritance_cache_subsystem.get(
+                self._compact_inheritance_tree_cache_key(course_id)
+            )
+            if compact_tree is not None and compact_tree.get('version') != version - 1:
+                compact_tree = None
+        if not compact_tree or compact_tree['incremental_updates'] >= MAX_INCREMENTAL_INHERITANCE_UPDATES:
+            return self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+
+        tree = None
         if self.request_cache is not None:
-            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
-            # defined
-            if 'metadata_inheritance' not in self.request_cache.data:
-                self.request_cache.data['metadata_inheritance'] = {}
-            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
+            tree = self.request_cache.data.get('metadata_inheritance', {}).get(unicode(course_id))
+
+        location_url = unicode(as_published(location))
+        block_tree = self._compute_metadata_inheritance_tree(course_id, location)
+
+        # the cached tree may be shared, so update a copy
+        blocks = dict(compact_tree['blocks'])
+        blocks.pop(location_url, None)
+        blocks.update(block_tree['blocks'])
+        compact_tree = {
+            'root': block_tree['root'] or compact_tree['root'],
+            'blocks': blocks,
+            'incremental_updates': compact_tree['incremental_updates'] + 1,
+            'version': version,
+        }
+        self._cache_metadata_inheritance_tree(course_id, compact_tree=compact_tree)
 
+        tree = self._expand_metadata_inheritance_tree(compact_tree, tree, location_url)
+        self._cache_metadata_inheritance_tree(course_id, tree=tree)
         return tree
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, location=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If given the location of the only xblock which changed, the cached tree is updated for the
+        changes to that xblock rather than recomputed from scratch.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
             # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            if location is None:
+                cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            else:
+                cached_metadata = self._update_cached_metadata_inheritance_tree(course_id, location)
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
@@ -1472,7 +1653,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             xblock._edit_info = payload['edit_info']
 
             # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, location=xblock.scope_ids.usage_id
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
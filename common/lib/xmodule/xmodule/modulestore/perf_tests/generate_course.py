@@ -0,0 +1,58 @@
+"""
+Generates synthetic courses of a given shape in a modulestore, for performance testing.
+"""
+from itertools import cycle
+
+# Block types of the levels of a generated course, below the course itself.
+COURSE_LEVELS = ('chapter', 'sequential', 'vertical')
+
+# Block types of the leaves of a generated course, used in turn.
+LEAF_BLOCK_TYPES = ('problem', 'html', 'video')
+
+
+def shape_description(shape):
+    """
+    Returns a short description of a course shape, e.g. "20x10x5x4".
+    """
+    return 'x'.join(str(count) for count in shape)
+
+
+def make_course(store, user_id, org, course, run, shape):
+    """
+    Create a course in the given store, with the given shape, in a single bulk operation.
+
+    Args:
+        store: the modulestore in which to create the course
+        user_id: the id of the user creating the course
+        org, course, run: the parts of the key of the course
+        shape: the number of (chapters, sequentials per chapter, verticals per sequential,
+            leaves per vertical) of the course
+
+    Returns:
+        the created course, and a dict mapping each created block type to the list of
+        usage keys of the created blocks of that type
+    """
+    course_key = store.make_course_key(org, course, run)
+    blocks = {}
+    leaf_block_types = cycle(LEAF_BLOCK_TYPES)
+
+    def add_children(parent_key, block_types, counts):
+        """
+        Recursively create the children of the block with the given parent_key.
+        """
+        for index in range(counts[0]):
+            block_type = block_types[0] if block_types else next(leaf_block_types)
+            block = store.create_child(
+                user_id, parent_key, block_type,
+                block_id='{}_{}'.format(parent_key.block_id, index),
+                fields={'display_name': '{} {}'.format(block_type, index)},
+            )
+            blocks.setdefault(block_type, []).append(block.location)
+            if len(counts) > 1:
+                add_children(block.location, block_types[1:], counts[1:])
+
+    with store.bulk_operations(course_key):
+        course_block = store.create_course(org, course, run, user_id)
+        add_children(course_block.location, COURSE_LEVELS, shape)
+
+    return store.get_course(course_block.id), blocks
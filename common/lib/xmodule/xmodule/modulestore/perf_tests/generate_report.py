@@ -5,6 +5,7 @@ report which can be viewed over time to examine the performance effects of code
 various parts of the system.
 """
 
+import json
 import sqlite3
 from lxml.builder import E
 import lxml.html
@@ -265,12 +266,88 @@ class FindReportGen(ReportGenerator):
         return html
 
 
+class ModulestoreReportGen(ReportGenerator):
+    """
+    Class which generates report for modulestore performance test data.
+    """
+    def __init__(self, db_name):
+        super(ModulestoreReportGen, self).__init__(db_name)
+        self._read_timing_data()
+
+    def _read_timing_data(self):
+        """
+        Read in the timing data of the latest run from the sqlite DB and save into a dict.
+        """
+        self.run_data = {}
+
+        self.all_modulestores = set()
+        for row in self.all_rows:
+            time_taken = row[3]
+
+            # Split apart the description into its parts.
+            desc_parts = row[2].split(':')
+            if desc_parts[0] != 'ModulestorePerf':
+                continue
+            modulestore, shape = desc_parts[1:3]
+            self.all_modulestores.add(modulestore)
+            test_phase = 'all'
+            if len(desc_parts) > 3:
+                test_phase = desc_parts[3]
+
+            # Save the data in a multi-level dict - { phase1: { shape1: { modulestore1: duration, ...}, ...}, ...}.
+            phase_data = self.run_data.setdefault(test_phase, {})
+            shape_data = phase_data.setdefault(shape, {})
+            shape_data.setdefault(modulestore, time_taken)
+
+    def generate_html(self):
+        """
+        Generate HTML.
+        """
+        html = HTMLDocument("Results")
+
+        for phase in sorted(self.run_data.keys()):
+            per_phase = self.run_data[phase]
+
+            # Make the table header columns and the table.
+            columns = ["Course Shape", ]
+            ms_keys = sorted(self.all_modulestores)
+            for k in ms_keys:
+                columns.append("Time Taken (ms) ({})".format(k))
+            phase_table = HTMLTable(columns)
+            for shape in sorted(per_phase.keys()):
+                per_shape = per_phase[shape]
+                row = [shape, ]
+                for modulestore in ms_keys:
+                    row.append("{}".format(per_shape.get(modulestore, '')))
+                phase_table.add_row(row)
+            html.add_header(2, phase)
+            html.add_to_body(phase_table.table)
+
+        return html
+
+    def generate_json(self):
+        """
+        Generate JSON, as a list of {phase, shape, modulestore, elapsed} objects.
+        """
+        results = [
+            {'phase': phase, 'shape': shape, 'modulestore': modulestore, 'elapsed': time_taken}
+            for phase, per_phase in self.run_data.iteritems()
+            for shape, per_shape in per_phase.iteritems()
+            for modulestore, time_taken in per_shape.iteritems()
+        ]
+        results.sort(key=lambda result: (result['phase'], result['shape'], result['modulestore']))
+        return json.dumps(results, indent=4)
+
+
 if click is not None:
     @click.command()
     @click.argument('outfile', type=click.File('w'), default='-', required=False)
     @click.option('--db_name', help='Name of sqlite database from which to read data.', default=DB_NAME)
-    @click.option('--data_type', help='Data type to process. One of: "imp_exp" or "find"', default="find")
-    def cli(outfile, db_name, data_type):
+    @click.option(
+        '--data_type', help='Data type to process. One of: "imp_exp", "find" or "modulestore"', default="find"
+    )
+    @click.option('--json', 'as_json', is_flag=True, help='Output JSON instead of HTML. Only for "modulestore".')
+    def cli(outfile, db_name, data_type, as_json):
         """
         Generate an HTML report from the sqlite timing data.
         """
@@ -280,6 +357,12 @@ if click is not None:
         elif data_type == 'find':
             f_gen = FindReportGen(db_name)
             html = f_gen.generate_html()
+        elif data_type == 'modulestore':
+            ms_gen = ModulestoreReportGen(db_name)
+            if as_json:
+                click.echo(ms_gen.generate_json(), file=outfile)
+                return
+            html = ms_gen.generate_html()
         click.echo(html.tostring(), file=outfile)
 
 if __name__ == '__main__':
@@ -0,0 +1,110 @@
+"""
+Performance test of the hot paths of the modulestores on generated courses.
+
+Timings are recorded by CodeBlockTimer in its sqlite database, as
+"ModulestorePerf:<modulestore>:<course shape>:<phase>", from which
+generate_report.py builds HTML or JSON reports.
+"""
+import itertools
+import random
+import unittest
+
+import ddt
+from mock import patch
+from nose.plugins.skip import SkipTest
+
+from openedx.core.lib.block_cache.block_cache import get_blocks, update_block_cache
+from openedx.core.lib.block_cache.tests.test_utils import MockCache
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.perf_tests.generate_course import make_course, shape_description
+from xmodule.modulestore.tests.utils import MIXED_MODULESTORE_SETUPS, MIXED_MS_SETUPS_SHORT
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of (chapters, sequentials per chapter, verticals per sequential,
+# leaves per vertical) of the generated courses.
+COURSE_SHAPES = (
+    (5, 5, 5, 2),
+    (20, 10, 5, 4),
+    (40, 10, 10, 4),
+)
+
+# Number of blocks on which the operations of a single block are timed.
+BLOCKS_PER_PHASE = 20
+
+# Block types queried with get_items.
+GET_ITEMS_CATEGORIES = ('sequential', 'vertical', 'problem')
+
+SHORT_NAME_MAP = dict(zip(MIXED_MODULESTORE_SETUPS, MIXED_MS_SETUPS_SHORT))
+
+
+@ddt.ddt
+# Eventually, exclude this attribute from regular unittests while running *only* tests
+# with this attribute during regular performance tests.
+# @attr("perf_test")
+@unittest.skip
+class ModulestorePerformance(unittest.TestCase):
+    """
+    Times reading and writing generated courses of different shapes in
+    the old Mongo and split modulestores.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*itertools.product(
+        MIXED_MODULESTORE_SETUPS,
+        COURSE_SHAPES,
+    ))
+    @ddt.unpack
+    def test_modulestore_timings(self, store_builder, shape):
+        if CodeBlockTimer is None:
+            raise SkipTest("CodeBlockTimer undefined.")
+
+        user_id = ModuleStoreEnum.UserID.test
+        # Sample the same blocks on every run.
+        sample = random.Random(0).sample
+
+        desc = "ModulestorePerf:{}:{}".format(SHORT_NAME_MAP[store_builder], shape_description(shape))
+        with CodeBlockTimer(desc):
+            with store_builder.build() as (__, store):
+                with CodeBlockTimer("create_course"):
+                    course, blocks = make_course(store, user_id, 'PerfX', 'Modulestore', 'Run', shape)
+
+                with CodeBlockTimer("get_course"):
+                    store.get_course(course.id, depth=None)
+
+                with CodeBlockTimer("get_items"):
+                    for category in GET_ITEMS_CATEGORIES:
+                        store.get_items(course.id, qualifiers={'category': category})
+
+                leaves = blocks['problem'] + blocks.get('html', []) + blocks.get('video', [])
+                with CodeBlockTimer("get_parent_location"):
+                    for location in sample(leaves, min(BLOCKS_PER_PHASE, len(leaves))):
+                        store.get_parent_location(location)
+
+                verticals = sample(blocks['vertical'], min(BLOCKS_PER_PHASE, len(blocks['vertical'])))
+                with CodeBlockTimer("update_item"):
+                    for location in verticals:
+                        vertical = store.get_item(location)
+                        vertical.display_name = 'Updated {}'.format(vertical.display_name)
+                        store.update_item(vertical, user_id)
+
+                with CodeBlockTimer("publish"):
+                    store.publish(course.location, user_id)
+
+                with patch(
+                    'openedx.core.lib.block_cache.transformer_registry.TransformerRegistry.get_available_plugins',
+                    return_value={},
+                ):
+                    cache = MockCache()
+                    with CodeBlockTimer("update_block_cache"):
+                        update_block_cache(cache, store, course.location)
+
+                    with CodeBlockTimer("get_blocks"):
+                        get_blocks(cache, store, None, course.location, [])
@@ -0,0 +1,77 @@
+"""
+Performance test of importing the static files of a course into the contentstore,
+one at a time and with several workers.
+
+Timings are recorded by CodeBlockTimer in its sqlite database, as
+"StaticImport:<number of files>:<number of workers>".
+"""
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+import ddt
+from nose.plugins.skip import SkipTest
+from opaque_keys.edx.locator import CourseLocator
+from path import Path as path
+
+from xmodule.modulestore.tests.utils import MongoContentstoreBuilder
+from xmodule.modulestore.xml_importer import import_static_content, STATIC_IMPORT_WORKERS
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of static files in the generated course per test run.
+STATIC_FILE_AMOUNT_PER_TEST = (100, 1000, 5000)
+
+# Size of each generated static file, in bytes.
+STATIC_FILE_SIZE = 64 * 1024
+
+# Number of static files per subdirectory of the generated course.
+STATIC_FILES_PER_DIR = 100
+
+
+def make_static_files(course_dir, num_files):
+    """
+    Generate num_files files of random data in the static directory of course_dir.
+    """
+    for index in range(num_files):
+        static_dir = course_dir / 'static' / 'dir{}'.format(index / STATIC_FILES_PER_DIR)
+        if not static_dir.exists():
+            os.makedirs(static_dir)
+        with open(static_dir / 'asset{}.bin'.format(index), 'wb') as static_file:
+            static_file.write(os.urandom(STATIC_FILE_SIZE))
+
+
+@ddt.ddt
+@unittest.skip
+class StaticImportPerformance(unittest.TestCase):
+    """
+    Times the import of the static files of a generated course.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(StaticImportPerformance, self).setUp()
+        self.course_dir = path(mkdtemp())
+        self.addCleanup(rmtree, self.course_dir, ignore_errors=True)
+
+    @ddt.data(*STATIC_FILE_AMOUNT_PER_TEST)
+    def test_static_import_timings(self, num_files):
+        if CodeBlockTimer is None:
+            raise SkipTest("CodeBlockTimer undefined.")
+
+        make_static_files(self.course_dir, num_files)
+
+        course_key = CourseLocator('org', 'static_import', 'run')
+        for workers in (1, STATIC_IMPORT_WORKERS):
+            with MongoContentstoreBuilder().build() as contentstore:
+                with CodeBlockTimer("StaticImport:{}:{}".format(num_files, workers)):
+                    remap_dict = import_static_content(self.course_dir, contentstore, course_key, workers=workers)
+                self.assertEqual(len(remap_dict), num_files)
@@ -0,0 +1,116 @@
+"""
+Measures the memory taken by split course structures of generated courses.
+"""
+import cPickle as pickle
+import datetime
+import sys
+import unittest
+
+import ddt
+from bson.objectid import ObjectId
+
+from xmodule.modulestore.perf_tests.generate_course import COURSE_LEVELS, LEAF_BLOCK_TYPES
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    STRUCTURE_MEMORY_PER_PICKLED_BYTE, structure_from_mongo
+)
+
+# Number of (chapters, sequentials per chapter, verticals per sequential,
+# leaves per vertical) of the generated course structures.
+COURSE_SHAPES = (
+    (5, 5, 5, 2),
+    (20, 10, 5, 4),
+    (40, 10, 10, 4),
+)
+
+
+def make_mongo_structure(shape):
+    """
+    Returns a split structure document, as read from Mongo, of a course with the given shape.
+    """
+    edit_info = {
+        'previous_version': ObjectId(),
+        'update_version': ObjectId(),
+        'edited_on': datetime.datetime(2016, 1, 1),
+        'edited_by': 1,
+    }
+    blocks = []
+
+    def add_block(block_type, block_id, block_types, counts):
+        """
+        Recursively adds the document of the given block and of its generated descendants.
+        """
+        children = []
+        if counts:
+            for index in range(counts[0]):
+                child_type = block_types[0] if block_types else LEAF_BLOCK_TYPES[index % len(LEAF_BLOCK_TYPES)]
+                child_id = u'{}_{}'.format(block_id, index)
+                add_block(child_type, child_id, block_types[1:], counts[1:])
+                children.append([child_type, child_id])
+        blocks.append({
+            'block_type': block_type,
+            'block_id': block_id,
+            'fields': {'children': children, 'display_name': u'{} {}'.format(block_type, block_id)},
+            'definition': ObjectId(),
+            'defaults': {},
+            'edit_info': dict(edit_info),
+        })
+
+    add_block(u'course', u'course', COURSE_LEVELS, shape)
+    return {'_id': ObjectId(), 'root': [u'course', u'course'], 'blocks': blocks}
+
+
+def deep_getsizeof(obj, seen=None):
+    """
+    Returns the size in bytes of obj and of all the objects it refers to, counting each object once.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_getsizeof(key, seen) + deep_getsizeof(value, seen) for key, value in obj.iteritems())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_getsizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_getsizeof(getattr(obj, attr), seen) for attr in obj.__slots__ if hasattr(obj, attr))
+    elif hasattr(obj, '__dict__'):
+        size += deep_getsizeof(obj.__dict__, seen)
+    return size
+
+
+@ddt.ddt
+@unittest.skip
+class StructureMemory(unittest.TestCase):
+    """
+    Checks the memory taken by the structures of generated courses.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*COURSE_SHAPES)
+    def test_structure_memory(self, shape):
+        mongo_structure = make_mongo_structure(shape)
+        mongo_size = deep_getsizeof(mongo_structure)
+        structure = structure_from_mongo(mongo_structure)
+
+        # Every reference to a block is its single BlockKey, and all the
+        # blocks of a type share their block type.
+        block_keys = {key: key for key in structure['blocks']}
+        block_types = {key.type: key.type for key in block_keys}
+        self.assertIs(structure['root'], block_keys[structure['root']])
+        for key, block in structure['blocks'].iteritems():
+            self.assertIs(block.block_type, block_types[key.type])
+            for child in block.fields.get('children', []):
+                self.assertIs(child, block_keys[child])
+
+        # So the structure takes less memory than the document it was read from.
+        structure_size = deep_getsizeof(structure)
+        self.assertLess(structure_size, mongo_size)
+
+        # The process structure cache estimates this size from the pickle.
+        pickled_size = len(pickle.dumps(structure, pickle.HIGHEST_PROTOCOL))
+        self.assertLessEqual(structure_size, pickled_size * STRUCTURE_MEMORY_PER_PICKLED_BYTE)
@@ -82,6 +82,7 @@ from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
 from types import NoneType
@@ -392,13 +393,17 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
 
             # The definition hasn't been loaded from the db yet, so load it
             if definition is None:
+                self._record_definition_lookups(misses=1)
                 definition = self.db_connection.get_definition(definition_guid, course_key)
                 bulk_write_record.definitions[definition_guid] = definition
                 if definition is not None:
                     bulk_write_record.definitions_in_db.add(definition_guid)
+            else:
+                self._record_definition_lookups(hits=1)
 
             return definition
         else:
+            self._record_definition_lookups(misses=1)
             # cast string to ObjectId if necessary
             definition_guid = course_key.as_object_id(definition_guid)
             return self.db_connection.get_definition(definition_guid, course_key)
@@ -641,13 +646,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, prefetch_definitions=False, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param prefetch_definitions: if True, the missing definitions of the blocks being loaded are fetched
+            with a single query even when loading lazily, rather than one query per block when first needed.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
+        self.prefetch_definitions = prefetch_definitions
+
         self.db_connection = MongoConnection(**doc_store_config)
         self.db = self.db_connection.database
 
@@ -722,37 +731,66 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 )
 
             # This method supports lazy loading, where the descendent definitions aren't loaded
-            # until they're actually needed.
-            if not lazy:
-                # Non-lazy loading: Load all descendants by id.
-                descendent_definitions = self.get_definitions(
-                    course_key,
-                    [
-                        block.definition
-                        for block in new_module_data.itervalues()
-                    ]
-                )
-                # Turn definitions into a map.
-                definitions = {definition['_id']: definition
-                               for definition in descendent_definitions}
-
-                for block in new_module_data.itervalues():
-                    if block.definition in definitions:
-                        definition = definitions[block.definition]
-                        # convert_fields gets done later in the runtime's xblock_from_json
-                        block.fields.update(definition.get('fields'))
-                        block.definition_loaded = True
+            # until they're actually needed, unless they are to be prefetched.
+            if not lazy or self.prefetch_definitions:
+                self._load_definitions(course_key, new_module_data.values())
 
             system.module_data.update(new_module_data)
             return system.module_data
 
+    def _load_definitions(self, course_key, blocks):
+        """
+        Load the definitions of the given BlockData which haven't been loaded yet
+        into their fields, with a single query.
+        """
+        missing_blocks = [
+            block for block in blocks
+            if block.definition is not None and not block.definition_loaded
+        ]
+        self._record_definition_lookups(hits=len(blocks) - len(missing_blocks), misses=len(missing_blocks))
+        if not missing_blocks:
+            return
+
+        # Turn definitions into a map.
+        definitions = {
+            definition['_id']: definition
+            for definition in self.get_definitions(course_key, [block.definition for block in missing_blocks])
+        }
+
+        for block in missing_blocks:
+            if block.definition in definitions:
+                definition = definitions[block.definition]
+                # convert_fields gets done later in the runtime's xblock_from_json
+                block.fields.update(definition.get('fields'))
+                block.definition_loaded = True
+
+    def _record_definition_lookups(self, hits=0, misses=0):
+        """
+        Add to the counts of the definitions which were needed during this request
+        and were already loaded (hits) or had to be looked up (misses).
+        """
+        if self.request_cache is not None:
+            lookups = self.request_cache.data.setdefault('definition_lookups', {'hits': 0, 'misses': 0})
+            lookups['hits'] += hits
+            lookups['misses'] += misses
+
+    def get_definition_lookups(self):
+        """
+        Return the counts of definition hits and misses during this request, as
+        a dict with 'hits' and 'misses' keys.
+        """
+        if self.request_cache is None:
+            return {'hits': 0, 'misses': 0}
+        return dict(self.request_cache.data.get('definition_lookups', {'hits': 0, 'misses': 0}))
+
     @contract(course_entry=CourseEnvelope, block_keys="list(BlockKey)", depth="int | None")
     def _load_items(self, course_entry, block_keys, depth=0, **kwargs):
         """
         Load & cache the given blocks from the course. May return the blocks in any order.
 
-        Load the definitions into each block if lazy is in kwargs and is False;
-        otherwise, do not load the definitions - they'll be loaded later when needed.
+        Load the definitions into each block if lazy is in kwargs and is False or if
+        definitions are prefetched; otherwise, do not load the definitions - they'll be
+        loaded later when needed.
         """
         runtime = self._get_cache(course_entry.structure['_id'])
         if runtime is None:
@@ -760,6 +798,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             runtime = self.create_runtime(course_entry, lazy)
             self._add_cache(course_entry.structure['_id'], runtime)
             self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy)
+        elif self.prefetch_definitions:
+            # The runtime may not have cached these blocks to the requested depth yet,
+            # in which case their definitions would otherwise be fetched one at a time.
+            self.cache_items(runtime, block_keys, course_entry.course_key, depth, runtime.lazy)
 
         return [runtime.load_item(block_key, course_entry, **kwargs) for block_key in block_keys]
 
@@ -792,12 +834,38 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return
 
         if course_version_guid:
-            try:
-                del self.request_cache.data.setdefault('course_cache', {})[course_version_guid]
-            except KeyError:
-                pass
+            for cache_name in ('course_cache', 'structure_index_cache'):
+                try:
+                    del self.request_cache.data.setdefault(cache_name, {})[course_version_guid]
+                except KeyError:
+                    pass
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data['structure_index_cache'] = {}
+
+    def _get_structure_index(self, course):
+        """
+        Return the :class:`.StructureIndex` of the structure of the given CourseEnvelope,
+        or None if the structure is being edited in the active bulk operation and so may
+        still change.
+
+        The index is built on first use and kept in the request cache keyed by the
+        structure's version, since every lookup of a course returns a new copy of its
+        structure.
+        """
+        structure = course.structure
+        bulk_write_record = self._get_bulk_ops_record(course.course_key)
+        if bulk_write_record.active and structure['_id'] not in bulk_write_record.structures_in_db:
+            return None
+
+        if self.request_cache is None:
+            return StructureIndex(structure)
+
+        index_cache = self.request_cache.data.setdefault('structure_index_cache', {})
+        index = index_cache.get(structure['_id'])
+        if index is None:
+            index = index_cache[structure['_id']] = StructureIndex(structure)
+        return index
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -1121,8 +1189,13 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # don't expect caller to know that children are in fields
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
+
+        blocks = course.structure['blocks']
+        block_keys = self._get_block_keys_of_type(course, qualifiers.get('block_type'))
+        if block_keys is None:
+            block_keys = blocks.iterkeys()
+        for block_id in block_keys:
+            if _block_matches_all(blocks[block_id]):
                 items.append(block_id)
 
         if len(items) > 0:
@@ -1130,6 +1203,43 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
+    def _get_block_keys_of_type(self, course, block_type):
+        """
+        Return the keys of the blocks of the given CourseEnvelope which may match the
+        given block_type qualifier, using the structure's index, or None if they
+        cannot be narrowed down that way.
+
+        Only a single block type or an ``$in`` list of block types can be looked up.
+        """
+        if isinstance(block_type, basestring):
+            block_types = [block_type]
+        elif (
+                isinstance(block_type, dict) and block_type.keys() == ['$in'] and
+                all(isinstance(value, basestring) for value in block_type['$in'])
+        ):
+            block_types = block_type['$in']
+        else:
+            return None
+
+        index = self._get_structure_index(course)
+        if index is None:
+            return None
+        return [
+            block_key
+            for type_name in set(block_types)
+            for block_key in index.get_blocks_of_type(type_name)
+        ]
+
+    def _get_parents(self, block_key, course):
+        """
+        Return the keys of the parents of block_key in the structure of the given
+        CourseEnvelope, using the structure's index if it has one.
+        """
+        index = self._get_structure_index(course)
+        if index is None:
+            return self._get_parents_from_structure(block_key, course.structure)
+        return index.get_parents(block_key)
+
     def has_path_to_root(self, block_key, course):
         """
         Check recursively if an xblock has a path to the course root
@@ -1140,7 +1250,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         :return Bool: whether or not component has path to the root
         """
 
-        xblock_parents = self._get_parents_from_structure(block_key, course.structure)
+        xblock_parents = self._get_parents(block_key, course)
         if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
             # Found, xblock has the path to the root
             return True
@@ -1160,7 +1270,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        all_parent_ids = self._get_parents(BlockKey.from_usage_key(locator), course)
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
@@ -0,0 +1,39 @@
+"""
+Secondary indexes over the blocks of a split modulestore structure.
+"""
+from collections import defaultdict
+
+
+class StructureIndex(object):
+    """
+    Maps of each block to its parents and of each block type to its blocks,
+    built with a single pass over the blocks of a structure.
+
+    Structures which have been persisted never change, so an index built for
+    one remains valid for as long as the structure with that ``version``
+    is used. It must not be used for a structure which is still being edited.
+    """
+    def __init__(self, structure):
+        self.version = structure['_id']
+        self._parents = defaultdict(list)
+        self._blocks_by_type = defaultdict(list)
+
+        for block_key, block_data in structure['blocks'].iteritems():
+            self._blocks_by_type[block_data.block_type].append(block_key)
+            for child_key in block_data.fields.get('children', []):
+                parents = self._parents[child_key]
+                # a block may list the same child more than once; record the parent only once
+                if not parents or parents[-1] != block_key:
+                    parents.append(block_key)
+
+    def get_parents(self, block_key):
+        """
+        Return the list of BlockKeys of the blocks which have block_key among their children.
+        """
+        return list(self._parents.get(block_key, []))
+
+    def get_blocks_of_type(self, block_type):
+        """
+        Return the list of BlockKeys of the blocks of the given block_type.
+        """
+        return list(self._blocks_by_type.get(block_type, []))
@@ -16,6 +16,7 @@ from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
 import ddt
+from mock import patch
 from __builtin__ import delattr
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
@@ -146,6 +147,41 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(True, False)
+    def test_export_for_course_incremental(self, deprecated):
+        """
+        Test that an incremental export only writes the changed assets, and removes the deleted ones
+        """
+        self.set_up_assets(deprecated)
+        root_dir = path.Path(mkdtemp())
+        self.addCleanup(shutil.rmtree, root_dir)
+        manifest_file = path.Path(root_dir / "manifest.json")
+
+        def export():
+            """
+            Export the assets of course1, returning the names of the assets read from the contentstore.
+            """
+            with patch.object(self.contentstore, 'find', wraps=self.contentstore.find) as mock_find:
+                self.contentstore.export_all_for_course(
+                    self.course1_key, root_dir, path.Path(root_dir / "policy.json"),
+                    workers=2, manifest_file=manifest_file,
+                )
+            return set(call[0][0].name for call in mock_find.call_args_list)
+
+        self.assertEqual(export(), set(self.course1_files))
+        self.assertEqual(export(), set())
+
+        # replace the content of an asset and delete another one
+        changed_file, deleted_file = self.course1_files[1:]
+        asset_key = self.course1_key.make_asset_key('asset', changed_file)
+        self.save_asset(deleted_file, asset_key, changed_file, False)
+        self.contentstore.delete(self.course1_key.make_asset_key('asset', deleted_file))
+
+        self.assertEqual(export(), {changed_file})
+        self.assertFalse(path.Path(root_dir / deleted_file).isfile())
+        with open(root_dir / changed_file, 'rb') as exported_file:
+            self.assertEqual(exported_file.read(), self.contentstore.find(asset_key).data)
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
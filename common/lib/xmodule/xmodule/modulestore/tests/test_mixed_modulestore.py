@@ -408,6 +408,53 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
         with self.assertRaises(UnsupportedRevisionError):
             self.store.get_item(self.fake_location, revision=ModuleStoreEnum.RevisionOption.draft_preferred)
 
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_get_item_request_cache(self, default_ms):
+        """
+        Test that get_item returns the xblock cached during the request until the course is written to.
+        """
+        self.initdb(default_ms)
+        self._create_block_hierarchy()
+        self.store.cache_items = True
+        self.store.request_cache = Mock(data={})
+
+        problem = self.store.get_item(self.problem_x1a_1)
+        with check_mongo_calls(0):
+            self.assertIs(self.store.get_item(self.problem_x1a_1), problem)
+        self.assertEqual(self.store.get_item_lookups(), {'hits': 1, 'misses': 1})
+
+        # a different depth is a different lookup
+        self.assertIsNot(self.store.get_item(self.problem_x1a_1, depth=None), problem)
+        self.assertEqual(self.store.get_item_lookups(), {'hits': 1, 'misses': 2})
+
+        # writes to the course clear its cached xblocks
+        problem.display_name = 'Updated Problem'
+        self.store.update_item(problem, self.user_id)
+        updated_problem = self.store.get_item(self.problem_x1a_1)
+        self.assertIsNot(updated_problem, problem)
+        self.assertEqual(updated_problem.display_name, 'Updated Problem')
+        self.assertEqual(self.store.get_item_lookups(), {'hits': 1, 'misses': 3})
+
+        # lookups which keep the version or branch of the location are not cached
+        self.assertIsNot(self.store.get_item(self.problem_x1a_1, remove_branch=False), updated_problem)
+        self.assertIsNot(self.store.get_item(self.problem_x1a_1, remove_version=False), updated_problem)
+        self.assertEqual(self.store.get_item_lookups(), {'hits': 1, 'misses': 3})
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_get_item_outside_request(self, default_ms):
+        """
+        Test that get_item does not cache xblocks outside of a request, e.g. in celery tasks,
+        where nothing clears the request cache.
+        """
+        self.initdb(default_ms)
+        self._create_block_hierarchy()
+        self.store.cache_items = True
+        self.store.request_cache = Mock(data={}, request=None)
+
+        problem = self.store.get_item(self.problem_x1a_1)
+        self.assertIsNot(self.store.get_item(self.problem_x1a_1), problem)
+        self.assertEqual(self.store.request_cache.data, {})
+
     # Draft:
     #    wildcard query, 6! load pertinent items for inheritance calls, load parents, course root fetch (why)
     # Split:
@@ -436,11 +483,12 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                 revision=ModuleStoreEnum.RevisionOption.draft_preferred
             )
 
-    # draft: get draft, get ancestors up to course (2-6), compute inheritance
+    # draft: get draft, get ancestors up to course (2-6)
+    #    (the cached inheritance tree doesn't depend on leaves, so it isn't updated)
     #    sends: update problem and then each ancestor up to course (edit info)
     # split: active_versions, definitions (calculator field), structures
     #  2 sends to update index & structure (note, it would also be definition if a content field changed)
-    @ddt.data((ModuleStoreEnum.Type.mongo, 7, 5), (ModuleStoreEnum.Type.split, 3, 2))
+    @ddt.data((ModuleStoreEnum.Type.mongo, 6, 5), (ModuleStoreEnum.Type.split, 3, 2))
     @ddt.unpack
     def test_update_item(self, default_ms, max_find, max_send):
         """
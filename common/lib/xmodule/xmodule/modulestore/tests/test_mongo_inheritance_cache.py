@@ -0,0 +1,122 @@
+"""
+Tests of the incremental updates of the cached metadata inheritance tree of the Mongo modulestore.
+"""
+# pylint: disable=protected-access
+from unittest import TestCase
+
+from mock import patch
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.mongo import base
+from xmodule.modulestore.tests.utils import MongoModulestoreBuilder
+
+
+class TestMetadataInheritanceCache(TestCase):
+    """
+    Tests that updating xblocks keeps the cached metadata inheritance tree
+    identical to the tree recomputed from scratch.
+    """
+    def setUp(self):
+        super(TestMetadataInheritanceCache, self).setUp()
+        builder = MongoModulestoreBuilder().build()
+        __, self.store = builder.__enter__()
+        self.addCleanup(builder.__exit__, None, None, None)
+
+        self.user_id = ModuleStoreEnum.UserID.test
+        self.course = self.store.create_course('org', 'course', 'run', self.user_id)
+        self.chapter = self.store.create_child(self.user_id, self.course.location, 'chapter')
+        self.sequential = self.store.create_child(self.user_id, self.chapter.location, 'sequential')
+        self.problem = self.store.create_child(self.user_id, self.sequential.location, 'problem')
+
+        # make sure the tree is cached
+        self.store.refresh_cached_metadata_inheritance_tree(self.course.id)
+
+    def url(self, xblock):
+        """
+        The key of the given xblock in the inheritance tree.
+        """
+        return unicode(base.as_published(xblock.location))
+
+    def assert_tree_up_to_date(self):
+        """
+        Assert that the cached tree is the one computed from scratch.
+        """
+        cached_tree = self.store._get_cached_metadata_inheritance_tree(self.course.id)
+        tree = self.store._expand_metadata_inheritance_tree(
+            self.store._compute_metadata_inheritance_tree(self.course.id)
+        )
+        self.assertEqual(cached_tree, tree)
+        return cached_tree
+
+    def test_update_container(self):
+        self.chapter.max_attempts = 3
+        with patch.object(
+            self.store, '_compute_metadata_inheritance_tree', wraps=self.store._compute_metadata_inheritance_tree
+        ) as mock_compute:
+            self.store.update_item(self.chapter, self.user_id)
+        # only the chapter is reloaded
+        mock_compute.assert_called_once_with(self.course.id, self.chapter.location)
+
+        tree = self.assert_tree_up_to_date()
+        self.assertEqual(tree[self.url(self.problem)]['max_attempts'], 3)
+        self.assertEqual(
+            tree[self.url(self.problem)]['parent'][self.store.get_branch_setting()],
+            self.url(self.sequential),
+        )
+
+    def test_add_child(self):
+        vertical = self.store.create_child(self.user_id, self.sequential.location, 'vertical')
+        self.store.create_child(self.user_id, vertical.location, 'html')
+        self.sequential = self.store.get_item(self.sequential.location)
+        self.sequential.max_attempts = 5
+        self.store.update_item(self.sequential, self.user_id)
+
+        tree = self.assert_tree_up_to_date()
+        self.assertEqual(tree[self.url(vertical)]['max_attempts'], 5)
+
+    def test_update_leaf(self):
+        self.problem.max_attempts = 2
+        with patch.object(self.store, '_compute_metadata_inheritance_tree') as mock_compute:
+            self.store.update_item(self.problem, self.user_id)
+        self.assertFalse(mock_compute.called)
+
+        self.assert_tree_up_to_date()
+
+    @patch.object(base, 'MAX_INCREMENTAL_INHERITANCE_UPDATES', 1)
+    def test_recompute_after_incremental_updates(self):
+        self.chapter.max_attempts = 3
+        self.store.update_item(self.chapter, self.user_id)
+
+        self.chapter.max_attempts = 4
+        with patch.object(
+            self.store, '_compute_metadata_inheritance_tree', wraps=self.store._compute_metadata_inheritance_tree
+        ) as mock_compute:
+            self.store.update_item(self.chapter, self.user_id)
+        mock_compute.assert_called_once_with(self.course.id)
+
+        tree = self.assert_tree_up_to_date()
+        self.assertEqual(tree[self.url(self.problem)]['max_attempts'], 4)
+
+    def test_concurrent_update(self):
+        # another process updates the sequential, but its tree is overwritten
+        self.sequential.max_attempts = 5
+        with patch.object(self.store, '_cache_metadata_inheritance_tree'):
+            self.store.update_item(self.sequential, self.user_id)
+
+        self.chapter.max_attempts = 3
+        with patch.object(
+            self.store, '_compute_metadata_inheritance_tree', wraps=self.store._compute_metadata_inheritance_tree
+        ) as mock_compute:
+            self.store.update_item(self.chapter, self.user_id)
+        # the cached tree missed an update, so it is recomputed
+        mock_compute.assert_called_once_with(self.course.id)
+
+        tree = self.assert_tree_up_to_date()
+        self.assertEqual(tree[self.url(self.problem)]['max_attempts'], 5)
+
+    def test_read_tree_which_missed_changes(self):
+        self.assertIsNotNone(self.store._get_cached_compact_inheritance_tree(self.course.id))
+
+        # another process counts a change to the course before caching its tree
+        self.store._increment_inheritance_tree_version(self.course.id)
+        self.assertIsNone(self.store._get_cached_compact_inheritance_tree(self.course.id))
@@ -1,7 +1,7 @@
 """
     Test split modulestore w/o using any django stuff.
 """
-from mock import patch
+from mock import Mock, patch
 import datetime
 from importlib import import_module
 from path import Path as path
@@ -14,6 +14,7 @@ import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -32,6 +33,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import PROCESS_STRUCTURE_CACHE
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -763,6 +765,36 @@ class SplitModuleCourseTests(SplitModuleTest):
         self.assertIn(BlockKey('chapter', 'chapter1'), block_map)
         self.assertIn(BlockKey('problem', 'problem3_2'), block_map)
 
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_cache_items_prefetch_definitions(self, _from_json):
+        """
+        Test that prefetching loads the definitions of lazily loaded blocks with a single query.
+        """
+        store = modulestore()
+        store.prefetch_definitions = True
+        store.request_cache = Mock(data={})
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        course = store.get_course(locator)
+
+        with patch.object(
+            store.db_connection, 'get_definitions', wraps=store.db_connection.get_definitions
+        ) as mock_get_definitions:
+            with patch.object(store.db_connection, 'get_definition') as mock_get_definition:
+                # the course's runtime is cached, so loading its subtree reuses it
+                store.get_item(course.location, depth=None)
+                self.assertEqual(mock_get_definitions.call_count, 1)
+                for block_key in (BlockKey('chapter', 'chapter1'), BlockKey('problem', 'problem3_2')):
+                    self.assertTrue(course.system.module_data[block_key].definition_loaded)
+                lookups = store.get_definition_lookups()
+                self.assertGreater(lookups['misses'], 0)
+
+                # everything is already loaded the second time around
+                store.get_item(course.location, depth=None)
+                self.assertEqual(mock_get_definitions.call_count, 1)
+                self.assertFalse(mock_get_definition.called)
+                self.assertEqual(store.get_definition_lookups()['misses'], lookups['misses'])
+                self.assertGreater(store.get_definition_lookups()['hits'], lookups['hits'])
+
     @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
     def test_course_successors(self, _from_json):
         """
@@ -940,6 +972,8 @@ class TestCourseStructureCache(SplitModuleTest):
         self.cache.clear()
         # ... and after
         self.addCleanup(self.cache.clear)
+        PROCESS_STRUCTURE_CACHE.clear()
+        self.addCleanup(PROCESS_STRUCTURE_CACHE.clear)
 
         # make a new course:
         self.user = random.getrandbits(32)
@@ -965,6 +999,39 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES=1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_process_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the structure is still kept in the process once evicted from the cache
+        self.cache.clear()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        self.assertEqual(cached_structure, not_cached_structure)
+
+        # each request gets its own copy of the blocks
+        root_block = cached_structure['blocks'][cached_structure['root']]
+        self.assertIsNot(root_block, not_cached_structure['blocks'][cached_structure['root']])
+        root_block.fields['display_name'] = 'Changed'
+        with check_mongo_calls(0):
+            self.assertEqual(self._get_structure(self.new_course), not_cached_structure)
+
+    @override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES=0)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_process_cache_disabled(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+
+        self.cache.clear()
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
     def test_course_structure_cache_no_cache_configured(self, mock_get_cache):
         mock_get_cache.side_effect = InvalidCacheBackendError
@@ -1208,6 +1275,8 @@ class SplitModuleItemTests(SplitModuleTest):
         self.assertEqual(len(matches), 1)
         matches = modulestore().get_items(locator, settings={'group_access': {'$exists': False}})
         self.assertEqual(len(matches), 6)
+        matches = modulestore().get_items(locator, qualifiers={'category': {'$in': ['chapter', 'course', 'garbage']}})
+        self.assertEqual(len(matches), 4)
 
     def test_get_parents(self):
         '''
@@ -1415,6 +1484,34 @@ class TestItemCrud(SplitModuleTest):
         chapter = modulestore().get_item(chapter_locator)
         self.assertIn(problem_locator, version_agnostic(chapter.children))
 
+    def test_get_parent_location_in_bulk_operation(self):
+        """
+        Test that get_parent_location sees the edits made earlier in the same bulk operation
+        """
+        user = random.getrandbits(32)
+        course_key = CourseLocator('test_org', 'test_parents', 'test_run')
+        with modulestore().bulk_operations(course_key):
+            new_course = modulestore().create_course('test_org', 'test_parents', 'test_run', user, BRANCH_NAME_DRAFT)
+            chapter = modulestore().create_child(user, new_course.location, 'chapter')
+            self.assertEqual(
+                modulestore().get_parent_location(chapter.location).version_agnostic(),
+                new_course.location.version_agnostic()
+            )
+            sequential = modulestore().create_child(user, chapter.location, 'sequential')
+            self.assertEqual(
+                modulestore().get_parent_location(sequential.location).version_agnostic(),
+                chapter.location.version_agnostic()
+            )
+            matches = modulestore().get_items(
+                new_course.location.course_key.version_agnostic(), qualifiers={'category': 'sequential'}
+            )
+            self.assertEqual(len(matches), 1)
+
+        self.assertEqual(
+            modulestore().get_parent_location(sequential.location.version_agnostic()).version_agnostic(),
+            chapter.location.version_agnostic()
+        )
+
     def test_create_bulk_operations(self):
         """
         Test create_item using bulk_operations
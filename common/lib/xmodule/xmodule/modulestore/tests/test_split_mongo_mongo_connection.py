@@ -1,7 +1,13 @@
 """ Test the behavior of split_mongo/MongoConnection """
+import cPickle as pickle
 import unittest
+from bson.objectid import ObjectId
 from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    MongoConnection, StructureLRUCache, structure_from_mongo, _SHARED_BLOCK_TYPES
+)
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -17,3 +23,158 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestStructureFromMongo(unittest.TestCase):
+    """ Test the conversion of course structures read from Mongo """
+    def _mongo_structure(self):
+        """ Return a structure document with a chapter, two sequentials and a problem """
+        def block(block_type, block_id, children=()):
+            """ Return the document of a block """
+            return {
+                'block_type': block_type,
+                'block_id': block_id,
+                'fields': {'children': [list(child) for child in children]},
+                'definition': ObjectId(),
+                'edit_info': {'edited_by': 'me'},
+            }
+        return {
+            '_id': ObjectId(),
+            'root': ['chapter', 'chapter'],
+            'blocks': [
+                block(u'chapter', u'chapter', [(u'sequential', u'seq1'), (u'sequential', u'seq2')]),
+                block(u'sequential', u'seq1', [(u'problem', u'problem')]),
+                block(u'sequential', u'seq2', [(u'problem', u'problem')]),
+                block(u'problem', u'problem'),
+            ],
+        }
+
+    def test_shared_block_keys(self):
+        structure = structure_from_mongo(self._mongo_structure())
+        block_keys = {key: key for key in structure['blocks']}
+        self.assertIs(structure['root'], block_keys[BlockKey('chapter', 'chapter')])
+        for block_data in structure['blocks'].itervalues():
+            for child in block_data.fields['children']:
+                self.assertIs(child, block_keys[child])
+                self.assertIs(structure['blocks'][child].block_type, child.type)
+
+    def test_shared_block_types(self):
+        structure = structure_from_mongo(self._mongo_structure())
+        # Block types read separately from Mongo are different strings.
+        other_mongo_structure = self._mongo_structure()
+        for block in other_mongo_structure['blocks']:
+            block['block_type'] = u'{}'.format(block['block_type'])
+        other_structure = structure_from_mongo(other_mongo_structure)
+        for key in structure['blocks']:
+            self.assertIs(structure['blocks'][key].block_type, other_structure['blocks'][key].block_type)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.MAX_SHARED_BLOCK_TYPES', 2)
+    @patch.dict('xmodule.modulestore.split_mongo.mongo_connection._SHARED_BLOCK_TYPES', clear=True)
+    def test_shared_block_types_are_bounded(self):
+        structure = structure_from_mongo(self._mongo_structure())
+        self.assertEqual(len(_SHARED_BLOCK_TYPES), 2)
+        self.assertEqual(len(structure['blocks']), 4)
+
+    def test_pickle(self):
+        structure = structure_from_mongo(self._mongo_structure())
+        problem = structure['blocks'][BlockKey('problem', 'problem')]
+        problem.definition_loaded = True
+        problem.edit_info._subtree_edited_by = 'me'  # pylint: disable=protected-access
+        self.assertFalse(hasattr(problem, '__dict__'))
+
+        unpickled = pickle.loads(pickle.dumps(structure, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(unpickled['blocks'], structure['blocks'])
+        unpickled_problem = unpickled['blocks'][BlockKey('problem', 'problem')]
+        self.assertTrue(unpickled_problem.definition_loaded)
+        self.assertEqual(unpickled_problem.edit_info._subtree_edited_by, 'me')  # pylint: disable=protected-access
+
+
+class TestStructureLRUCache(unittest.TestCase):
+    """ Test the in-process cache of course structures """
+    def setUp(self):
+        super(TestStructureLRUCache, self).setUp()
+        self.cache = StructureLRUCache()
+
+    def _structure(self):
+        """ Return a structure with a single block """
+        root = BlockKey('course', 'course')
+        return {
+            '_id': ObjectId(),
+            'root': root,
+            'blocks': {root: BlockData(block_type='course', fields={'children': []})},
+        }
+
+    def test_get_returns_copies(self):
+        structure = self._structure()
+        self.cache.set(structure['_id'], structure, 1, 10)
+
+        # changes to the cached structure don't affect the cache
+        structure['blocks'][structure['root']].fields['display_name'] = 'Changed'
+
+        cached_structure = self.cache.get(structure['_id'])
+        self.assertEqual(cached_structure['_id'], structure['_id'])
+        block_data = cached_structure['blocks'][structure['root']]
+        self.assertNotIn('display_name', block_data.fields)
+
+        # nor do changes to a structure that was handed out
+        block_data.fields['display_name'] = 'Changed'
+        block_data.definition_loaded = True
+        block_data.edit_info._subtree_edited_by = 'user'  # pylint: disable=protected-access
+        other_block_data = self.cache.get(structure['_id'])['blocks'][structure['root']]
+        self.assertNotIn('display_name', other_block_data.fields)
+        self.assertFalse(other_block_data.definition_loaded)
+        self.assertIsNone(other_block_data.edit_info._subtree_edited_by)  # pylint: disable=protected-access
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get(ObjectId()))
+
+    def test_evicts_least_recently_used(self):
+        structures = [self._structure() for __ in range(3)]
+        self.assertEqual(self.cache.set(structures[0]['_id'], structures[0], 4, 10), 0)
+        self.assertEqual(self.cache.set(structures[1]['_id'], structures[1], 4, 10), 0)
+
+        # use the first structure, so that the second is the least recently used
+        self.assertIsNotNone(self.cache.get(structures[0]['_id']))
+        self.assertEqual(self.cache.set(structures[2]['_id'], structures[2], 4, 10), 1)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.total_size, 8)
+        self.assertIsNotNone(self.cache.get(structures[0]['_id']))
+        self.assertIsNone(self.cache.get(structures[1]['_id']))
+        self.assertIsNotNone(self.cache.get(structures[2]['_id']))
+
+    def test_evicts_until_within_size(self):
+        structures = [self._structure() for __ in range(3)]
+        self.cache.set(structures[0]['_id'], structures[0], 4, 10)
+        self.cache.set(structures[1]['_id'], structures[1], 4, 10)
+        self.assertEqual(self.cache.set(structures[2]['_id'], structures[2], 9, 10), 2)
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.total_size, 9)
+        self.assertIsNotNone(self.cache.get(structures[2]['_id']))
+
+    def test_set_too_large(self):
+        structures = [self._structure() for __ in range(2)]
+        self.cache.set(structures[0]['_id'], structures[0], 4, 10)
+        self.assertEqual(self.cache.set(structures[1]['_id'], structures[1], 11, 10), 0)
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertIsNone(self.cache.get(structures[1]['_id']))
+
+    def test_set_disabled(self):
+        structure = self._structure()
+        self.assertEqual(self.cache.set(structure['_id'], structure, 1, 0), 0)
+        self.assertEqual(len(self.cache), 0)
+        self.assertIsNone(self.cache.get(structure['_id']))
+
+    def test_set_again(self):
+        structure = self._structure()
+        self.cache.set(structure['_id'], structure, 4, 10)
+        self.cache.set(structure['_id'], structure, 6, 10)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.total_size, 6)
+
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.total_size, 0)
+        self.assertIsNone(self.cache.get(structure['_id']))
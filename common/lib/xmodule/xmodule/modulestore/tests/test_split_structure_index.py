@@ -0,0 +1,64 @@
+"""
+Tests for the split modulestore's StructureIndex.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
+
+
+class TestStructureIndex(unittest.TestCase):
+    """
+    Tests for StructureIndex.
+    """
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'chapter')
+        self.sequential_1 = BlockKey('sequential', 'sequential_1')
+        self.sequential_2 = BlockKey('sequential', 'sequential_2')
+        self.shared = BlockKey('html', 'shared')
+        self.orphan = BlockKey('html', 'orphan')
+        children = {
+            self.course: [self.chapter],
+            self.chapter: [self.sequential_1, self.sequential_2],
+            self.sequential_1: [self.shared, self.shared],
+            self.sequential_2: [self.shared],
+            self.shared: [],
+            self.orphan: [],
+        }
+        self.structure = {
+            '_id': ObjectId(),
+            'root': self.course,
+            'blocks': {
+                block_key: BlockData(block_type=block_key.type, fields={'children': block_children})
+                for block_key, block_children in children.iteritems()
+            },
+        }
+        self.index = StructureIndex(self.structure)
+
+    def test_version(self):
+        self.assertEqual(self.index.version, self.structure['_id'])
+
+    def test_get_parents(self):
+        self.assertEqual(self.index.get_parents(self.course), [])
+        self.assertEqual(self.index.get_parents(self.chapter), [self.course])
+        self.assertEqual(self.index.get_parents(self.sequential_1), [self.chapter])
+        self.assertItemsEqual(self.index.get_parents(self.shared), [self.sequential_1, self.sequential_2])
+        self.assertEqual(self.index.get_parents(self.orphan), [])
+        self.assertEqual(self.index.get_parents(BlockKey('html', 'nosuchblock')), [])
+
+    def test_get_blocks_of_type(self):
+        self.assertEqual(self.index.get_blocks_of_type('course'), [self.course])
+        self.assertItemsEqual(self.index.get_blocks_of_type('sequential'), [self.sequential_1, self.sequential_2])
+        self.assertItemsEqual(self.index.get_blocks_of_type('html'), [self.shared, self.orphan])
+        self.assertEqual(self.index.get_blocks_of_type('garbage'), [])
+
+    def test_returns_copies(self):
+        self.index.get_parents(self.shared).append(self.orphan)
+        self.index.get_blocks_of_type('course').append(self.orphan)
+        self.assertNotIn(self.orphan, self.index.get_parents(self.shared))
+        self.assertEqual(self.index.get_blocks_of_type('course'), [self.course])
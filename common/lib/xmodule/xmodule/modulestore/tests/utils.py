@@ -216,6 +216,40 @@ class MemoryCache(object):
         """
         self._data[key] = value
 
+    def add(self, key, value):
+        """
+        Set a key in the cache, unless it is already set.
+
+        Returns whether the key was set.
+        """
+        if key in self._data:
+            return False
+        self._data[key] = value
+        return True
+
+    def get_many(self, keys):
+        """
+        Get the keys which are set in the cache, as a dictionary.
+        """
+        return {key: self._data[key] for key in keys if key in self._data}
+
+    def incr(self, key, delta=1):
+        """
+        Add delta to the value of a key in the cache, and return the new value.
+
+        Raises ValueError if the key isn't set.
+        """
+        if key not in self._data:
+            raise ValueError("Key '{}' not found".format(key))
+        self._data[key] += delta
+        return self._data[key]
+
+    def delete(self, key):
+        """
+        Remove a key from the cache.
+        """
+        self._data.pop(key, None)
+
 
 class MongoContentstoreBuilder(object):
     """
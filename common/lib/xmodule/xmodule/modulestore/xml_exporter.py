@@ -29,6 +29,9 @@ EXPORT_VERSION_KEY = "export_format"
 
 DEFAULT_CONTENT_FIELDS = ['metadata', 'data']
 
+# Number of static asset files written concurrently during an export.
+ASSET_EXPORT_WORKERS = 4
+
 
 def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
     """
@@ -106,7 +109,10 @@ class ExportManager(object):
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(
+            self, modulestore, contentstore, courselike_key, root_dir, target_dir,
+            asset_export_workers=ASSET_EXPORT_WORKERS, asset_manifest_file=None
+    ):
         """
         Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`.
 
@@ -115,12 +121,18 @@ class ExportManager(object):
         `courselike_key`: The Locator of the Descriptor to export
         `root_dir`: The directory to write the exported xml to
         `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `asset_export_workers`: The number of static asset files written concurrently
+        `asset_manifest_file`: If given, the path of a file recording the static assets written by the export,
+            so that the ones left by a previous export to the same directory with the same manifest file are only
+            written again if their content changed. It must be outside of the exported directory.
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = target_dir
+        self.asset_export_workers = asset_export_workers
+        self.asset_manifest_file = asset_manifest_file
 
     @abstractmethod
     def get_key(self):
@@ -150,6 +162,18 @@ class ExportManager(object):
         Get the target courselike object for this export.
         """
 
+    def export_static_assets(self, root_courselike_dir):
+        """
+        Export the static assets of the courselike from the contentstore to root_courselike_dir.
+        """
+        self.contentstore.export_all_for_course(
+            self.courselike_key,
+            root_courselike_dir + '/static/',
+            root_courselike_dir + '/policies/assets.json',
+            workers=self.asset_export_workers,
+            manifest_file=self.asset_manifest_file,
+        )
+
     def export(self):
         """
         Perform the export given the parameters handed to this class at init.
@@ -218,11 +242,7 @@ class CourseExportManager(ExportManager):
         # export the static assets
         policies_dir = export_fs.makeopendir('policies')
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(root_courselike_dir)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -322,11 +342,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makeopendir('policies')
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(root_courselike_dir)
 
     def post_process(self, root, export_fs):
         """
@@ -341,18 +357,18 @@ class LibraryExportManager(ExportManager):
         xml_file.close()
 
 
-def export_course_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
+def export_course_to_xml(modulestore, contentstore, course_key, root_dir, course_dir, **kwargs):
     """
     Thin wrapper for the Course Export Manager. See ExportManager for details.
     """
-    CourseExportManager(modulestore, contentstore, course_key, root_dir, course_dir).export()
+    CourseExportManager(modulestore, contentstore, course_key, root_dir, course_dir, **kwargs).export()
 
 
-def export_library_to_xml(modulestore, contentstore, library_key, root_dir, library_dir):
+def export_library_to_xml(modulestore, contentstore, library_key, root_dir, library_dir, **kwargs):
     """
     Thin wrapper for the Library Export Manager. See ExportManager for details.
     """
-    LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
+    LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir, **kwargs).export()
 
 
 def adapt_references(subtree, destination_course_key, export_fs):
@@ -1,8 +1,14 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
 import unittest
+
 from mock import Mock
+from path import Path as path
+
 from xmodule.modulestore.xml_importer import import_static_content
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -39,3 +45,40 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+
+class ParallelImportTestCase(unittest.TestCase):
+    "Tests for importing static files with several workers"
+    def setUp(self):
+        super(ParallelImportTestCase, self).setUp()
+        self.course_dir = path(mkdtemp())
+        self.addCleanup(rmtree, self.course_dir, ignore_errors=True)
+        os.makedirs(self.course_dir / "static" / "images")
+        for index in range(20):
+            with open(self.course_dir / "static" / "images" / "image{}.txt".format(index), 'w') as static_file:
+                static_file.write("image {}".format(index))
+        self.course_id = SlashSeparatedCourseKey("edX", "parallel", "2016_Fall")
+
+    def import_static(self, workers, content_store=None):
+        """
+        Import the static files with the given number of workers. Returns the
+        remapping and the names and data of the saved static content.
+        """
+        if content_store is None:
+            content_store = Mock()
+            content_store.generate_thumbnail.return_value = (None, None)
+        remap_dict = import_static_content(self.course_dir, content_store, self.course_id, workers=workers)
+        saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
+        return remap_dict, {sc.name: sc.data for sc in saved_static_content}
+
+    def test_parallel_import_matches_sequential(self):
+        remap_dict, name_val = self.import_static(workers=4)
+        self.assertEqual(len(remap_dict), 20)
+        self.assertEqual(name_val["image7.txt"], "image 7")
+        self.assertEqual((remap_dict, name_val), self.import_static(workers=1))
+
+    def test_parallel_import_error(self):
+        content_store = Mock()
+        content_store.generate_thumbnail.side_effect = ValueError("Bad image")
+        with self.assertRaises(ValueError):
+            self.import_static(workers=4, content_store=content_store)
@@ -12,6 +12,9 @@ file and check it in at the same time as your model changes. To do that,
 
 """
 import logging
+import re
+from string import Formatter
+
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models, transaction
@@ -217,6 +220,126 @@ class CourseEmailTemplate(models.Model):
         """
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Compile the plain text message of a course email, to be rendered for
+        each of its recipients.
+
+        `context` contains the values which are the same for all the recipients.
+        """
+        return CompiledCourseEmailTemplate(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Compile the HTML message of a course email, to be rendered for each
+        of its recipients.
+
+        `context` contains the values which are the same for all the recipients.
+        """
+        return CompiledCourseEmailTemplate(self.html_template, htmltext, context)
+
+
+# The context values of a course email which differ between its recipients.
+RECIPIENT_CONTEXT_KEYS = ('name', 'email', 'user_id')
+
+
+class CompiledCourseEmailTemplate(object):
+    """
+    A course email template, formatted with the context values which are the
+    same for all the recipients of a message.
+
+    Rendering the message for a recipient then only joins the formatted parts
+    of the template with the recipient's values and message body, instead of
+    formatting the whole template again.  The result is the same as that of
+    `CourseEmailTemplate._render`, which is used for the templates and
+    recipients this can't be done for.
+    """
+    # Marks the places of the recipient values in the formatted template.
+    PLACEHOLDER = u'\0{}\0'
+    PLACEHOLDER_RE = re.compile(u'\0({})\0'.format('|'.join(RECIPIENT_CONTEXT_KEYS)))
+
+    def __init__(self, format_string, message_body, context):
+        self.format_string = format_string
+        self.message_body = message_body
+        # The formatted parts of the template, and the keys of the recipient
+        # values between them.  The message body is inserted at the key None.
+        self.parts = None
+        self.keys = None
+        self._compile(context)
+
+    def _compile(self, context):
+        """
+        Format the template with the context, leaving placeholders for the
+        recipient values.
+        """
+        if u'\0' in self.format_string:
+            return
+
+        num_fields = 0
+        for __, field_name, format_spec, conversion in Formatter().parse(self.format_string):
+            if field_name is None:
+                continue
+            if re.match(r'[^.[]*', field_name).group() in RECIPIENT_CONTEXT_KEYS:
+                # Only the recipient values inserted as they are can be
+                # substituted after the template is formatted.
+                if field_name not in RECIPIENT_CONTEXT_KEYS or format_spec or conversion:
+                    return
+                num_fields += 1
+
+        compile_context = dict(context)
+        compile_context.update({key: self.PLACEHOLDER.format(key) for key in RECIPIENT_CONTEXT_KEYS})
+        try:
+            formatted = self.format_string.format(**compile_context)
+        except Exception:  # pylint: disable=broad-except
+            # Rendering raises the same error for each recipient.
+            return
+        if formatted.count(u'\0') != 2 * num_fields:
+            return
+
+        pieces = self.PLACEHOLDER_RE.split(formatted)
+        parts = pieces[0::2]
+        keys = pieces[1::2]
+
+        # The message body replaces the first body tag.  Since the recipient
+        # values rendered with the compiled template contain no braces, that
+        # tag is in one of the formatted parts.
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        for index, part in enumerate(parts):
+            if message_body_tag in part:
+                before, after = part.split(message_body_tag, 1)
+                parts[index:index + 1] = [before, after]
+                keys.insert(index, None)
+                break
+
+        self.parts = parts
+        self.keys = keys
+
+    def render(self, context):
+        """
+        Render the message, as `CourseEmailTemplate._render` would with the
+        same template, message body and context.
+
+        `context` must contain the same values as the one the template was
+        compiled with, and the values of the recipient.
+        """
+        if self.parts is None or any(
+                isinstance(context.get(key), basestring) and ('{' in context[key] or '}' in context[key])
+                for key in RECIPIENT_CONTEXT_KEYS
+        ):
+            return CourseEmailTemplate._render(self.format_string, self.message_body, context)
+
+        # Substitute all %%-encoded keywords in the message body
+        message_body = self.message_body
+        if 'user_id' in context and 'course_id' in context:
+            message_body = substitute_keywords_with_data(message_body, context)
+
+        result = [self.parts[0]]
+        for key, part in zip(self.keys, self.parts[1:]):
+            result.append(message_body if key is None else format(context[key], u''))
+            result.append(part)
+
+        return wrap_message(u''.join(result))
+
 
 class CourseAuthorization(models.Model):
     """
@@ -249,6 +372,20 @@ class CourseAuthorization(models.Model):
         except cls.DoesNotExist:
             return False
 
+    @classmethod
+    def instructor_email_enabled_for_courses(cls, course_ids):
+        """
+        Returns the set of the given course ids for which email is enabled,
+        as `instructor_email_enabled` would, in a single query.
+        """
+        if not settings.FEATURES['REQUIRE_COURSE_EMAIL_AUTH']:
+            return set(course_ids)
+
+        return {
+            authorization.course_id
+            for authorization in cls.objects.filter(course_id__in=course_ids, email_enabled=True)
+        }
+
     def __unicode__(self):
         not_en = "Not "
         if self.email_enabled:
@@ -0,0 +1,144 @@
+"""
+Performance test of rendering and sending bulk emails, against a local SMTP
+server which discards the messages.
+
+Timings are recorded by CodeBlockTimer in its sqlite database, as
+"BulkEmailRender:<renderer>" and "BulkEmailSend:<number of connections>".
+"""
+import asyncore
+import json
+import os
+import smtpd
+import threading
+import unittest
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from nose.plugins.skip import SkipTest
+
+from bulk_email.models import CourseEmailTemplate, CompiledCourseEmailTemplate
+from bulk_email.tasks import _send_messages
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of messages rendered and sent per measurement.
+NUM_EMAILS = 200
+
+# Numbers of concurrent connections to the SMTP server which are measured.
+NUM_CONNECTIONS = (1, 2, 4, 8)
+
+CONTEXT = {
+    'course_title': u"Bogus Course Title",
+    'course_url': u"https://example.com/courses/abc/123/doremi/",
+    'course_image_url': u"https://example.com/static/course_image.jpg",
+    'course_end_date': u"Dec 31, 2016",
+    'account_settings_url': u"https://example.com/account/settings",
+    'email_settings_url': u"https://example.com/dashboard",
+    'platform_name': u"edX",
+    'course_id': u"abc/123/doremi",
+    'name': u"",
+    'email': u"",
+}
+
+MESSAGE = u"<p>Dear %%USER_FULLNAME%%,</p>\n" + u"<p>Lorem ipsum dolor sit amet.</p>\n" * 50
+
+
+class NullSMTPServer(smtpd.SMTPServer):
+    """
+    SMTP server which accepts and discards all messages.
+    """
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        pass
+
+
+def default_html_template():
+    """
+    Return the default HTML template, as loaded by the bulk_email fixture.
+    """
+    fixture = os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'course_email_template.json')
+    with open(fixture) as fixture_file:
+        templates = json.load(fixture_file)
+    return next(
+        template['fields']['html_template'] for template in templates
+        if template['fields']['name'] is None
+    )
+
+
+def recipient_context(index):
+    """
+    Return the context of the email for the recipient with the given index.
+    """
+    context = dict(CONTEXT)
+    context.update({'name': u"Robot {}".format(index), 'email': u"robot{}@example.com".format(index)})
+    return context
+
+
+@unittest.skip
+class BulkEmailSendPerformance(unittest.TestCase):
+    """
+    Measures the throughput of rendering and sending course emails.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(BulkEmailSendPerformance, self).setUp()
+        self.server = NullSMTPServer(('localhost', 0), None)
+        self.port = self.server.socket.getsockname()[1]
+        thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.1})
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.close)
+
+    def test_render_throughput(self):
+        if CodeBlockTimer is None:
+            raise SkipTest("CodeBlockTimer undefined.")
+
+        html_template = default_html_template()
+        compiled = CompiledCourseEmailTemplate(html_template, MESSAGE, CONTEXT)
+        contexts = [recipient_context(index) for index in range(NUM_EMAILS)]
+
+        render = CourseEmailTemplate._render  # pylint: disable=protected-access
+        with CodeBlockTimer("BulkEmailRender:template"):
+            for context in contexts:
+                render(html_template, MESSAGE, context)
+
+        with CodeBlockTimer("BulkEmailRender:compiled"):
+            for context in contexts:
+                compiled.render(context)
+
+    def test_send_throughput(self):
+        if CodeBlockTimer is None:
+            raise SkipTest("CodeBlockTimer undefined.")
+
+        html_template = default_html_template()
+        compiled = CompiledCourseEmailTemplate(html_template, MESSAGE, CONTEXT)
+        email_msgs = []
+        for index in range(NUM_EMAILS):
+            context = recipient_context(index)
+            email_msg = EmailMultiAlternatives(
+                u"Test Subject", u"Plain text", u"course@example.com", [context['email']]
+            )
+            email_msg.attach_alternative(compiled.render(context), 'text/html')
+            email_msgs.append(email_msg)
+
+        for num_connections in NUM_CONNECTIONS:
+            connections = [
+                get_connection('django.core.mail.backends.smtp.EmailBackend', host='localhost', port=self.port)
+                for __ in range(num_connections)
+            ]
+            for connection in connections:
+                connection.open()
+            try:
+                with CodeBlockTimer("BulkEmailSend:{}".format(num_connections)):
+                    results = _send_messages(connections, email_msgs, u"Bogus Course Title")
+            finally:
+                for connection in connections:
+                    connection.close()
+
+            self.assertEqual(results, [None] * NUM_EMAILS)
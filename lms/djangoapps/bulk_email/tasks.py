@@ -6,6 +6,7 @@ to a course.
 import re
 import random
 import json
+import threading
 from time import sleep
 from collections import Counter
 import logging
@@ -95,6 +96,13 @@ BULK_EMAIL_FAILURE_ERRORS = (
     SMTPException,
 )
 
+# Number of emails sent over each connection at a time.  All of the messages
+# of a batch are rendered before they are sent, possibly concurrently.
+EMAILS_PER_CONNECTION_BATCH = 10
+
+# Marks the emails which weren't sent, because an error stopped the sending.
+_UNSENT = object()
+
 
 def _get_recipient_querysets(user_id, to_option, course_id):
     """
@@ -487,51 +495,74 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    connections = []
     try:
-        connection = get_connection()
-        connection.open()
+        # Throttle if we have gotten the rate limiter.  This is not very high-tech,
+        # but if a task has been retried for rate-limiting reasons, then we send
+        # over a single connection, and sleep for a period of time between all emails
+        # within this task.  Choice of the value depends on the number of workers that
+        # might be sending email in parallel, and what the SES throttle rate is.
+        if subtask_status.retried_nomax > 0:
+            num_connections = 1
+            delay_between_sends = settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
+        else:
+            num_connections = settings.BULK_EMAIL_CONNECTIONS_PER_TASK
+            delay_between_sends = 0
+
+        for __ in range(num_connections):
+            connections.append(get_connection())
+            connections[-1].open()
 
         # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
+        email_context = {'name': '', 'email': '', 'course_id': course_email.course_id}
         email_context.update(global_email_context)
 
+        # Format the templates once, rather than for each recipient.
+        plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
+
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
-            # That way, the to_list will always contain the recipients remaining to be emailed.
+            # Take the next batch of recipients from the end of the list.
+            # At the end of processing the batch, the recipients who were emailed will be
+            # removed from the to_list.  That way, the to_list will always contain the
+            # recipients remaining to be emailed.
             # This is convenient for retries, which will need to send to those who haven't
             # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
+            batch = to_list[-num_connections * EMAILS_PER_CONNECTION_BATCH:]
+            recipients = batch[::-1]
+
+            email_msgs = []
+            for current_recipient in recipients:
+                # Update context with user-specific values from the user.
+                email_context['email'] = current_recipient['email']
+                email_context['name'] = current_recipient['profile__name']
+                email_context['user_id'] = current_recipient['pk']
+
+                # Construct message content using templates and context:
+                plaintext_msg = plaintext_template.render(email_context)
+                html_msg = html_template.render(email_context)
+
+                # Create email:
+                email_msg = EmailMultiAlternatives(
+                    course_email.subject,
+                    plaintext_msg,
+                    from_addr,
+                    [current_recipient['email']],
+                )
+                email_msg.attach_alternative(html_msg, 'text/html')
+                email_msgs.append(email_msg)
 
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+            results = _send_messages(connections, email_msgs, course_title, delay_between_sends)
 
-            try:
+            retry_exc = None
+            unprocessed = []
+            for current_recipient, result in zip(recipients, results):
+                if result is _UNSENT:
+                    unprocessed.append(current_recipient)
+                    continue
+
+                recipient_num += 1
+                email = current_recipient['email']
                 log.info(
                     "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
                     Recipient name: %s, Email address: %s",
@@ -543,82 +574,91 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     current_recipient['profile__name'],
                     email
                 )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
-
-            except SMTPDataError as exc:
-                # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
-                    # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
-                else:
+
+                if isinstance(result, SMTPDataError):
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    if not _is_single_email_failure(result):
+                        # This will cause the outer handler to catch the exception and retry the entire task.
+                        retry_exc = result if retry_exc is None else retry_exc
+                        unprocessed.append(current_recipient)
+                        continue
+                    else:
+                        # This will fall through and not retry the message.
+                        log.warning(
+                            'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
+                            Email not delivered to %s due to error %s',
+                            parent_task_id,
+                            task_id,
+                            email_id,
+                            recipient_num,
+                            total_recipients,
+                            email,
+                            result.smtp_error
+                        )
+                        dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
+                        subtask_status.increment(failed=1)
+
+                elif isinstance(result, SINGLE_EMAIL_FAILURE_ERRORS):
                     # This will fall through and not retry the message.
-                    log.warning(
-                        'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                        Email not delivered to %s due to error %s',
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
+                        EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
                         parent_task_id,
                         task_id,
                         email_id,
                         recipient_num,
                         total_recipients,
                         email,
-                        exc.smtp_error
+                        result
                     )
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
-                # This will fall through and not retry the message.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
-                    EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email,
-                    exc
-                )
-                dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
-                subtask_status.increment(failed=1)
+                elif result is not None:
+                    # Any other error is handled by the outer handlers, once the
+                    # rest of the batch has been accounted for.
+                    retry_exc = result if retry_exc is None else retry_exc
+                    unprocessed.append(current_recipient)
+                    continue
 
-            else:
-                total_recipients_successful += 1
-                log.info(
-                    "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s,",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
                 else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
-
-            # Pop the user that was emailed off the end of the list only once they have
-            # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
-            recipients_info[email] += 1
-            to_list.pop()
+                    total_recipients_successful += 1
+                    log.info(
+                        "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s,",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                    if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                        log.info('Email with id %s sent to %s', email_id, email)
+                    else:
+                        log.debug('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment(succeeded=1)
+
+                recipients_info[email] += 1
+
+            # Remove the users that were processed from the end of the list.  (That way,
+            # if there were a failure that needed to be retried, the users who weren't
+            # emailed are still on the list.)
+            to_list[-len(batch):] = unprocessed[::-1]
+            if retry_exc is not None:
+                raise retry_exc
 
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
@@ -699,7 +739,71 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
-        connection.close()
+        for connection in connections:
+            connection.close()
+
+
+def _is_single_email_failure(exc):
+    """
+    Returns whether the error raised when sending an email only means that the
+    email couldn't be sent to its recipient, so that the other emails of the
+    task should still be sent.
+    """
+    if isinstance(exc, SMTPDataError):
+        # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
+        return not 400 <= exc.smtp_code < 500
+    return isinstance(exc, SINGLE_EMAIL_FAILURE_ERRORS)
+
+
+def _send_messages(connections, email_msgs, course_title, delay_between_sends=0):
+    """
+    Sends the email messages over the connections, concurrently if there are
+    several of them.
+
+    Each connection sends every n-th message, in order, sleeping for
+    `delay_between_sends` seconds before each one.  All of the connections stop
+    sending at the first error which isn't a single email failure.
+
+    Returns a list with, for each message, None if it was sent, the exception
+    raised when sending it, or `_UNSENT` if the sending stopped before it.
+    """
+    results = [_UNSENT] * len(email_msgs)
+    stopped = threading.Event()
+
+    def send_share(connection, indexes):
+        """
+        Sends the messages with the given indexes over the connection.
+        """
+        for index in indexes:
+            if stopped.is_set():
+                return
+            if delay_between_sends:
+                sleep(delay_between_sends)
+            try:
+                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+                    connection.send_messages([email_msgs[index]])
+            except Exception as exc:  # pylint: disable=broad-except
+                # The error is handled by the caller, for this thread may not be the main one.
+                results[index] = exc
+                if not _is_single_email_failure(exc):
+                    stopped.set()
+            else:
+                results[index] = None
+
+    shares = [
+        (connection, range(offset, len(email_msgs), len(connections)))
+        for offset, connection in enumerate(connections)
+    ]
+    if len(shares) == 1:
+        send_share(*shares[0])
+    else:
+        threads = [threading.Thread(target=send_share, args=share) for share in shares]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return results
 
 
 def _get_current_task():
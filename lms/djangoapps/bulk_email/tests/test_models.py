@@ -10,7 +10,9 @@ from student.tests.factories import UserFactory
 from mock import patch, Mock
 from nose.plugins.attrib import attr
 
-from bulk_email.models import CourseEmail, SEND_TO_STAFF, CourseEmailTemplate, CourseAuthorization
+from bulk_email.models import (
+    CourseEmail, SEND_TO_STAFF, CourseEmailTemplate, CompiledCourseEmailTemplate, CourseAuthorization
+)
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 
@@ -139,6 +141,29 @@ class CourseEmailTemplateTest(TestCase):
         context = self._get_sample_plain_context()
         template.render_plaintext("My new plain text.", context)
 
+    def test_render_compiled(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._get_sample_html_context()
+        context.update({'name': '', 'email': '', 'course_id': 'abc/123/doremi'})
+        message = u"Dear %%USER_FULLNAME%%, this is {a test}."
+        compiled_plaintext = template.compile_plaintext(message, context)
+        compiled_htmltext = template.compile_htmltext(message, context)
+
+        for name in (u"Robot", u"R\xf6bot {message_body}", u"Robot " * 200):
+            context.update({'name': name, 'email': 'robot@example.com', 'user_id': 1})
+            self.assertEqual(compiled_plaintext.render(context), template.render_plaintext(message, context))
+            self.assertEqual(compiled_htmltext.render(context), template.render_htmltext(message, context))
+
+    def test_render_uncompilable(self):
+        context = {'name': '', 'email': '', 'course_title': "Bogus Course Title"}
+        # Recipient values which aren't inserted as they are can't be
+        # substituted in the formatted template.
+        compiled = CompiledCourseEmailTemplate(u"{name!r} {course_title}: {{message_body}}", "Hello", context)
+        self.assertIsNone(compiled.parts)
+
+        context.update({'name': u"Robot", 'email': 'robot@example.com'})
+        self.assertEqual(compiled.render(context), u"u'Robot' Bogus Course Title: Hello")
+
 
 @attr('shard_1')
 class CourseAuthorizationTest(TestCase):
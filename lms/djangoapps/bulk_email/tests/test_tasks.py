@@ -29,10 +29,12 @@ from celery.states import SUCCESS, FAILURE  # pylint: disable=no-name-in-module,
 
 from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from bulk_email.models import CourseEmail, Optout, SEND_TO_ALL
+from bulk_email.tasks import _filter_optouts_from_recipients, _submit_for_retry
 
 from instructor_task.tasks import send_bulk_course_email
 from instructor_task.subtasks import update_subtask_status, SubtaskStatus
@@ -199,6 +201,79 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
             get_conn.return_value.send_messages.side_effect = cycle([None])
             self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
 
+    @override_settings(BULK_EMAIL_CONNECTIONS_PER_TASK=3)
+    def test_successful_over_several_connections(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        recipients = []
+
+        def send_messages(email_msgs):
+            """Record the recipients of the messages."""
+            recipients.extend(email_msg.to[0] for email_msg in email_msgs)
+
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = send_messages
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+
+        self.assertEquals(get_conn.call_count, 3)
+        self.assertEquals(len(recipients), num_emails)
+        self.assertEquals(len(set(recipients)), num_emails)
+
+    @override_settings(BULK_EMAIL_CONNECTIONS_PER_TASK=3, BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS=0)
+    def test_retry_mid_batch_over_several_connections(self):
+        # Select number of emails to fit into a single subtask, over several batches.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        students = self._create_students(num_emails - 1)
+        # Throttle a recipient of the second batch, the first time it is sent to.
+        throttled_email = students[num_emails // 2].email
+        throttled = []
+        recipients = []
+        to_lists = []
+        retried_to_lists = []
+
+        def send_messages(email_msgs):
+            """Record the recipients of the messages, throttling the first send to `throttled_email`."""
+            email = email_msgs[0].to[0]
+            if email == throttled_email and not throttled:
+                throttled.append(email)
+                raise SMTPDataError(455, "Throttling: Sending rate exceeded")
+            recipients.append(email)
+
+        def filter_optouts_from_recipients(to_list, course_id):
+            """Record the recipients each time the task is run."""
+            to_lists.append([recipient['email'] for recipient in to_list])
+            return _filter_optouts_from_recipients(to_list, course_id)
+
+        def submit_for_retry(entry_id, email_id, to_list, *args, **kwargs):
+            """Record the recipients left to email when the task is retried."""
+            retried_to_lists.append([recipient['email'] for recipient in to_list])
+            return _submit_for_retry(entry_id, email_id, to_list, *args, **kwargs)
+
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = send_messages
+            with patch('bulk_email.tasks._filter_optouts_from_recipients', side_effect=filter_optouts_from_recipients):
+                with patch('bulk_email.tasks._submit_for_retry', side_effect=submit_for_retry):
+                    self._test_run_with_task(
+                        send_bulk_course_email, 'emailed', num_emails, num_emails, retried_nomax=1
+                    )
+
+        # The task was retried once, with exactly the recipients who were not
+        # emailed yet, in their original order.
+        self.assertEquals(len(retried_to_lists), 1)
+        emailed_before_retry = set(recipients[:num_emails - len(retried_to_lists[0])])
+        self.assertEquals(
+            retried_to_lists[0],
+            [email for email in to_lists[0] if email not in emailed_before_retry]
+        )
+        self.assertIn(throttled_email, retried_to_lists[0])
+        self.assertEquals(to_lists[1], retried_to_lists[0])
+        # Nobody was emailed twice.
+        self.assertEquals(len(recipients), num_emails)
+        self.assertEquals(len(set(recipients)), num_emails)
+
     def test_successful_twice(self):
         # Select number of emails to fit into a single subtask.
         num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
@@ -3,9 +3,10 @@ Tests for Blocks api.py
 """
 
 from django.test.client import RequestFactory
+from mock import patch
 from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
-from xmodule.modulestore.tests.factories import SampleCourseFactory
+from xmodule.modulestore.tests.factories import SampleCourseFactory, ToyCourseFactory
 
 from ..api import get_blocks
 
@@ -30,3 +31,24 @@ class TestGetBlocks(ModuleStoreTestCase):
     def test_no_user(self):
         with self.assertRaises(NotImplementedError):
             get_blocks(self.request, self.course.location)
+
+    def test_student_view_data_from_cache(self):
+        course = ToyCourseFactory.create()
+        kwargs = {
+            'student_view_data': ['video'],
+            'requested_fields': ['student_view_data', 'student_view_multi_device'],
+        }
+        collected_blocks = get_blocks(self.request, course.location, self.user, **kwargs)
+
+        # The sub-transformers' data of the Blocks API transformer is loaded from the cache.
+        with patch('openedx.core.lib.block_cache.block_cache.update_block_cache') as mock_update:
+            cached_blocks = get_blocks(self.request, course.location, self.user, **kwargs)
+        self.assertFalse(mock_update.called)
+        self.assertEquals(cached_blocks, collected_blocks)
+
+        block_types = {block['type'] for block in cached_blocks['blocks'].itervalues()}
+        self.assertIn('video', block_types)
+        for block in cached_blocks['blocks'].itervalues():
+            self.assertEquals('student_view_data' in block, block['type'] == 'video')
+            if block['type'] == 'html':
+                self.assertTrue(block['student_view_multi_device'])
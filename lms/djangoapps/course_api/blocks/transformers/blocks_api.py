@@ -23,6 +23,12 @@ class BlocksAPITransformer(BlockStructureTransformer):
     """
 
     VERSION = 1
+    COLLECT_DEPENDENCIES = (
+        StudentViewTransformer,
+        BlockCountsTransformer,
+        BlockDepthTransformer,
+        BlockNavigationTransformer,
+    )
     STUDENT_VIEW_DATA = 'student_view_data'
     STUDENT_VIEW_MULTI_DEVICE = 'student_view_multi_device'
 
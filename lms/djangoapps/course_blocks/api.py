@@ -1,10 +1,11 @@
 """
 API entry point to the course_blocks app with top-level
-get_course_blocks and clear_course_from_cache functions.
+get_course_blocks, update_course_in_cache and clear_course_from_cache
+functions.
 """
 from django.core.cache import cache
 
-from openedx.core.lib.block_cache.block_cache import get_blocks, clear_block_cache
+from openedx.core.lib.block_cache.block_cache import get_blocks, clear_block_cache, update_block_cache
 from xmodule.modulestore.django import modulestore
 
 from .transformers import (
@@ -81,6 +82,19 @@ def get_course_blocks(
     )
 
 
+def update_course_in_cache(course_key):
+    """
+    A higher order function implemented on top of the
+    block_cache.update_block_cache function that recollects the block
+    structure starting at the root block of the course for the given
+    course_key and replaces it in the cache.  Until it is replaced,
+    the previously cached block structure is still served.
+    """
+    store = modulestore()
+    with store.bulk_operations(course_key):
+        return update_block_cache(cache, store, store.make_course_usage_key(course_key))
+
+
 def clear_course_from_cache(course_key):
     """
     A higher order function implemented on top of the
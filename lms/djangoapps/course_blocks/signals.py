@@ -1,20 +1,22 @@
 """
-Signal handlers for invalidating cached data.
+Signal handlers for updating and invalidating cached data.
 """
 from django.dispatch.dispatcher import receiver
 
 from xmodule.modulestore.django import SignalHandler
 
 from .api import clear_course_from_cache
+from .tasks import enqueue_update_course_in_cache
 
 
 @receiver(SignalHandler.course_published)
 def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
     """
     Catches the signal that a course has been published in the module
-    store and invalidates the corresponding cache entry if one exists.
+    store and queues an update of the corresponding cache entry.  The
+    previously cached entry, if any, is served until it is replaced.
     """
-    clear_course_from_cache(course_key)
+    enqueue_update_course_in_cache(course_key)
 
 
 @receiver(SignalHandler.course_deleted)
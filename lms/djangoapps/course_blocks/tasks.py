@@ -0,0 +1,111 @@
+"""
+Asynchronous tasks for the course_blocks app.
+"""
+import logging
+
+from celery.exceptions import MaxRetriesExceededError
+from celery.task import task
+from django.core.cache import cache
+from opaque_keys.edx.keys import CourseKey
+
+from . import api
+
+
+log = logging.getLogger('edx.celery.task')
+
+# Seconds after which a held update lock is considered abandoned, e.g.
+# when the worker holding it was killed.  Must exceed the time it takes
+# to collect the largest course.
+UPDATE_LOCK_EXPIRE = 60 * 30
+
+# Seconds after which a pending update marker expires if the queued
+# task never ran, so that later publishes can queue a new one.
+UPDATE_PENDING_EXPIRE = 60 * 60
+
+# Seconds to wait before retrying an update whose course is already
+# being updated by another worker.
+UPDATE_RETRY_DELAY = 30
+
+
+def _update_pending_key(course_key):
+    """
+    Returns the cache key marking that an update of the given course
+    has been queued and has not started yet.
+    """
+    return u"course_blocks.update_pending.{}".format(course_key)
+
+
+def _update_lock_key(course_key):
+    """
+    Returns the cache key marking that an update of the given course
+    is in progress.
+    """
+    return u"course_blocks.update_lock.{}".format(course_key)
+
+
+def enqueue_update_course_in_cache(course_key):
+    """
+    Queues an update of the cached block structure of the given course,
+    unless an update is already queued and has not started yet, so that
+    a burst of publishes of the same course results in a single update.
+
+    Returns whether a new update was queued.
+    """
+    # cache.add fails if the key already exists
+    if not cache.add(_update_pending_key(course_key), 'true', UPDATE_PENDING_EXPIRE):
+        log.info("Update of cached course blocks for %s is already queued.", course_key)
+        return False
+
+    # Note: The countdown=0 kwarg is set to ensure the task does not access the course before the
+    # signal emitter has finished all operations.
+    update_course_in_cache.apply_async([unicode(course_key)], countdown=0)
+    return True
+
+
+@task(
+    name=u'lms.djangoapps.course_blocks.tasks.update_course_in_cache',
+    default_retry_delay=UPDATE_RETRY_DELAY,
+    max_retries=UPDATE_LOCK_EXPIRE / UPDATE_RETRY_DELAY,
+)
+def update_course_in_cache(course_key):
+    """
+    Recollects the block structure of the given course and replaces it
+    in the cache.  At most one update of a course runs at a time.
+    """
+    # Ideally we'd like to accept a CourseLocator; however, CourseLocator is not JSON-serializable (by default) so
+    # Celery's delayed tasks fail to start. For this reason, callers should pass the course key as a Unicode string.
+    if not isinstance(course_key, basestring):
+        raise ValueError('course_key must be a string. {} is not acceptable.'.format(type(course_key)))
+
+    course_key = CourseKey.from_string(course_key)
+
+    lock_key = _update_lock_key(course_key)
+    if not cache.add(lock_key, 'true', UPDATE_LOCK_EXPIRE):
+        log.info("Cached course blocks for %s are being updated, retrying.", course_key)
+        try:
+            raise update_course_in_cache.retry(args=[unicode(course_key)])
+        except MaxRetriesExceededError:
+            # Don't leave the pending marker blocking new updates, nor
+            # the cached block structure outdated, for the marker's
+            # lifetime.
+            log.error("Gave up waiting to update cached course blocks for %s, clearing them.", course_key)
+            cache.delete(_update_pending_key(course_key))
+            api.clear_course_from_cache(course_key)
+            return
+
+    try:
+        # Clear the pending marker only once the lock is held, so that
+        # publishes from now on queue an update that will see them,
+        # while those before are all covered by this one.
+        cache.delete(_update_pending_key(course_key))
+        api.update_course_in_cache(course_key)
+    except Exception as ex:
+        log.exception('An error occurred while updating cached course blocks for %s: %s', course_key, ex.message)
+        # Nothing will update the outdated block structure until the
+        # next publish, so have it collected again when it is next read.
+        api.clear_course_from_cache(course_key)
+        raise
+    finally:
+        # According to Celery task cookbook, "Memcache delete is very slow, but we have
+        # to use it to take advantage of using add() for atomic locking."
+        cache.delete(lock_key)
@@ -0,0 +1,119 @@
+"""
+Tests for the course_blocks tasks.
+"""
+from celery.exceptions import MaxRetriesExceededError
+from django.core.cache import cache
+from mock import patch
+
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..api import get_course_blocks
+from ..tasks import (
+    _update_lock_key,
+    _update_pending_key,
+    enqueue_update_course_in_cache,
+    update_course_in_cache,
+)
+
+
+class UpdateCourseInCacheTestCase(ModuleStoreTestCase):
+    """
+    Tests for updating the cached block structure of a course.
+    """
+    def setUp(self):
+        super(UpdateCourseInCacheTestCase, self).setUp()
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.user = UserFactory.create(is_staff=True)
+        self.addCleanup(cache.clear)
+
+    def get_cached_block_keys(self):
+        """
+        Returns the keys of the course blocks read from the cache,
+        without transforming them.
+        """
+        with patch('openedx.core.lib.block_cache.block_cache.update_block_cache') as mock_update:
+            block_keys = set(get_course_blocks(self.user, self.course.location, transformers=[]).get_block_keys())
+        self.assertFalse(mock_update.called)
+        return block_keys
+
+    def test_update_replaces_cached_structure(self):
+        get_course_blocks(self.user, self.course.location, transformers=[])
+        self.assertEquals(self.get_cached_block_keys(), {self.course.location, self.chapter.location})
+
+        with self.store.bulk_operations(self.course.id, emit_signals=False):
+            sequential = ItemFactory.create(parent=self.chapter, category='sequential')
+
+        # the previous structure is served until it is updated
+        self.assertNotIn(sequential.location, self.get_cached_block_keys())
+
+        update_course_in_cache(unicode(self.course.id))
+        self.assertIn(sequential.location, self.get_cached_block_keys())
+
+    def test_enqueue_is_single_flight(self):
+        with patch.object(update_course_in_cache, 'apply_async') as mock_apply_async:
+            self.assertTrue(enqueue_update_course_in_cache(self.course.id))
+            self.assertFalse(enqueue_update_course_in_cache(self.course.id))
+            self.assertEquals(mock_apply_async.call_count, 1)
+
+            # once the queued update starts, new publishes queue another one
+            update_course_in_cache(unicode(self.course.id))
+            self.assertTrue(enqueue_update_course_in_cache(self.course.id))
+            self.assertEquals(mock_apply_async.call_count, 2)
+
+    def test_update_in_progress(self):
+        cache.add(_update_lock_key(self.course.id), 'true')
+        cache.add(_update_pending_key(self.course.id), 'true')
+        with patch.object(update_course_in_cache, 'retry', return_value=Exception) as mock_retry:
+            with patch('lms.djangoapps.course_blocks.api.update_block_cache') as mock_update:
+                with self.assertRaises(Exception):
+                    update_course_in_cache(unicode(self.course.id))
+        self.assertTrue(mock_retry.called)
+        self.assertFalse(mock_update.called)
+
+        # the queued update is still pending
+        self.assertIsNotNone(cache.get(_update_pending_key(self.course.id)))
+
+    def add_sequential(self):
+        """
+        Caches the block structure of the course, then adds a sequential
+        to the course without updating the cache, and returns it.
+        """
+        get_course_blocks(self.user, self.course.location, transformers=[])
+        with self.store.bulk_operations(self.course.id, emit_signals=False):
+            return ItemFactory.create(parent=self.chapter, category='sequential')
+
+    def test_update_failure_clears_cached_structure(self):
+        sequential = self.add_sequential()
+        cache.add(_update_pending_key(self.course.id), 'true')
+        with patch('lms.djangoapps.course_blocks.api.update_block_cache', side_effect=Exception) as mock_update:
+            with self.assertRaises(Exception):
+                update_course_in_cache(unicode(self.course.id))
+        self.assertTrue(mock_update.called)
+
+        # the outdated structure is no longer served
+        self.assertIsNone(cache.get(_update_lock_key(self.course.id)))
+        self.assertIsNone(cache.get(_update_pending_key(self.course.id)))
+        block_keys = set(get_course_blocks(self.user, self.course.location, transformers=[]).get_block_keys())
+        self.assertIn(sequential.location, block_keys)
+
+    def test_update_retries_exhausted(self):
+        sequential = self.add_sequential()
+        cache.add(_update_lock_key(self.course.id), 'true')
+        cache.add(_update_pending_key(self.course.id), 'true')
+        with patch.object(update_course_in_cache, 'retry', side_effect=MaxRetriesExceededError) as mock_retry:
+            with patch('lms.djangoapps.course_blocks.api.update_block_cache') as mock_update:
+                update_course_in_cache(unicode(self.course.id))
+        self.assertTrue(mock_retry.called)
+        self.assertFalse(mock_update.called)
+
+        # new publishes can queue an update, and the outdated structure is no longer served
+        self.assertIsNone(cache.get(_update_pending_key(self.course.id)))
+        block_keys = set(get_course_blocks(self.user, self.course.location, transformers=[]).get_block_keys())
+        self.assertIn(sequential.location, block_keys)
+
+    def test_course_key_must_be_string(self):
+        with self.assertRaises(ValueError):
+            update_course_in_cache(self.course.id)
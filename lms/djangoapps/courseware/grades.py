@@ -1,7 +1,9 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
 from collections import defaultdict
+from datetime import datetime
 from functools import partial
+from itertools import islice
 import json
 import random
 import logging
@@ -10,12 +12,14 @@ from contextlib import contextmanager
 from django.conf import settings
 from django.test.client import RequestFactory
 from django.core.cache import cache
+from django.db.models.query import QuerySet
+from pytz import UTC
 
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
 from courseware.access import has_access
-from courseware.model_data import FieldDataCache, ScoresClient
+from courseware.model_data import FieldDataCache, MultiUserFieldDataCache, ScoresClient
 from student.models import anonymous_id_for_user
 from util.db import outer_atomic
 from util.module_utils import yield_dynamic_descriptor_descendants
@@ -23,10 +27,12 @@ from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from .models import (
+    StudentModule, PersistentGradesVersion, PersistentSubsectionGrade, PersistentSubsectionGradeVisibleBlock
+)
 from .module_render import get_module_for_descriptor
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from openedx.core.djangoapps.signals.signals import GRADES_UPDATED
 
 
@@ -127,6 +133,165 @@ class MaxScoresCache(object):
         return max_score
 
 
+class PersistentGradesCache(object):
+    """
+    A per-user view of the grades persisted for a course.
+
+    Subsection grades computed by `_grade` are written back through this
+    cache, and later grading passes reuse them instead of walking the
+    subsection again. A persisted grade is only trusted while the course has
+    not been published since it was computed; score changes delete the
+    affected rows (see `PersistentSubsectionGrade.invalidate`), and keep the
+    grades computed before them from being written (see
+    `PersistentGradesVersion`). Subsections whose content the user may gain
+    or lose access to in the meantime are not persisted (see
+    `access_may_change`).
+    """
+    def __init__(self, user, course):
+        self.user = user
+        self.course_key = course.id
+        if course.subtree_edited_on is None:
+            # Old XML courses don't have this attribute, so we can't tell
+            # when a persisted grade has gone stale.
+            self.course_version = None
+        else:
+            self.course_version = course.subtree_edited_on.isoformat()
+        self._subsection_grades = {}
+        self._subsection_updates = {}
+        self._version = None
+        self._problem_scores = None
+
+    @property
+    def enabled(self):
+        """Whether grades may be read from and written to the database."""
+        return (
+            settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False) and
+            not settings.GENERATE_PROFILE_SCORES and
+            self.course_version is not None and
+            self.user.is_authenticated()
+        )
+
+    def fetch(self):
+        """
+        Load all of the user's up to date persisted grades for the course.
+        """
+        if not self.enabled:
+            return
+        # The version is read before any student state, so that score
+        # changes from now on are detected by `push_to_db`.
+        self._version = PersistentGradesVersion.objects.get_or_create(
+            user_id=self.user.id,
+            course_id=self.course_key,
+        )[0].version
+        subsection_grades = PersistentSubsectionGrade.objects.filter(
+            user_id=self.user.id,
+            course_id=self.course_key,
+            course_version=self.course_version,
+        )
+        self._subsection_grades = {
+            grade.usage_key.map_into_course(self.course_key): grade
+            for grade in subsection_grades
+        }
+        self._problem_scores = None
+
+    def has_subsection(self, location):
+        """Is there an up to date persisted grade for this subsection?"""
+        return location in self._subsection_grades
+
+    def get_subsection(self, location, section_name):
+        """
+        Return a tuple (graded_total, scores) for the subsection at `location`,
+        as they were when the subsection was last graded, or None if there is
+        no up to date persisted grade.
+        """
+        grade = self._subsection_grades.get(location)
+        if grade is None:
+            return None
+        graded_total = Score(grade.earned_graded, grade.possible_graded, True, section_name, None)
+        scores = [
+            Score(earned, possible, graded, display_name, UsageKey.from_string(module_id))
+            for earned, possible, graded, display_name, module_id in json.loads(grade.scores)
+        ]
+        return graded_total, scores
+
+    def get_problem_score(self, location):
+        """
+        Return the persisted weighted (earned, possible) tuple for a single
+        scored block, or None if no persisted subsection grade includes it.
+        """
+        if self._problem_scores is None:
+            self._problem_scores = {}
+            for grade in self._subsection_grades.itervalues():
+                for earned, possible, __, __, module_id in json.loads(grade.scores):
+                    self._problem_scores[module_id] = (earned, possible)
+        return self._problem_scores.get(unicode(location))
+
+    def set_subsection(self, location, graded_total, scores, visible_blocks):
+        """
+        Record the grade of a subsection, to be written by `push_to_db`.
+
+        visible_blocks is an iterable of the locations of every block whose
+        score change should invalidate this grade.
+        """
+        if not self.enabled:
+            return
+        self._subsection_updates[location] = ({
+            'course_version': self.course_version,
+            'earned_graded': graded_total.earned,
+            'possible_graded': graded_total.possible,
+            'scores': json.dumps([
+                [score.earned, score.possible, score.graded, score.section, unicode(score.module_id)]
+                for score in scores
+            ]),
+        }, set(visible_blocks))
+
+    def push_to_db(self):
+        """
+        Write any new subsection grades, unless the user's scores changed
+        since `fetch`. Must be called within a transaction.
+        """
+        if not self.enabled or not self._subsection_updates:
+            return
+        subsection_updates, self._subsection_updates = self._subsection_updates, {}
+
+        # The version row stays locked until the grades are committed, so a
+        # score change either shows up here or waits to invalidate them.
+        version = PersistentGradesVersion.objects.select_for_update().filter(
+            user_id=self.user.id,
+            course_id=self.course_key,
+        ).values_list('version', flat=True).first()
+        if version != self._version:
+            log.info(
+                u"Scores of user %s in %s changed while grading, not persisting their grades.",
+                self.user.id,
+                self.course_key,
+            )
+            return
+
+        PersistentSubsectionGradeVisibleBlock.objects.filter(
+            user_id=self.user.id,
+            course_id=self.course_key,
+            subsection_usage_key__in=list(subsection_updates),
+        ).delete()
+        PersistentSubsectionGradeVisibleBlock.objects.bulk_create([
+            PersistentSubsectionGradeVisibleBlock(
+                user_id=self.user.id,
+                course_id=self.course_key,
+                subsection_usage_key=location,
+                usage_key=block,
+            )
+            for location, (__, visible_blocks) in subsection_updates.iteritems()
+            for block in visible_blocks
+        ])
+        for location, (defaults, __) in subsection_updates.iteritems():
+            PersistentSubsectionGrade.objects.update_or_create(
+                user_id=self.user.id,
+                course_id=self.course_key,
+                usage_key=location,
+                defaults=defaults,
+            )
+
+
 class ProgressSummary(object):
     """
     Wrapper class for the computation of a user's scores across a course.
@@ -184,6 +349,21 @@ def descriptor_affects_grading(block_types_affecting_grading, descriptor):
     return descriptor.location.block_type in block_types_affecting_grading
 
 
+def access_may_change(descriptor, now):
+    """
+    Returns True if a user's access to the descriptor may change without the
+    course being published, else False: when it has not started yet, when it
+    is restricted to content groups (e.g. cohorts) or when its children
+    depend on the user (e.g. content experiments).
+    """
+    start = getattr(descriptor, 'start', None)
+    return bool(
+        (start is not None and start > now) or
+        getattr(descriptor, 'merged_group_access', None) or
+        descriptor.has_dynamic_children()
+    )
+
+
 def field_data_cache_for_grading(course, user):
     """
     Given a CourseDescriptor and User, create the FieldDataCache for grading.
@@ -202,6 +382,22 @@ def field_data_cache_for_grading(course, user):
     )
 
 
+def multi_user_field_data_cache_for_grading(course, users):
+    """
+    Given a CourseDescriptor and Users, create the MultiUserFieldDataCache for
+    grading all of them, which loads the same data as
+    `field_data_cache_for_grading` for each user with bulk queries.
+    """
+    descriptor_filter = partial(descriptor_affects_grading, course.block_types_affecting_grading)
+    return MultiUserFieldDataCache.cache_for_descriptor_descendents(
+        course.id,
+        users,
+        course,
+        depth=None,
+        descriptor_filter=descriptor_filter
+    )
+
+
 def answer_distributions(course_key):
     """
     Given a course_key, return answer distributions in the form of a dictionary
@@ -295,13 +491,17 @@ def answer_distributions(course_key):
     return answer_counts
 
 
-def grade(student, request, course, keep_raw_scores=False, field_data_cache=None, scores_client=None):
+def grade(student, request, course, keep_raw_scores=False, field_data_cache=None, scores_client=None,
+          submissions_scores=None, max_scores_cache=None):
     """
     Returns the grade of the student.
 
     Also sends a signal to update the minimum grade requirement status.
     """
-    grade_summary = _grade(student, request, course, keep_raw_scores, field_data_cache, scores_client)
+    grade_summary = _grade(
+        student, request, course, keep_raw_scores, field_data_cache, scores_client,
+        submissions_scores, max_scores_cache
+    )
     responses = GRADES_UPDATED.send_robust(
         sender=None,
         username=student.username,
@@ -316,7 +516,8 @@ def grade(student, request, course, keep_raw_scores=False, field_data_cache=None
     return grade_summary
 
 
-def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_client):
+def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_client,
+           submissions_scores=None, max_scores_cache=None):
     """
     Unwrapped version of "grade"
 
@@ -335,37 +536,61 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
 
+    submissions_scores and max_scores_cache may be passed in when they have
+    already been loaded (e.g. when grading students in batches); a
+    max_scores_cache that is passed in is not pushed to the remote cache.
+
     More information on the format is in the docstring for CourseGrader.
     """
+    grading_context = course.grading_context
+    persistent_grades = PersistentGradesCache(student, course)
     with outer_atomic():
-        if field_data_cache is None:
-            field_data_cache = field_data_cache_for_grading(course, student)
-        if scores_client is None:
-            scores_client = ScoresClient.from_field_data_cache(field_data_cache)
-
-    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
-    # scores that were registered with the submissions API, which for the moment
-    # means only openassessment (edx-ora2)
-    # We need to import this here to avoid a circular dependency of the form:
-    # XBlock --> submissions --> Django Rest Framework error strings -->
-    # Django translation --> ... --> courseware --> submissions
-    from submissions import api as sub_api  # installed from the edx-submissions repository
+        persistent_grades.fetch()
+
+    # If every graded subsection has an up to date persisted grade, there is
+    # no need to load any student state at all.
+    needs_scoring_state = not all(
+        persistent_grades.has_subsection(section['section_descriptor'].location)
+        for sections in grading_context['graded_sections'].itervalues()
+        for section in sections
+    )
 
-    with outer_atomic():
-        submissions_scores = sub_api.get_scores(
-            course.id.to_deprecated_string(),
-            anonymous_id_for_user(student, course.id)
-        )
+    owns_max_scores_cache = max_scores_cache is None
+    if owns_max_scores_cache:
         max_scores_cache = MaxScoresCache.create_for_course(course)
+    if not needs_scoring_state:
+        submissions_scores = {}
+    else:
+        with outer_atomic():
+            if field_data_cache is None:
+                field_data_cache = field_data_cache_for_grading(course, student)
+            if scores_client is None:
+                scores_client = ScoresClient.from_field_data_cache(field_data_cache)
+
+        # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
+        # scores that were registered with the submissions API, which for the moment
+        # means only openassessment (edx-ora2)
+        # We need to import this here to avoid a circular dependency of the form:
+        # XBlock --> submissions --> Django Rest Framework error strings -->
+        # Django translation --> ... --> courseware --> submissions
+        from submissions import api as sub_api  # installed from the edx-submissions repository
+
+        with outer_atomic():
+            if submissions_scores is None:
+                submissions_scores = sub_api.get_scores(
+                    course.id.to_deprecated_string(),
+                    anonymous_id_for_user(student, course.id)
+                )
 
-        # For the moment, we have to get scorable_locations from field_data_cache
-        # and not from scores_client, because scores_client is ignorant of things
-        # in the submissions API. As a further refactoring step, submissions should
-        # be hidden behind the ScoresClient.
-        max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
+            # For the moment, we have to get scorable_locations from field_data_cache
+            # and not from scores_client, because scores_client is ignorant of things
+            # in the submissions API. As a further refactoring step, submissions should
+            # be hidden behind the ScoresClient.
+            if owns_max_scores_cache:
+                max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
 
-    grading_context = course.grading_context
     raw_scores = []
+    now = datetime.now(UTC)
 
     totaled_scores = {}
     # This next complicated loop is just to collect the totaled_scores, which is
@@ -376,15 +601,26 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
             section_descriptor = section['section_descriptor']
             section_name = section_descriptor.display_name_with_default
 
+            persisted_grade = persistent_grades.get_subsection(section_descriptor.location, section_name)
+            if persisted_grade is not None:
+                graded_total, scores = persisted_grade
+                if keep_raw_scores:
+                    raw_scores += scores
+                if graded_total.possible > 0:
+                    format_scores.append(graded_total)
+                continue
+
             with outer_atomic():
                 # some problems have state that is updated independently of interaction
                 # with the LMS, so they need to always be scored. (E.g. combinedopenended ORA1)
                 # TODO This block is causing extra savepoints to be fired that are empty because no queries are executed
                 # during the loop. When refactoring this code please keep this outer_atomic call in mind and ensure we
                 # are not making unnecessary database queries.
-                should_grade_section = any(
+                always_recalculate = any(
                     descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
                 )
+                should_grade_section = always_recalculate
+                should_persist_grade = not always_recalculate
 
                 # If there are no problems that always have to be regraded, check to
                 # see if any of our locations are in the scores from the submissions
@@ -401,6 +637,10 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
                         for descriptor in section['xmoduledescriptors']
                     )
 
+                # Any score change to one of these blocks makes a persisted
+                # grade for this section stale.
+                visible_blocks = [descriptor.location for descriptor in section['xmoduledescriptors']]
+
                 # If we haven't seen a single problem in the section, we don't have
                 # to grade it at all! We can assume 0%
                 if should_grade_section:
@@ -416,6 +656,9 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
 
                     descendants = yield_dynamic_descriptor_descendants(section_descriptor, student.id, create_module)
                     for module_descriptor in descendants:
+                        visible_blocks.append(module_descriptor.location)
+                        if access_may_change(module_descriptor, now):
+                            should_persist_grade = False
                         user_access = has_access(
                             student, 'load', module_descriptor, module_descriptor.location.course_key
                         )
@@ -458,8 +701,14 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
                     if keep_raw_scores:
                         raw_scores += scores
                 else:
+                    scores = []
                     graded_total = Score(0.0, 1.0, True, section_name, None)
 
+                if should_persist_grade:
+                    persistent_grades.set_subsection(
+                        section_descriptor.location, graded_total, scores, visible_blocks
+                    )
+
                 #Add the graded total to totaled_scores
                 if graded_total.possible > 0:
                     format_scores.append(graded_total)
@@ -488,7 +737,9 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
             # so grader can be double-checked
             grade_summary['raw_scores'] = raw_scores
 
-        max_scores_cache.push_to_remote()
+        if owns_max_scores_cache:
+            max_scores_cache.push_to_remote()
+        persistent_grades.push_to_db()
 
     return grade_summary
 
@@ -589,6 +840,11 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
         # be hidden behind the ScoresClient.
         max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
 
+        # Scores persisted by a previous grading pass spare us from creating
+        # modules just to find out how much a problem is worth.
+        persistent_grades = PersistentGradesCache(student, course)
+        persistent_grades.fetch()
+
     chapters = []
     locations_to_children = defaultdict(list)
     locations_to_weighted_scores = {}
@@ -614,14 +870,18 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
                         section_module, student.id, module_creator
                 ):
                     locations_to_children[module_descriptor.parent].append(module_descriptor.location)
-                    (correct, total) = get_score(
-                        student,
-                        module_descriptor,
-                        module_creator,
-                        scores_client,
-                        submissions_scores,
-                        max_scores_cache,
-                    )
+                    persisted_score = persistent_grades.get_problem_score(module_descriptor.location)
+                    if persisted_score is not None:
+                        (correct, total) = persisted_score
+                    else:
+                        (correct, total) = get_score(
+                            student,
+                            module_descriptor,
+                            module_creator,
+                            scores_client,
+                            submissions_scores,
+                            max_scores_cache,
+                        )
                     if correct is None and total is None:
                         continue
 
@@ -752,7 +1012,156 @@ def get_score(user, problem_descriptor, module_creator, scores_client, submissio
     return weighted_score(correct, total, problem_descriptor.weight)
 
 
-def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
+class _DeferredFieldDataCache(object):
+    """
+    Stands in for a student's FieldDataCache while grading in batches.
+
+    The scores needed for grading are loaded in bulk for the whole batch, so
+    the student's real FieldDataCache is only built if grading has to
+    instantiate a module, e.g. for a problem with dynamic children or without
+    a cached max score. It is then taken from the batch's
+    MultiUserFieldDataCache, which loads the state of the whole batch on first
+    use.
+    """
+    def __init__(self, course, user, scorable_locations, batch_field_data_cache):
+        self.course_id = course.id
+        self.user = user
+        self.scorable_locations = scorable_locations
+        self._batch_field_data_cache = batch_field_data_cache
+        self._field_data_cache = None
+
+    def __getattr__(self, name):
+        if self._field_data_cache is None:
+            self._field_data_cache = self._batch_field_data_cache.for_user(self.user)
+        return getattr(self._field_data_cache, name)
+
+
+class _DeferredMultiUserFieldDataCache(object):
+    """
+    Creates the MultiUserFieldDataCache for grading a batch of students the
+    first time a FieldDataCache is needed for any of them.
+    """
+    def __init__(self, course, students):
+        self._course = course
+        self._students = students
+        self._field_data_cache = None
+
+    def for_user(self, user):
+        """
+        Return the FieldDataCache for grading `user`.
+        """
+        if self._field_data_cache is None:
+            self._field_data_cache = multi_user_field_data_cache_for_grading(self._course, self._students)
+        return self._field_data_cache.for_user(user)
+
+
+def scorable_locations_for_grading(course):
+    """
+    Return the set of locations in the course that a student could have a
+    score for, i.e. the `scorable_locations` of `field_data_cache_for_grading`
+    for any student.
+    """
+    scorable_locations = set()
+    with modulestore().bulk_operations(course.id):
+        stack = [course]
+        while stack:
+            descriptor = stack.pop()
+            if descriptor_affects_grading(course.block_types_affecting_grading, descriptor) and descriptor.has_score:
+                scorable_locations.add(descriptor.location)
+            stack.extend(descriptor.get_children() + descriptor.get_required_module_descriptors())
+    return scorable_locations
+
+
+def _submissions_scores_for_students(course_key, anonymous_ids):
+    """
+    Return a dict of anonymous_id -> {item_id: (earned, possible)} for all of
+    the given anonymous student ids, in the format returned by
+    `submissions.api.get_scores`, using a single query.
+    """
+    # Imported here for the same reason as the submissions api in `_grade`.
+    from submissions.models import ScoreSummary
+
+    scores = {anonymous_id: {} for anonymous_id in anonymous_ids}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=course_key.to_deprecated_string(),
+        student_item__student_id__in=anonymous_ids,
+    ).select_related('latest', 'student_item')
+    for summary in score_summaries:
+        if not summary.latest.is_hidden():
+            scores[summary.student_item.student_id][summary.student_item.item_id] = (
+                summary.latest.points_earned, summary.latest.points_possible
+            )
+    return scores
+
+
+def _iterate_grades_in_batches(course, students, keep_raw_scores, batch_size):
+    """
+    Batched implementation of `iterate_grades_for`.
+
+    The course's scorable locations and the remote max scores are loaded
+    once, and the StudentModule scores and submissions scores are loaded with
+    one query per batch of `batch_size` students, instead of once per student.
+    Student state, when grading needs it, is also loaded for the whole batch.
+    Only one batch of students is loaded at a time.
+    """
+    scorable_locations = scorable_locations_for_grading(course)
+    max_scores_cache = MaxScoresCache.create_for_course(course)
+    max_scores_cache.fetch_from_remote(scorable_locations)
+
+    students = students.iterator() if isinstance(students, QuerySet) else iter(students)
+    for batch in iter(lambda: list(islice(students, batch_size)), []):
+        with outer_atomic():
+            anonymous_ids = {student.id: anonymous_id_for_user(student, course.id) for student in batch}
+            scores_clients = ScoresClient.create_for_users(
+                course.id, [student.id for student in batch], scorable_locations
+            )
+            submissions_scores = _submissions_scores_for_students(course.id, anonymous_ids.values())
+        batch_field_data_cache = _DeferredMultiUserFieldDataCache(course, batch)
+
+        for batch_student in batch:
+            def _grade_student(batch_student=batch_student):
+                """Grade a single student of the batch from the preloaded scores."""
+                request = _get_mock_request(batch_student)
+                request.session = {}
+                return grade(
+                    batch_student,
+                    request,
+                    course,
+                    keep_raw_scores,
+                    field_data_cache=_DeferredFieldDataCache(
+                        course, batch_student, scorable_locations, batch_field_data_cache
+                    ),
+                    scores_client=scores_clients[batch_student.id],
+                    submissions_scores=submissions_scores[anonymous_ids[batch_student.id]],
+                    max_scores_cache=max_scores_cache,
+                )
+            yield _grade_student_safely(course, batch_student, _grade_student)
+
+        max_scores_cache.push_to_remote()
+
+
+def _grade_student_safely(course, student, grade_student):
+    """
+    Call `grade_student` and return the (student, gradeset, err_msg) tuple
+    yielded by `iterate_grades_for`.
+    """
+    with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
+        try:
+            return student, grade_student(), ""
+        except Exception as exc:  # pylint: disable=broad-except
+            # Keep marching on even if this student couldn't be graded for
+            # some reason, but log it for future reference.
+            log.exception(
+                'Cannot grade student %s (%s) in course %s because of exception: %s',
+                student.username,
+                student.id,
+                course.id,
+                exc.message
+            )
+            return student, {}, exc.message
+
+
+def iterate_grades_for(course_or_id, students, keep_raw_scores=False, batch_size=None):
     """Given a course_id and an iterable of students (User), yield a tuple of:
 
     (student, gradeset, err_msg) for every student enrolled in the course.
@@ -760,6 +1169,10 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     If an error occurred, gradeset will be an empty dict and err_msg will be an
     exception message. If there was no error, err_msg is an empty string.
 
+    If batch_size is given, students are graded in batches of that size,
+    loading the scores of each batch in bulk rather than once per student.
+    The gradesets are the same either way.
+
     The gradeset is a dictionary with the following fields:
 
     - grade : A final letter grade.
@@ -775,28 +1188,22 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     else:
         course = course_or_id
 
+    if batch_size:
+        for result in _iterate_grades_in_batches(course, students, keep_raw_scores, batch_size):
+            yield result
+        return
+
     for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
-            try:
-                request = _get_mock_request(student)
-                # Grading calls problem rendering, which calls masquerading,
-                # which checks session vars -- thus the empty session dict below.
-                # It's not pretty, but untangling that is currently beyond the
-                # scope of this feature.
-                request.session = {}
-                gradeset = grade(student, request, course, keep_raw_scores)
-                yield student, gradeset, ""
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course.id,
-                    exc.message
-                )
-                yield student, {}, exc.message
+        def _grade_student(student=student):
+            """Grade a single student, loading all of their state."""
+            request = _get_mock_request(student)
+            # Grading calls problem rendering, which calls masquerading,
+            # which checks session vars -- thus the empty session dict below.
+            # It's not pretty, but untangling that is currently beyond the
+            # scope of this feature.
+            request.session = {}
+            return grade(student, request, course, keep_raw_scores)
+        yield _grade_student_safely(course, student, _grade_student)
 
 
 def _get_mock_request(student):
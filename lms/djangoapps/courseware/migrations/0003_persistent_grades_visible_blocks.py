@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import xmodule_django.models
+from django.conf import settings
+
+
+def delete_persistent_subsection_grades(apps, schema_editor):
+    """
+    Delete the persisted subsection grades, which are recomputed on demand,
+    as they could no longer be invalidated without their visible blocks.
+    """
+    PersistentSubsectionGrade = apps.get_model("courseware", "PersistentSubsectionGrade")
+    PersistentSubsectionGrade.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courseware', '0002_persistent_grades'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersistentSubsectionGradeVisibleBlock',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('course_id', xmodule_django.models.CourseKeyField(max_length=255)),
+                ('subsection_usage_key', xmodule_django.models.LocationKeyField(max_length=255)),
+                ('usage_key', xmodule_django.models.LocationKeyField(max_length=255)),
+                ('user', models.ForeignKey(to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='persistentsubsectiongradevisibleblock',
+            index_together=set([('user', 'course_id', 'usage_key')]),
+        ),
+        migrations.RunPython(delete_persistent_subsection_grades, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='persistentsubsectiongrade',
+            name='visible_blocks',
+        ),
+    ]
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import xmodule_django.models
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courseware', '0003_persistent_grades_visible_blocks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersistentGradesVersion',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('course_id', xmodule_django.models.CourseKeyField(max_length=255)),
+                ('version', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='persistentgradesversion',
+            unique_together=set([('user', 'course_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='persistentcoursegrade',
+            unique_together=set([]),
+        ),
+        migrations.RemoveField(
+            model_name='persistentcoursegrade',
+            name='user',
+        ),
+        migrations.DeleteModel(
+            name='PersistentCourseGrade',
+        ),
+    ]
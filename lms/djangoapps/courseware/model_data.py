@@ -9,6 +9,9 @@ Classes to provide the LMS runtime data storage to XBlocks.
 :class:`FieldDataCache`: A object which provides a read-through prefetch cache
     of data to support XBlock fields within a limited set of scopes.
 
+:class:`MultiUserFieldDataCache`: A prefetch cache of the same data for many
+    users at once, which hands out a :class:`FieldDataCache` for each of them.
+
 The remaining classes in this module provide read-through prefetch cache implementations
 for specific scopes. The individual classes provide the knowledge of what are the essential
 pieces of information for each scope, and thus how to cache, prefetch, and create new field data
@@ -25,6 +28,7 @@ import json
 from abc import abstractmethod, ABCMeta
 from collections import defaultdict, namedtuple
 from .models import (
+    chunks,
     StudentModule,
     XModuleUserStateSummaryField,
     XModuleStudentPrefsField,
@@ -86,6 +90,41 @@ def _all_block_types(descriptors, aside_types):
     return block_types
 
 
+def _fields_to_cache(descriptors):
+    """
+    Returns a map of scopes to fields in that scope that should be cached
+    """
+    scope_map = defaultdict(set)
+    for descriptor in descriptors:
+        for field in descriptor.fields.values():
+            scope_map[field.scope].add(field)
+    return scope_map
+
+
+def _descendant_descriptors(descriptor, depth, descriptor_filter):
+    """
+    Return a list of all child descriptors down to the specified depth
+    that match the descriptor filter. Includes `descriptor`
+
+    descriptor: The parent to search inside
+    depth: The number of levels to descend, or None for infinite depth
+    descriptor_filter(descriptor): A function that returns True
+        if descriptor should be included in the results
+    """
+    if descriptor_filter(descriptor):
+        descriptors = [descriptor]
+    else:
+        descriptors = []
+
+    if depth is None or depth > 0:
+        new_depth = depth - 1 if depth is not None else depth
+
+        for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
+            descriptors.extend(_descendant_descriptors(child, new_depth, descriptor_filter))
+
+    return descriptors
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -750,32 +789,8 @@ class FieldDataCache(object):
             descriptor_filter is a function that accepts a descriptor and return whether the field data
                 should be cached
         """
-
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
-
-            return descriptors
-
         with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+            descriptors = _descendant_descriptors(descriptor, depth, descriptor_filter)
 
         self.add_descriptors_to_cache(descriptors)
 
@@ -801,11 +816,7 @@ class FieldDataCache(object):
         """
         Returns a map of scopes to fields in that scope that should be cached
         """
-        scope_map = defaultdict(set)
-        for descriptor in descriptors:
-            for field in descriptor.fields.values():
-                scope_map[field.scope].add(field)
-        return scope_map
+        return _fields_to_cache(descriptors)
 
     @contract(key=DjangoKeyValueStore.Key)
     def get(self, key):
@@ -930,6 +941,150 @@ class FieldDataCache(object):
         return sum(len(cache) for cache in self.cache.values())
 
 
+class MultiUserFieldDataCache(object):
+    """
+    A cache of the field data needed to supply the same descriptors for
+    many users in a course, prefetched with chunked bulk queries rather than
+    with one set of queries per user.
+
+    Use :meth:`for_user` to get a :class:`FieldDataCache` for one of the
+    users, served from the prefetched data, to back the
+    :class:`DjangoKeyValueStore` of that user's XBlock runtime.
+    """
+    def __init__(self, descriptors, course_id, users, asides=None, chunk_size=500):
+        """
+        Arguments
+        descriptors: A list of XModuleDescriptors.
+        course_id: The id of the current course
+        users: The authenticated users for which to cache data
+        asides: The list of aside types to load, or None to prefetch no asides.
+        chunk_size: The maximum number of users, and of blocks, per query
+        """
+        if asides is None:
+            self.asides = []
+        else:
+            self.asides = asides
+
+        assert isinstance(course_id, CourseKey)
+        self.course_id = course_id
+        self.chunk_size = chunk_size
+        self.scorable_locations = set(desc.location for desc in descriptors if desc.has_score)
+
+        # Map of user id to the user's caches for each user-specific scope.
+        self._user_caches = {
+            user.id: {
+                Scope.user_state: UserStateCache(user, self.course_id),
+                Scope.user_info: UserInfoCache(user),
+                Scope.preferences: PreferencesCache(user),
+            }
+            for user in users
+        }
+
+        # Scope.user_state_summary is not user-specific, so one cache
+        # is shared by all users.
+        self._user_state_summary = UserStateSummaryCache(self.course_id)
+
+        fields = _fields_to_cache(descriptors)
+        if fields.get(Scope.user_state):
+            self._read_user_state(_all_usage_keys(descriptors, self.asides))
+        if fields.get(Scope.preferences):
+            self._read_preferences(fields[Scope.preferences], _all_block_types(descriptors, self.asides))
+        if fields.get(Scope.user_info):
+            self._read_user_info(fields[Scope.user_info])
+        if fields.get(Scope.user_state_summary):
+            self._user_state_summary.cache_fields(fields[Scope.user_state_summary], descriptors, self.asides)
+
+    @classmethod
+    def cache_for_descriptor_descendents(cls, course_id, users, descriptor, depth=None,
+                                         descriptor_filter=lambda descriptor: True,
+                                         asides=None, chunk_size=500):
+        """
+        course_id: the course in the context of which we want StudentModules.
+        users: the django users for whom to load modules.
+        descriptor: An XModuleDescriptor
+        depth is the number of levels of descendant modules to load StudentModules for, in addition to
+            the supplied descriptor. If depth is None, load all descendant StudentModules
+        descriptor_filter is a function that accepts a descriptor and return whether the field data
+            should be cached
+        """
+        with modulestore().bulk_operations(descriptor.location.course_key):
+            descriptors = _descendant_descriptors(descriptor, depth, descriptor_filter)
+        return cls(descriptors, course_id, users, asides=asides, chunk_size=chunk_size)
+
+    def for_user(self, user):
+        """
+        Return a :class:`FieldDataCache` for `user`, which must be one of the
+        users this cache was created for, backed by the prefetched data.
+        Fields written through it are visible to later calls for the same user.
+        """
+        if user.id not in self._user_caches:
+            raise ValueError("Field data was not prefetched for user {}".format(user.id))
+
+        field_data_cache = FieldDataCache([], self.course_id, user, asides=self.asides)
+        field_data_cache.scorable_locations = set(self.scorable_locations)
+        field_data_cache.cache.update(self._user_caches[user.id])
+        field_data_cache.cache[Scope.user_state_summary] = self._user_state_summary
+        return field_data_cache
+
+    def _add_field_object(self, scope, user_id, field_object):
+        """
+        Add `field_object` to the cache for `scope` of the user with `user_id`.
+        """
+        # pylint: disable=protected-access
+        scope_cache = self._user_caches[user_id][scope]
+        scope_cache._cache[scope_cache._cache_key_for_field_object(field_object)] = field_object
+
+    def _read_user_state(self, usage_keys):
+        """
+        Load the Scope.user_state of all users for `usage_keys`, with one
+        query per chunk of users and chunk of blocks.
+        """
+        for user_ids_chunk in chunks(self._user_caches.keys(), self.chunk_size):
+            for usage_keys_chunk in chunks(usage_keys, self.chunk_size):
+                student_modules = StudentModule.objects.filter(
+                    course_id=self.course_id,
+                    student_id__in=user_ids_chunk,
+                    module_state_key__in=usage_keys_chunk,
+                ).values_list('student_id', 'module_state_key', 'state')
+                for user_id, usage_key, state in student_modules:
+                    if state is None:
+                        continue
+                    state = json.loads(state)
+                    # As in DjangoXBlockUserStateClient.get_many, the empty
+                    # dict means that the state has been deleted.
+                    if state == {}:
+                        continue
+                    usage_key = UsageKey.from_string(usage_key).map_into_course(self.course_id)
+                    self._user_caches[user_id][Scope.user_state]._cache[usage_key] = state  # pylint: disable=protected-access
+
+    def _read_preferences(self, fields, block_types):
+        """
+        Load the Scope.preferences `fields` of all users for `block_types`.
+        """
+        for user_ids_chunk in chunks(self._user_caches.keys(), self.chunk_size):
+            field_objects = XModuleStudentPrefsField.objects.chunked_filter(
+                'module_type__in',
+                block_types,
+                student_id__in=user_ids_chunk,
+                field_name__in=set(field.name for field in fields),
+                chunk_size=self.chunk_size,
+            )
+            for field_object in field_objects:
+                self._add_field_object(Scope.preferences, field_object.student_id, field_object)
+
+    def _read_user_info(self, fields):
+        """
+        Load the Scope.user_info `fields` of all users.
+        """
+        for user_ids_chunk in chunks(self._user_caches.keys(), self.chunk_size):
+            field_objects = XModuleStudentInfoField.objects.filter(
+                student_id__in=user_ids_chunk,
+                field_name__in=set(field.name for field in fields),
+            )
+            for field_object in field_objects:
+                self._add_field_object(Scope.user_info, field_object.student_id, field_object)
+
+
 class ScoresClient(object):
     """
     Basic client interface for retrieving Score information.
@@ -989,6 +1144,32 @@ class ScoresClient(object):
         client.fetch_scores(fd_cache.scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_key, user_ids, locations, chunk_size=500):
+        """
+        Create a fetched ScoresClient for each of `user_ids`, loading all of
+        their scores for `locations` with one query per `chunk_size` users.
+
+        Returns a dict mapping user_id -> ScoresClient.
+        """
+        clients = {user_id: cls(course_key, user_id) for user_id in user_ids}
+        locations = set(locations)
+        for user_ids_chunk in chunks(user_ids, chunk_size):
+            # Filtering on locations is done here rather than in the query, to
+            # keep the number of query parameters bounded by chunk_size.
+            scores_qset = StudentModule.objects.filter(
+                student_id__in=user_ids_chunk,
+                course_id=course_key,
+            ).values_list('student_id', 'module_state_key', 'grade', 'max_grade')
+            for user_id, location, correct, total in scores_qset:
+                location = UsageKey.from_string(location).map_into_course(course_key)
+                if location in locations:
+                    clients[user_id]._locations_to_scores[location] = cls.Score(correct, total)  # pylint: disable=protected-access
+
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -18,10 +18,13 @@ import itertools
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
 
@@ -313,6 +316,104 @@ class StudentFieldOverride(TimeStampedModel):
     value = models.TextField(default='null')
 
 
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    Stores the computed scores of a single graded subsection for a user.
+
+    Rows are written by `courseware.grades` as a side effect of grading and are
+    only trusted while `course_version` matches the version of the published
+    course they were computed against. A score change for any of the
+    subsection's `PersistentSubsectionGradeVisibleBlock`s deletes the row, so
+    that the next grading pass recomputes just that subsection.
+    """
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    usage_key = LocationKeyField(max_length=255)
+
+    # The published version of the course that these scores were computed against.
+    course_version = models.CharField(max_length=255, blank=True)
+
+    # The graded total of the subsection, as returned by `graders.aggregate_scores`.
+    earned_graded = models.FloatField()
+    possible_graded = models.FloatField()
+
+    # JSON list of [earned, possible, graded, display_name, location] entries,
+    # one per scored block in the subsection.
+    scores = models.TextField(default='[]')
+
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('user', 'course_id', 'usage_key'),)
+
+    @classmethod
+    def invalidate(cls, user_id, course_key, usage_key):
+        """
+        Delete the persisted grades of `user_id` in `course_key` that depend
+        on `usage_key`, and keep grades that are being computed from the
+        user's previous scores from being persisted.
+        """
+        if not PersistentGradesVersion.objects.filter(user_id=user_id, course_id=course_key).update(
+                version=F('version') + 1
+        ):
+            # No grades of the user were ever read or persisted.
+            return
+        stale_subsections = PersistentSubsectionGradeVisibleBlock.objects.filter(
+            user_id=user_id, course_id=course_key, usage_key=usage_key
+        ).values('subsection_usage_key')
+        cls.objects.filter(user_id=user_id, course_id=course_key, usage_key__in=stale_subsections).delete()
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} {} = {}/{}".format(
+            self.user_id, self.course_id, self.usage_key, self.earned_graded, self.possible_graded
+        )
+
+
+class PersistentSubsectionGradeVisibleBlock(models.Model):
+    """
+    Records that the persisted grade of a user's subsection depends on the
+    score of a block, i.e. that it was walked to compute the grade.
+
+    Rows are replaced whenever the subsection's grade is persisted again, and
+    are indexed by block so that a score change finds the grades it makes
+    stale without reading every grade of the user.
+    """
+    user = models.ForeignKey(User)
+    course_id = CourseKeyField(max_length=255)
+    subsection_usage_key = LocationKeyField(max_length=255)
+    usage_key = LocationKeyField(max_length=255)
+
+    class Meta(object):
+        app_label = "courseware"
+        index_together = (('user', 'course_id', 'usage_key'),)
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGradeVisibleBlock] {}: {} {} -> {}".format(
+            self.user_id, self.course_id, self.usage_key, self.subsection_usage_key
+        )
+
+
+class PersistentGradesVersion(models.Model):
+    """
+    Counts the score changes of a user in a course since their persisted
+    grades were first read.
+
+    `courseware.grades` reads the version before any student state, and only
+    persists the grades it computed if the version hasn't changed since, so
+    that a score change that lands while a grade is being computed can't
+    leave a stale grade behind.
+    """
+    user = models.ForeignKey(User)
+    course_id = CourseKeyField(max_length=255)
+    version = models.IntegerField(default=0)
+
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('user', 'course_id'),)
+
+    def __unicode__(self):
+        return u"[PersistentGradesVersion] {}: {} = {}".format(self.user_id, self.course_id, self.version)
+
+
 # Signal that indicates that a user's score for a problem has been updated.
 # This signal is generated when a scoring event occurs either within the core
 # platform or in the Submissions module. Note that this signal will be triggered
@@ -409,3 +510,41 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(SCORE_CHANGED)
+def invalidate_persistent_grades_on_score_change(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop any persisted grades that depend on the block whose score changed.
+    See the definition of SCORE_CHANGED for a description of the signal.
+    """
+    user_id = kwargs.get('user_id', None)
+    course_id = kwargs.get('course_id', None)
+    usage_id = kwargs.get('usage_id', None)
+    if None in (user_id, course_id, usage_id):
+        return
+
+    try:
+        course_key = CourseKey.from_string(course_id)
+        usage_key = UsageKey.from_string(usage_id).map_into_course(course_key)
+    except InvalidKeyError:
+        log.warning(
+            u"Unable to invalidate persistent grades for course_id: %s, usage_id: %s", course_id, usage_id
+        )
+        return
+
+    PersistentSubsectionGrade.invalidate(user_id, course_key, usage_key)
+
+
+@receiver(post_delete, sender=StudentModule)
+def invalidate_persistent_grades_on_state_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Deleting a StudentModule (e.g. when an instructor resets a student's state)
+    discards its score, so drop any persisted grades that depend on it.
+    """
+    if instance.grade is not None or instance.max_grade is not None:
+        PersistentSubsectionGrade.invalidate(
+            instance.student_id,
+            instance.course_id,
+            instance.module_state_key.map_into_course(instance.course_id),
+        )
@@ -1,6 +1,10 @@
 """
 Test grade calculation.
 """
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.http import Http404
 from django.test import TestCase
 from django.test.client import RequestFactory
@@ -9,8 +13,19 @@ from mock import patch, MagicMock
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
-
-from courseware.grades import field_data_cache_for_grading, grade, iterate_grades_for, MaxScoresCache, ProgressSummary
+from pytz import UTC
+
+from courseware.grades import (
+    field_data_cache_for_grading,
+    grade,
+    grade_for_percentage,
+    iterate_grades_for,
+    MaxScoresCache,
+    multi_user_field_data_cache_for_grading,
+    ProgressSummary,
+)
+from courseware.model_data import set_score
+from courseware.models import PersistentSubsectionGrade, SCORE_CHANGED, StudentModule
 from student.tests.factories import UserFactory
 from student.models import CourseEnrollment
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -128,6 +143,76 @@ class TestGradeIteration(ModuleStoreTestCase):
         return students_to_gradesets, students_to_errors
 
 
+class TestBatchedGradeIteration(ModuleStoreTestCase):
+    """
+    Test that grading students in batches gives the same gradesets as grading
+    them one at a time.
+    """
+    def setUp(self):
+        super(TestBatchedGradeIteration, self).setUp()
+        self.course = CourseFactory.create(
+            grading_policy={
+                "GRADER": [{"type": "Homework", "min_count": 1, "drop_count": 0, "short_label": "HW", "weight": 1.0}],
+            },
+        )
+        chapter = ItemFactory.create(category='chapter', parent=self.course)
+        sequential = ItemFactory.create(category='sequential', parent=chapter, graded=True, format="Homework")
+        vertical = ItemFactory.create(category='vertical', parent=sequential)
+        self.problems = [ItemFactory.create(category='problem', parent=vertical) for __ in xrange(2)]
+        self.students = [UserFactory.create() for __ in xrange(5)]
+        for index, student in enumerate(self.students):
+            CourseEnrollment.enroll(student, self.course.id)
+            for problem in self.problems:
+                set_score(student.id, problem.location, index % 3, 2)
+        self.course = self.store.get_course(self.course.id, depth=None)
+
+    def _gradesets(self, **kwargs):
+        """Return a dict of student -> (percent, raw_scores, err_msg)"""
+        return {
+            student: (gradeset.get('percent'), gradeset.get('raw_scores'), err_msg)
+            for student, gradeset, err_msg in iterate_grades_for(
+                self.course, self.students, keep_raw_scores=True, **kwargs
+            )
+        }
+
+    def test_batched_grades_match(self):
+        self.assertEqual(self._gradesets(), self._gradesets(batch_size=2))
+
+    def test_batched_students_are_loaded_lazily(self):
+        students = User.objects.filter(id__in=[student.id for student in self.students]).order_by('id')
+        gradesets = iterate_grades_for(self.course, students, batch_size=2)
+        next(gradesets)
+        # the students are streamed rather than all loaded into the queryset
+        self.assertIsNone(students._result_cache)  # pylint: disable=protected-access
+        self.assertEqual(
+            [student for student, __, __ in gradesets],
+            sorted(self.students, key=lambda student: student.id)[1:]
+        )
+
+    @patch('courseware.grades.multi_user_field_data_cache_for_grading')
+    @patch('courseware.grades.field_data_cache_for_grading')
+    @patch('submissions.api.get_scores')
+    def test_batched_scores_are_loaded_in_bulk(self, mock_get_scores, mock_field_data_cache, mock_multi_user_cache):
+        list(iterate_grades_for(self.course, self.students, batch_size=2))
+        self.assertFalse(mock_get_scores.called)
+        self.assertFalse(mock_field_data_cache.called)
+        self.assertFalse(mock_multi_user_cache.called)
+
+    def test_batched_state_is_loaded_in_bulk(self):
+        # Without a score, the problems are instantiated to find their max score.
+        StudentModule.objects.filter(student=self.students[0]).delete()
+
+        with patch(
+            'courseware.grades.multi_user_field_data_cache_for_grading',
+            wraps=multi_user_field_data_cache_for_grading,
+        ) as mock_multi_user_cache:
+            with patch('courseware.grades.field_data_cache_for_grading') as mock_field_data_cache:
+                batched_gradesets = self._gradesets(batch_size=2)
+        self.assertFalse(mock_field_data_cache.called)
+        self.assertEqual(mock_multi_user_cache.call_count, 1)
+        self.assertEqual(self._gradesets(), batched_gradesets)
+
+
 class TestMaxScoresCache(ModuleStoreTestCase):
     """
     Tests for the MaxScoresCache
@@ -169,6 +254,115 @@ class TestMaxScoresCache(ModuleStoreTestCase):
         self.assertEqual(max_scores_cache.num_cached_from_remote(), 1)
 
 
+@patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+class TestPersistentGrades(ModuleStoreTestCase):
+    """
+    Tests that grades are persisted per subsection and reused by later calls.
+    """
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        self.student = UserFactory.create()
+        self.course = CourseFactory.create(
+            grading_policy={
+                "GRADER": [{"type": "Homework", "min_count": 1, "drop_count": 0, "short_label": "HW", "weight": 1.0}],
+            },
+        )
+        chapter = ItemFactory.create(category='chapter', parent=self.course)
+        self.sequential = ItemFactory.create(
+            category='sequential', parent=chapter, graded=True, format="Homework"
+        )
+        self.vertical = ItemFactory.create(category='vertical', parent=self.sequential)
+        self.problem = ItemFactory.create(category='problem', parent=self.vertical)
+
+        CourseEnrollment.enroll(self.student, self.course.id)
+        self.request = RequestFactory().get('/')
+        self.course = self.store.get_course(self.course.id, depth=None)
+
+    def _grade(self):
+        """Grade the test student"""
+        return grade(self.student, self.request, self.course)
+
+    def test_grades_are_persisted(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        self._grade()
+
+        subsection_grade = PersistentSubsectionGrade.objects.get(user=self.student, course_id=self.course.id)
+        self.assertEqual(subsection_grade.usage_key, self.sequential.location)
+        self.assertEqual(subsection_grade.earned_graded, 1)
+        self.assertEqual(subsection_grade.possible_graded, 2)
+
+    def test_persisted_grades_skip_student_state(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        first_summary = self._grade()
+        with patch('courseware.grades.field_data_cache_for_grading') as mock_field_data_cache:
+            second_summary = self._grade()
+            self.assertFalse(mock_field_data_cache.called)
+        self.assertEqual(first_summary['percent'], second_summary['percent'])
+
+    def test_score_change_invalidates(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        self._grade()
+        set_score(self.student.id, self.problem.location, 2, 2)
+        SCORE_CHANGED.send(
+            sender=None,
+            points_possible=2,
+            points_earned=2,
+            user_id=self.student.id,
+            course_id=unicode(self.course.id),
+            usage_id=unicode(self.problem.location),
+        )
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.student).exists())
+        self.assertEqual(self._grade()['percent'], 1.0)
+
+    def test_score_change_while_grading(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+
+        def change_score(*args):
+            """Change the score once the student state has been read."""
+            set_score(self.student.id, self.problem.location, 2, 2)
+            PersistentSubsectionGrade.invalidate(self.student.id, self.course.id, self.problem.location)
+            return grade_for_percentage(*args)
+
+        with patch('courseware.grades.grade_for_percentage', side_effect=change_score):
+            self.assertEqual(self._grade()['percent'], 0.5)
+
+        # the grade computed from the previous score isn't persisted
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.student).exists())
+        self.assertEqual(self._grade()['percent'], 1.0)
+
+    def test_invalidate(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        self._grade()
+
+        # a block outside of the subsection doesn't invalidate its grade
+        other_problem = ItemFactory.create(category='problem', parent=self.course)
+        with self.assertNumQueries(2):
+            PersistentSubsectionGrade.invalidate(self.student.id, self.course.id, other_problem.location)
+        self.assertTrue(PersistentSubsectionGrade.objects.filter(user=self.student).exists())
+
+        # the grade is deleted without reading the user's grades
+        with self.assertNumQueries(2):
+            PersistentSubsectionGrade.invalidate(self.student.id, self.course.id, self.problem.location)
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.student).exists())
+
+    def _assert_not_persisted(self, **problem_kwargs):
+        """
+        Assert that the subsection isn't persisted once it contains a problem
+        created with the given arguments.
+        """
+        ItemFactory.create(category='problem', parent=self.vertical, **problem_kwargs)
+        self.course = self.store.get_course(self.course.id, depth=None)
+        set_score(self.student.id, self.problem.location, 1, 2)
+        self._grade()
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.student).exists())
+
+    def test_unstarted_content_is_not_persisted(self):
+        self._assert_not_persisted(start=datetime.now(UTC) + timedelta(days=1))
+
+    def test_group_restricted_content_is_not_persisted(self):
+        self._assert_not_persisted(group_access={0: [0]})
+
+
 class TestFieldDataCacheScorableLocations(ModuleStoreTestCase):
     """
     Make sure we can filter the locations we pull back student state for via
@@ -6,7 +6,7 @@ from mock import Mock, patch
 from nose.plugins.attrib import attr
 from functools import partial
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError, MultiUserFieldDataCache
 from courseware.models import StudentModule, XModuleUserStateSummaryField
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
@@ -415,3 +415,79 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr('shard_1')
+class TestMultiUserFieldDataCache(TestCase):
+    """Tests for prefetching field data for many users with MultiUserFieldDataCache"""
+    def setUp(self):
+        super(TestMultiUserFieldDataCache, self).setUp()
+        self.users = [UserFactory.create() for __ in xrange(3)]
+        for index, user in enumerate(self.users):
+            StudentModuleFactory(student=user, state=json.dumps({'a_field': 'a_value_{}'.format(index)}))
+            StudentPrefsFactory(student=user, value=json.dumps('pref_{}'.format(index)))
+            StudentInfoFactory(student=user, value=json.dumps('info_{}'.format(index)))
+        self.descriptor = mock_descriptor([
+            mock_field(Scope.user_state, 'a_field'),
+            mock_field(Scope.preferences, 'existing_field'),
+            mock_field(Scope.user_info, 'existing_field'),
+        ])
+
+    def kvs_for_user(self, multi_user_field_data_cache, user):
+        """Return a DjangoKeyValueStore for user, backed by multi_user_field_data_cache"""
+        return DjangoKeyValueStore(multi_user_field_data_cache.for_user(user))
+
+    def test_prefetch_all_users(self):
+        # One query per scope, regardless of the number of users
+        with self.assertNumQueries(3):
+            multi_user_field_data_cache = MultiUserFieldDataCache([self.descriptor], course_id, self.users)
+
+        with self.assertNumQueries(0):
+            for index, user in enumerate(self.users):
+                kvs = self.kvs_for_user(multi_user_field_data_cache, user)
+                self.assertEquals(
+                    'a_value_{}'.format(index),
+                    kvs.get(DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field'))
+                )
+                self.assertEquals(
+                    'pref_{}'.format(index),
+                    kvs.get(DjangoKeyValueStore.Key(Scope.preferences, user.id, 'mock_problem', 'existing_field'))
+                )
+                self.assertEquals(
+                    'info_{}'.format(index),
+                    kvs.get(DjangoKeyValueStore.Key(Scope.user_info, user.id, None, 'existing_field'))
+                )
+
+    def test_chunked_prefetch(self):
+        # Two chunks of users for each scope
+        with self.assertNumQueries(6):
+            MultiUserFieldDataCache([self.descriptor], course_id, self.users, chunk_size=2)
+
+    def test_matches_field_data_cache(self):
+        multi_user_field_data_cache = MultiUserFieldDataCache([self.descriptor], course_id, self.users)
+        for user in self.users:
+            key = DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field')
+            self.assertEquals(
+                DjangoKeyValueStore(FieldDataCache([self.descriptor], course_id, user)).get(key),
+                self.kvs_for_user(multi_user_field_data_cache, user).get(key),
+            )
+
+    def test_writes_are_visible_to_later_views(self):
+        multi_user_field_data_cache = MultiUserFieldDataCache([self.descriptor], course_id, self.users)
+        user = self.users[0]
+        key = DjangoKeyValueStore.Key(Scope.preferences, user.id, 'mock_problem', 'existing_field')
+        self.kvs_for_user(multi_user_field_data_cache, user).set(key, 'new_value')
+
+        with self.assertNumQueries(0):
+            self.assertEquals('new_value', self.kvs_for_user(multi_user_field_data_cache, user).get(key))
+        self.assertEquals(
+            'pref_1',
+            self.kvs_for_user(multi_user_field_data_cache, self.users[1]).get(
+                DjangoKeyValueStore.Key(Scope.preferences, self.users[1].id, 'mock_problem', 'existing_field')
+            )
+        )
+
+    def test_other_user(self):
+        multi_user_field_data_cache = MultiUserFieldDataCache([self.descriptor], course_id, self.users[:1])
+        with self.assertRaises(ValueError):
+            multi_user_field_data_cache.for_user(self.users[1])
@@ -36,7 +36,7 @@ from django_comment_common.signals import (
     comment_voted,
     comment_deleted,
 )
-from django_comment_client.utils import get_accessible_discussion_modules, is_commentable_cohorted
+from django_comment_client.utils import get_accessible_discussion_entries, is_commentable_cohorted
 from lms.lib.comment_client.comment import Comment
 from lms.lib.comment_client.thread import Thread
 from lms.lib.comment_client.utils import CommentClientRequestError
@@ -178,22 +178,22 @@ def get_course_topics(request, course_key):
     A course topic listing dictionary; see discussion_api.views.CourseTopicViews
     for more detail.
     """
-    def get_module_sort_key(module):
+    def get_entry_sort_key(entry):
         """
-        Get the sort key for the module (falling back to the discussion_target
-        setting if absent)
+        Get the sort key for the discussion entry (falling back to the
+        discussion target if absent)
         """
-        return module.sort_key or module.discussion_target
+        return entry["sort_key"] or entry["target"]
 
     course = _get_course_or_404(course_key, request.user)
-    discussion_modules = get_accessible_discussion_modules(course, request.user)
-    modules_by_category = defaultdict(list)
-    for module in discussion_modules:
-        modules_by_category[module.discussion_category].append(module)
+    discussion_entries = get_accessible_discussion_entries(course, request.user)
+    entries_by_category = defaultdict(list)
+    for entry in discussion_entries:
+        entries_by_category[entry["category"]].append(entry)
 
-    def get_sorted_modules(category):
-        """Returns key sorted modules by category"""
-        return sorted(modules_by_category[category], key=get_module_sort_key)
+    def get_sorted_entries(category):
+        """Returns key sorted discussion entries by category"""
+        return sorted(entries_by_category[category], key=get_entry_sort_key)
 
     courseware_topics = [
         {
@@ -202,19 +202,19 @@ def get_course_topics(request, course_key):
             "thread_list_url": get_thread_list_url(
                 request,
                 course_key,
-                [item.discussion_id for item in get_sorted_modules(category)]
+                [entry["id"] for entry in get_sorted_entries(category)]
             ),
             "children": [
                 {
-                    "id": module.discussion_id,
-                    "name": module.discussion_target,
-                    "thread_list_url": get_thread_list_url(request, course_key, [module.discussion_id]),
+                    "id": entry["id"],
+                    "name": entry["target"],
+                    "thread_list_url": get_thread_list_url(request, course_key, [entry["id"]]),
                     "children": [],
                 }
-                for module in get_sorted_modules(category)
+                for entry in get_sorted_entries(category)
             ],
         }
-        for category in sorted(modules_by_category.keys())
+        for category in sorted(entries_by_category.keys())
     ]
 
     non_courseware_topics = [
@@ -0,0 +1,93 @@
+"""
+Tests of the requests made by lms.lib.comment_client.utils.
+"""
+import mock
+from django.test import TestCase, RequestFactory
+from django.utils import translation
+from django.utils.translation import get_language
+
+from lms.lib.comment_client import utils
+from request_cache.middleware import RequestCache, REQUEST_CACHE
+
+
+@mock.patch('lms.lib.comment_client.utils.send_request', autospec=True)
+class PerformRequestTestCase(TestCase):
+    """
+    Tests of the coalescing of identical GET requests.
+    """
+    def setUp(self):
+        super(PerformRequestTestCase, self).setUp()
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def start_request(self):
+        """
+        Set the current request, as the RequestCache middleware does.
+        """
+        RequestCache().process_request(RequestFactory().get('dummy_url'))
+
+    def configure_response(self, mock_request, text='{"id": "dummy"}'):
+        mock_request.return_value = mock.Mock(status_code=200, text=text, json=lambda: {'id': 'dummy'})
+
+    def test_identical_get_requests_are_coalesced(self, mock_request):
+        self.configure_response(mock_request)
+        self.start_request()
+
+        first = utils.perform_request('get', 'http://localhost/threads/dummy', {'user_id': 1})
+        first['id'] = 'changed'
+        second = utils.perform_request('get', 'http://localhost/threads/dummy', {'user_id': 1})
+
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(second, {'id': 'dummy'})
+
+    def test_different_get_requests_are_sent(self, mock_request):
+        self.configure_response(mock_request)
+        self.start_request()
+
+        utils.perform_request('get', 'http://localhost/threads/dummy', {'user_id': 1})
+        utils.perform_request('get', 'http://localhost/threads/dummy', {'user_id': 2})
+        utils.perform_request('get', 'http://localhost/threads/other', {'user_id': 1})
+
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_other_requests_clear_responses(self, mock_request):
+        self.configure_response(mock_request)
+        self.start_request()
+
+        utils.perform_request('get', 'http://localhost/threads/dummy')
+        utils.perform_request('put', 'http://localhost/threads/dummy', {'title': 'changed'})
+        utils.perform_request('get', 'http://localhost/threads/dummy')
+
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_no_coalescing_outside_of_a_request(self, mock_request):
+        self.configure_response(mock_request)
+
+        utils.perform_request('get', 'http://localhost/threads/dummy')
+        utils.perform_request('get', 'http://localhost/threads/dummy')
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertNotIn(utils.REQUEST_CACHE_NAME, REQUEST_CACHE.data)
+
+
+class PerformConcurrentlyTestCase(TestCase):
+    """
+    Tests of perform_concurrently.
+    """
+    def test_results_are_in_order(self):
+        results = utils.perform_concurrently(lambda: 1, lambda: 2, lambda: 3)
+        self.assertEqual(results, [1, 2, 3])
+
+    def test_language_is_propagated(self):
+        with translation.override('eo'):
+            results = utils.perform_concurrently(get_language, get_language)
+        self.assertEqual(results, ['eo', 'eo'])
+
+    def test_exceptions_are_raised(self):
+        def fail():
+            """
+            Fail like a request to the comments service.
+            """
+            raise utils.CommentClientRequestError('Not found', 404)
+
+        with self.assertRaises(utils.CommentClientRequestError):
+            utils.perform_concurrently(lambda: 1, fail)
@@ -287,6 +287,107 @@ class CachedDiscussionIdMapTestCase(ModuleStoreTestCase):
         self.assertFalse(utils.discussion_category_id_access(self.course, user, 'private_discussion_id'))
 
 
+class CachedDiscussionEntriesTestCase(ModuleStoreTestCase):
+    """
+    Tests that using the cached discussion entries has the same behavior as searching through the course.
+    """
+    def setUp(self):
+        super(CachedDiscussionEntriesTestCase, self).setUp(create_user=True)
+
+        self.course = CourseFactory.create(
+            org='TestX', number='101', display_name='Test Course',
+            start=datetime.datetime(2012, 2, 3, tzinfo=UTC)
+        )
+        self.discussion = ItemFactory.create(
+            parent_location=self.course.location,
+            category='discussion',
+            discussion_id='test_discussion_id',
+            discussion_category='Chapter',
+            discussion_target='Discussion 1'
+        )
+        self.private_discussion = ItemFactory.create(
+            parent_location=self.course.location,
+            category='discussion',
+            discussion_id='private_discussion_id',
+            discussion_category='Chapter 2',
+            discussion_target='Beta Testing',
+            visible_to_staff_only=True
+        )
+        self.unstarted_discussion = ItemFactory.create(
+            parent_location=self.course.location,
+            category='discussion',
+            discussion_id='unstarted_discussion_id',
+            discussion_category='Chapter 3',
+            discussion_target='Later',
+            start=datetime.datetime(datetime.MAXYEAR, 1, 1, tzinfo=UTC)
+        )
+        self.bad_discussion = ItemFactory.create(
+            parent_location=self.course.location,
+            category='discussion',
+            discussion_id='bad_discussion_id',
+            discussion_category=None,
+            discussion_target=None
+        )
+        self.student = UserFactory.create()
+
+    def get_entries(self, user, include_all=False):
+        """Returns the accessible discussion entries of the course, keyed by discussion id"""
+        return {
+            entry['id']: entry
+            for entry in utils.get_accessible_discussion_entries(self.course, user, include_all=include_all)
+        }
+
+    def assert_same_entries_without_cache(self, user, include_all=False):
+        """Asserts the entries of the course are the same with and without the cache, and returns them"""
+        entries = self.get_entries(user, include_all)
+        CourseStructure.objects.all().delete()
+        self.assertEqual(self.get_entries(user, include_all), entries)
+        return entries
+
+    def test_entry(self):
+        entry = self.get_entries(self.student)['test_discussion_id']
+        self.assertEqual(entry, {
+            'id': 'test_discussion_id',
+            'category': 'Chapter',
+            'target': 'Discussion 1',
+            'sort_key': None,
+            'start': self.discussion.start,
+            'location': self.discussion.location,
+        })
+
+    def test_student_entries(self):
+        entries = self.assert_same_entries_without_cache(self.student)
+        self.assertEqual(entries.keys(), ['test_discussion_id'])
+
+    def test_staff_entries(self):
+        entries = self.assert_same_entries_without_cache(self.user)
+        self.assertItemsEqual(
+            entries.keys(),
+            ['test_discussion_id', 'private_discussion_id', 'unstarted_discussion_id']
+        )
+
+    def test_all_entries(self):
+        entries = self.assert_same_entries_without_cache(None, include_all=True)
+        self.assertItemsEqual(
+            entries.keys(),
+            ['test_discussion_id', 'private_discussion_id', 'unstarted_discussion_id']
+        )
+
+    def test_unrestricted_modules_are_not_loaded(self):
+        # Deleting the restricted modules from the cached entries leaves only unrestricted started ones.
+        structure = CourseStructure.objects.get(course_id=self.course.id)
+        structure.discussion_entries_json = json.dumps([
+            entry for entry in json.loads(structure.discussion_entries_json)
+            if entry['id'] == 'test_discussion_id'
+        ])
+        structure.save()
+
+        with mock.patch.object(utils, 'get_accessible_discussion_modules') as mock_get_modules:
+            entries = self.get_entries(self.student)
+        self.assertFalse(mock_get_modules.called)
+        self.assertEqual(entries.keys(), ['test_discussion_id'])
+
+
 class CategoryMapTestMixin(object):
     """
     Provides functionality for classes that test
@@ -137,6 +137,57 @@ def get_accessible_discussion_modules(course, user, include_all=False):  # pylin
     ]
 
 
+def _get_discussion_entry(module):
+    """
+    Returns the metadata of the discussion module, as cached by CourseStructure.discussion_entries.
+    """
+    return {
+        "id": module.discussion_id,
+        "category": module.discussion_category,
+        "target": module.discussion_target,
+        "sort_key": module.sort_key,
+        "start": module.start,
+        "location": module.location,
+    }
+
+
+def get_accessible_discussion_entries(course, user, include_all=False):  # pylint: disable=invalid-name
+    """
+    Return the metadata of all valid discussion modules in this course that are accessible to the given user, as
+    dicts with the "id", "category", "target", "sort_key", "start" and "location" of each module.
+
+    Uses the discussion entries cached in the course structure if available, falling back to
+    get_accessible_discussion_modules if there is no cache. Only the modules whose access isn't granted
+    to every user who can load the course are then loaded, to check the user's access to them.
+    """
+    try:
+        cached_entries = CourseStructure.objects.get(course_id=course.id).discussion_entries
+    except CourseStructure.DoesNotExist:
+        cached_entries = None
+    if cached_entries is None:
+        return [
+            _get_discussion_entry(module)
+            for module in get_accessible_discussion_modules(course, user, include_all=include_all)
+        ]
+
+    now = datetime.now(UTC())
+    entries = []
+    unchecked_entries = []
+    for entry in cached_entries:
+        restricted = entry.pop("restricted")
+        if include_all or not (restricted or (entry["start"] is not None and entry["start"] > now)):
+            entries.append(entry)
+        else:
+            unchecked_entries.append(entry)
+
+    if unchecked_entries:
+        accessible_locations = set(
+            module.location for module in get_accessible_discussion_modules(course, user)
+        )
+        entries.extend(entry for entry in unchecked_entries if entry["location"] in accessible_locations)
+    return entries
+
+
 def get_discussion_id_map_entry(module):
     """
     Returns a tuple of (discussion_id, metadata) suitable for inclusion in the results of get_discussion_id_map().
@@ -301,17 +352,17 @@ def get_discussion_category_map(course, user, cohorted_if_in_list=False, exclude
     """
     unexpanded_category_map = defaultdict(list)
 
-    modules = get_accessible_discussion_modules(course, user)
+    discussion_entries = get_accessible_discussion_entries(course, user)
 
     course_cohort_settings = get_course_cohort_settings(course.id)
 
-    for module in modules:
-        id = module.discussion_id
-        title = module.discussion_target
-        sort_key = module.sort_key
-        category = " / ".join([x.strip() for x in module.discussion_category.split("/")])
-        # Handle case where module.start is None
-        entry_start_date = module.start if module.start else datetime.max.replace(tzinfo=pytz.UTC)
+    for discussion_entry in discussion_entries:
+        id = discussion_entry["id"]
+        title = discussion_entry["target"]
+        sort_key = discussion_entry["sort_key"]
+        category = " / ".join([x.strip() for x in discussion_entry["category"].split("/")])
+        # Handle case where the module's start is None
+        entry_start_date = discussion_entry["start"] or datetime.max.replace(tzinfo=pytz.UTC)
         unexpanded_category_map[category].append({"title": title, "id": id, "sort_key": sort_key, "start_date": entry_start_date})
 
     category_map = {"entries": defaultdict(dict), "subcategories": defaultdict(dict)}
@@ -416,7 +467,7 @@ def get_discussion_categories_ids(course, user, include_all=False):
 
     """
     accessible_discussion_ids = [
-        module.discussion_id for module in get_accessible_discussion_modules(course, user, include_all=include_all)
+        entry["id"] for entry in get_accessible_discussion_entries(course, user, include_all=include_all)
     ]
     return course.top_level_discussion_topic_ids + accessible_discussion_ids
 
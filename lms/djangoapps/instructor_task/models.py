@@ -12,6 +12,7 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+from abc import ABCMeta, abstractmethod
 from cStringIO import StringIO
 from gzip import GzipFile
 from uuid import uuid4
@@ -179,10 +180,15 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Use `store_rows_streaming` to write a report without holding all
+    of its rows in memory.
     """
+    __metaclass__ = ABCMeta
+
+    # Whether reports written with `store_rows_streaming` are gzipped unless
+    # the caller says otherwise.
+    COMPRESS_BY_DEFAULT = False
+
     @classmethod
     def from_config(cls, config_name):
         """
@@ -204,6 +210,98 @@ class ReportStore(object):
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def store_rows_streaming(self, course_id, filename, rows, compress=None):
+        """
+        Given a `course_id`, `filename`, and `rows` (an iterable, typically a
+        generator, of rows that are each an iterable of strings), write the
+        rows out as a csv file while they are being generated, so that memory
+        use doesn't grow with the number of rows.
+
+        If `compress` is True the file is gzipped; if it is None, the store's
+        default is used. As with `store_rows`, the file only becomes visible
+        in the store once all of the rows have been written.
+        """
+        if compress is None:
+            compress = self.COMPRESS_BY_DEFAULT
+
+        output = self.open_streaming_output(course_id, filename, compress)
+        try:
+            stream = GzipFile(fileobj=output, mode="wb") if compress else output
+            csvwriter = csv.writer(stream)
+            for row in self._get_utf8_encoded_rows(rows):
+                csvwriter.writerow(row)
+            if compress:
+                # Closing a GzipFile writes the gzip trailer, but doesn't
+                # close the underlying output.
+                stream.close()
+        except Exception:
+            output.abort()
+            raise
+        output.close()
+
+    @abstractmethod
+    def open_streaming_output(self, course_id, filename, compress):
+        """
+        Return a file-like object for `store_rows_streaming` to write to.
+        Besides `write` and `flush`, it must implement `close`, which makes the
+        file visible in the store, and `abort`, which discards it.
+        """
+        pass
+
+
+class S3MultipartOutput(object):
+    """
+    File-like object that uploads whatever is written to it to an S3 key,
+    using a multipart upload once more than `part_size` bytes have been
+    written, so that at most one part is held in memory at a time.
+    """
+    # S3 doesn't accept parts smaller than 5MB, other than the last one.
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, key, headers, part_size=MIN_PART_SIZE):
+        self.key = key
+        self.headers = headers
+        self.part_size = part_size
+        self._buffer = StringIO()
+        self._multipart_upload = None
+        self._num_parts = 0
+
+    def write(self, data):
+        """Buffer `data`, uploading a part once the buffer is large enough."""
+        self._buffer.write(data)
+        if self._buffer.tell() >= self.part_size:
+            self._upload_part()
+
+    def flush(self):
+        """Parts are uploaded as soon as they fill up, so there's nothing to do."""
+        pass
+
+    def _upload_part(self):
+        """Upload the buffered data as the next part of the multipart upload."""
+        if self._multipart_upload is None:
+            self._multipart_upload = self.key.bucket.initiate_multipart_upload(self.key.key, headers=self.headers)
+        self._num_parts += 1
+        self._buffer.seek(0)
+        self._multipart_upload.upload_part_from_file(self._buffer, self._num_parts)
+        self._buffer = StringIO()
+
+    def close(self):
+        """Finish the upload, making the key visible in the bucket."""
+        if self._multipart_upload is None:
+            # Everything fit in a single part, so upload it the simple way.
+            data = self._buffer.getvalue()
+            headers = dict(self.headers, **{"Content-Length": len(data)})
+            self.key.set_contents_from_string(data, headers=headers)
+        else:
+            if self._buffer.tell():
+                self._upload_part()
+            self._multipart_upload.complete_upload()
+
+    def abort(self):
+        """Discard whatever has been uploaded so far."""
+        if self._multipart_upload is not None:
+            self._multipart_upload.cancel_upload()
+
 
 class S3ReportStore(ReportStore):
     """
@@ -217,6 +315,8 @@ class S3ReportStore(ReportStore):
     conventions on where files are stored to know what to display. Clients using
     this class can name the final file whatever they want.
     """
+    COMPRESS_BY_DEFAULT = True
+
     def __init__(self, bucket_name, root_path):
         self.root_path = root_path
 
@@ -313,6 +413,15 @@ class S3ReportStore(ReportStore):
 
         self.store(course_id, filename, output_buffer)
 
+    def open_streaming_output(self, course_id, filename, compress):
+        """
+        Return an `S3MultipartOutput` that uploads to the key for `filename`.
+        """
+        headers = {"Content-Type": "text/csv"}
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        return S3MultipartOutput(self.key_for(course_id, filename), headers)
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples. `url`
@@ -325,6 +434,39 @@ class S3ReportStore(ReportStore):
         ]
 
 
+class LocalFSOutput(object):
+    """
+    File-like object that writes to a temporary file in `temp_dir`, and moves
+    it to `path` when closed.
+    """
+    def __init__(self, path, temp_dir):
+        self.path = path
+        self.temp_path = os.path.join(temp_dir, '.report-{}'.format(uuid4().hex))
+        # Unlike tempfile.mkstemp, which creates files that only their owner
+        # can read, give the report the same permissions as the files written
+        # by `LocalFSReportStore.store`.
+        temp_fd = os.open(self.temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0666)
+        self._file = os.fdopen(temp_fd, "wb")
+
+    def write(self, data):
+        """Write `data` to the temporary file."""
+        self._file.write(data)
+
+    def flush(self):
+        """Flush the temporary file."""
+        self._file.flush()
+
+    def close(self):
+        """Move the finished file into place, replacing anything that was there."""
+        self._file.close()
+        os.rename(self.temp_path, self.path)
+
+    def abort(self):
+        """Remove the temporary file."""
+        self._file.close()
+        os.remove(self.temp_path)
+
+
 class LocalFSReportStore(ReportStore):
     """
     LocalFS implementation of a ReportStore. This is meant for debugging
@@ -388,6 +530,18 @@ class LocalFSReportStore(ReportStore):
 
         self.store(course_id, filename, output_buffer)
 
+    def open_streaming_output(self, course_id, filename, compress):  # pylint: disable=unused-argument
+        """
+        Return a temporary file that is moved into place as `filename` when it
+        is closed. The temporary file lives outside of the course directory,
+        so that incomplete reports are never listed by `links_for`.
+        """
+        full_path = self.path_to(course_id, filename)
+        directory = os.path.dirname(full_path)
+        if not os.path.exists(directory):
+            os.mkdir(directory)
+        return LocalFSOutput(full_path, self.root_path)
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples. `url`
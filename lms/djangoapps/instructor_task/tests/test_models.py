@@ -1,14 +1,17 @@
+# -*- coding: utf-8 -*-
 """
 Tests for instructor_task/models.py.
 """
 
 from cStringIO import StringIO
 import mock
+import os
+import stat
 import time
 from datetime import datetime
 from unittest import TestCase
 
-from instructor_task.models import LocalFSReportStore, S3ReportStore
+from instructor_task.models import LocalFSReportStore, S3MultipartOutput, S3ReportStore
 from instructor_task.tests.test_base import TestReportMixin
 from opaque_keys.edx.locator import CourseLocator
 
@@ -30,15 +33,46 @@ class MockKey(object):
         return "http://fake-edx-s3.edx.org/"
 
 
+class MockMultiPartUpload(object):
+    """
+    Mocking a boto S3 MultiPartUpload object.
+    """
+    def __init__(self, bucket, key_name):
+        self.bucket = bucket
+        self.key_name = key_name
+        self.parts = []
+        self.completed = False
+
+    def upload_part_from_file(self, fp, part_num):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts.append((part_num, fp.read()))
+
+    def complete_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.completed = True
+        self.bucket.store_key(MockKey(self.bucket))
+
+    def cancel_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts = []
+
+
 class MockBucket(object):
     """ Mocking a boto S3 Bucket object. """
     def __init__(self, _name):
         self.keys = []
+        self.multipart_uploads = []
 
     def store_key(self, key):
         """ Not a Bucket method, created just to store the keys in the Bucket for testing purposes. """
         self.keys.append(key)
 
+    def initiate_multipart_upload(self, key_name, headers):  # pylint: disable=unused-argument
+        """ Expected method on a Bucket object. """
+        multipart_upload = MockMultiPartUpload(self, key_name)
+        self.multipart_uploads.append(multipart_upload)
+        return multipart_upload
+
     def list(self, prefix):  # pylint: disable=unused-argument
         """ Expected method on a Bucket object. """
         return self.keys
@@ -84,6 +118,15 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_store_rows_streaming(self):
+        """
+        Test that a generator of rows can be stored.
+        """
+        report_store = self.create_report_store()
+        rows = ([unicode(i), u'üser{}'.format(i)] for i in xrange(10))
+        report_store.store_rows_streaming(self.course_id, 'streamed_file', rows)
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['streamed_file'])
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase):
     """
@@ -93,6 +136,38 @@ class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase
         """ Create and return a LocalFSReportStore. """
         return LocalFSReportStore.from_config(config_name='GRADES_DOWNLOAD')
 
+    def test_store_rows_streaming_content(self):
+        report_store = self.create_report_store()
+        report_store.store_rows_streaming(self.course_id, 'streamed_file', iter([['a', 'b'], [1, u'ü']]))
+        with open(report_store.path_to(self.course_id, 'streamed_file')) as report_file:
+            self.assertEqual(report_file.read(), 'a,b\r\n1,\xc3\xbc\r\n')
+
+    def test_store_rows_streaming_permissions(self):
+        """
+        Test that streamed reports get the same permissions as stored ones.
+        """
+        report_store = self.create_report_store()
+        report_store.store(self.course_id, 'stored_file', StringIO())
+        report_store.store_rows_streaming(self.course_id, 'streamed_file', iter([['a', 'b']]))
+        self.assertEqual(
+            stat.S_IMODE(os.stat(report_store.path_to(self.course_id, 'streamed_file')).st_mode),
+            stat.S_IMODE(os.stat(report_store.path_to(self.course_id, 'stored_file')).st_mode),
+        )
+
+    def test_store_rows_streaming_failure(self):
+        """
+        Test that no partial file is left behind if generating the rows fails.
+        """
+        def failing_rows():
+            """ Generate a row, then fail. """
+            yield ['a', 'b']
+            raise ValueError()
+
+        report_store = self.create_report_store()
+        with self.assertRaises(ValueError):
+            report_store.store_rows_streaming(self.course_id, 'streamed_file', failing_rows())
+        self.assertEqual(report_store.links_for(self.course_id), [])
+
 
 @mock.patch('instructor_task.models.S3Connection', new=MockS3Connection)
 @mock.patch('instructor_task.models.Key', new=MockKey)
@@ -105,3 +180,17 @@ class S3ReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase):
     def create_report_store(self):
         """ Create and return a S3ReportStore. """
         return S3ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+    def test_multipart_output(self):
+        """
+        Test that S3MultipartOutput uploads a part whenever enough data has been written.
+        """
+        report_store = self.create_report_store()
+        output = S3MultipartOutput(report_store.key_for(self.course_id, 'streamed_file'), {}, part_size=10)
+        for __ in xrange(3):
+            output.write('x' * 6)
+        output.close()
+
+        multipart_upload = report_store.bucket.multipart_uploads[0]
+        self.assertTrue(multipart_upload.completed)
+        self.assertEqual(multipart_upload.parts, [(1, 'x' * 12), (2, 'x' * 6)])
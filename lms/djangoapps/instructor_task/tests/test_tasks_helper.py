@@ -12,6 +12,7 @@ import tempfile
 import json
 from openedx.core.djangoapps.course_groups import cohorts
 import unicodecsv
+from django.core.cache import caches
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 
@@ -30,6 +31,7 @@ from shoppingcart.models import Order, PaidCourseRegistration, CourseRegistratio
 from student.tests.factories import UserFactory, CourseModeFactory
 from student.models import CourseEnrollment, CourseEnrollmentAllowed, ManualEnrollmentAudit, ALLOWEDTOENROLL_TO_ENROLLED
 from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
+from xmodule.contentstore.django import _CONTENTSTORE
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
 from instructor_task.models import ReportStore
@@ -45,6 +47,7 @@ from instructor_task.tasks_helper import (
     upload_exec_summary_report,
     upload_course_survey_report,
     generate_students_certificates,
+    _init_grade_report_worker,
 )
 from instructor_analytics.basic import UNAVAILABLE
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
@@ -111,6 +114,42 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @override_settings(GRADES_DOWNLOAD_PROCESSES=2)
+    @patch('instructor_task.tasks_helper.Pool')
+    def test_grading_in_process_pool(self, mock_pool):
+        """
+        Test that grading shards of students in a pool of worker processes
+        reports every student, in order of student id.
+        """
+        # Run the "worker processes" in this process, which shares the test database.
+        mock_pool.return_value.imap = lambda func, shards: (func(shard) for shard in shards)
+        students = [self.create_student('student{}'.format(i), 'student{}@example.com'.format(i)) for i in xrange(5)]
+
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            result = upload_grades_csv(None, None, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, result)
+        self.assertEqual(mock_pool.call_args[1]['processes'], 2)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_csv_filename = report_store.links_for(self.course.id)[0][0]
+        with open(report_store.path_to(self.course.id, report_csv_filename)) as csv_file:
+            usernames = [row['username'] for row in unicodecsv.DictReader(csv_file)]
+        self.assertEqual(usernames, [student.username for student in sorted(students, key=lambda user: user.id)])
+
+    @patch('instructor_task.tasks_helper.clear_existing_modulestores')
+    def test_grade_report_worker_does_not_share_connections(self, mock_clear_existing_modulestores):
+        """
+        Test that the worker processes of the grade report pool don't reuse the
+        connections of the modulestore, the contentstore and the caches which
+        they inherit from the parent process.
+        """
+        with patch.dict(_CONTENTSTORE, {'default': Mock()}):
+            with patch.object(caches['default'], 'close') as mock_cache_close:
+                _init_grade_report_worker()
+            self.assertEqual(_CONTENTSTORE, {})
+        self.assertTrue(mock_clear_existing_modulestores.called)
+        self.assertTrue(mock_cache_close.called)
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
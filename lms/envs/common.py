@@ -60,6 +60,9 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Number of keep-alive connections to the comments service kept by each process
+COMMENTS_SERVICE_POOL_SIZE = 10
+
 
 # Features
 FEATURES = {
@@ -395,6 +398,10 @@ FEATURES = {
     # Enable the max score cache to speed up grading
     'ENABLE_MAX_SCORE_CACHE': True,
 
+    # Persist per-subsection grades, so that grading a student only recomputes
+    # the subsections whose scores changed.
+    'ENABLE_PERSISTENT_GRADES': False,
+
     # Enable LTI Provider feature.
     'ENABLE_LTI_PROVIDER': False,
 }
@@ -732,6 +739,8 @@ MODULESTORE = {
         'ENGINE': 'xmodule.modulestore.mixed.MixedModuleStore',
         'OPTIONS': {
             'mappings': {},
+            # Return the same xblock to every get_item of a usage key within a request.
+            'cache_items': True,
             'stores': [
                 {
                     'NAME': 'split',
@@ -766,6 +775,20 @@ MODULESTORE = {
     }
 }
 
+# Directory on the local disk in which course assets too large for the cache
+# are kept, so that they are not streamed from the contentstore on every
+# request.  None disables the disk cache.
+ASSET_DISK_CACHE_DIR = None
+# Maximum total size, in bytes, of the assets kept in ASSET_DISK_CACHE_DIR,
+# beyond which the least recently used assets are removed.
+ASSET_DISK_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Maximum total size, in bytes, of the split modulestore course structures
+# kept unpickled in each process in front of the 'course_structure_cache', as
+# estimated from their pickled size.  The structure of a course with 20,000
+# blocks takes about 26MB.  0 disables the in-process cache.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -779,6 +802,16 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of long-running sandboxed Pythons which execute the code, with the
+    # sandbox libraries already imported, in each LMS process.  A size of 0
+    # disables the pool: each execution then starts its own sandboxed Python.
+    'worker_pool': {
+        # How many sandboxed Pythons can run at once in a process?
+        'size': 0,
+        # How many executions does a sandboxed Python run before being replaced?
+        'max_jobs': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1724,6 +1757,11 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of connections to the email backend each bulk email task sends
+# emails over concurrently.  A task retried for rate-related reasons uses
+# a single connection.
+BULK_EMAIL_CONNECTIONS_PER_TASK = 1
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -2176,6 +2214,14 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Number of students whose scores are loaded together when generating grade
+# reports. Set to None to grade students one at a time.
+GRADES_DOWNLOAD_BATCH_SIZE = None
+
+# Number of worker processes that grade shards of the enrolled students when
+# generating grade reports. Set to None to grade in the task's own process.
+GRADES_DOWNLOAD_PROCESSES = None
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
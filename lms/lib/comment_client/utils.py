@@ -1,14 +1,33 @@
 from contextlib import contextmanager
+import copy
 import dogstats_wrapper as dog_stats_api
+import json
 import logging
+import os
+import threading
+from multiprocessing.pool import ThreadPool
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
+import request_cache
 
 log = logging.getLogger(__name__)
 
+# Number of threads of each process running the requests of perform_concurrently.
+CONCURRENT_REQUEST_WORKERS = 4
+
+# Name of the request cache of the responses to GET requests.
+REQUEST_CACHE_NAME = 'comment_client.responses'
+
+_SESSION = None
+_THREAD_POOL = None
+_PROCESS_PID = None
+_PROCESS_LOCK = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -31,6 +50,82 @@ def merge_dict(dic1, dic2):
     return dict(dic1.items() + dic2.items())
 
 
+def _process_resources():
+    """
+    Return the requests session and the thread pool of the current process.
+
+    They are never shared between processes, so a process forked from one
+    which already has them creates its own.
+    """
+    global _SESSION, _THREAD_POOL, _PROCESS_PID  # pylint: disable=global-statement
+    with _PROCESS_LOCK:
+        if _PROCESS_PID != os.getpid():
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.COMMENTS_SERVICE_POOL_SIZE)
+            _SESSION = requests.Session()
+            _SESSION.mount('http://', adapter)
+            _SESSION.mount('https://', adapter)
+            _THREAD_POOL = None
+            _PROCESS_PID = os.getpid()
+        if _THREAD_POOL is None:
+            # Only started once needed, since few views use it.
+            _THREAD_POOL = ThreadPool(CONCURRENT_REQUEST_WORKERS)
+        return _SESSION, _THREAD_POOL
+
+
+def get_session():
+    """
+    Return the requests session of the current process, which keeps alive
+    its connections to the comments service.
+    """
+    return _process_resources()[0]
+
+
+def send_request(method, url, **kwargs):
+    """
+    Send an HTTP request to the comments service with the session of the current process.
+    """
+    return get_session().request(method, url, **kwargs)
+
+
+def _call_with_language(func, language):
+    """
+    Call func with the given language activated, as it is in the calling thread.
+    """
+    with translation.override(language):
+        return func()
+
+
+def perform_concurrently(*funcs):
+    """
+    Call the given functions concurrently, and return the list of their results.
+
+    The functions should make independent requests to the comments service.
+    All but the first are called in other threads, so they must not use the
+    database, and their GET requests aren't coalesced with the others of the
+    current request.  The first exception raised by one of the functions is
+    raised once they have all returned.
+    """
+    pool = _process_resources()[1]
+    language = get_language()
+    async_results = [pool.apply_async(_call_with_language, (func, language)) for func in funcs[1:]]
+    try:
+        results = [funcs[0]()]
+    finally:
+        for async_result in async_results:
+            async_result.wait()
+    return results + [async_result.get() for async_result in async_results]
+
+
+def _get_response_cache():
+    """
+    Return the request cache of the responses to GET requests, or None if
+    there is no current request whose end would clear it.
+    """
+    if request_cache.get_request() is None:
+        return None
+    return request_cache.get_cache(REQUEST_CACHE_NAME)
+
+
 @contextmanager
 def request_timer(request_id, method, url, tags=None):
     start = time()
@@ -66,6 +161,25 @@ def perform_request(method, url, data_or_params=None, raw=False,
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
         'Accept-Language': get_language(),
     }
+
+    # Identical GET requests made while handling the same request are sent only
+    # once, and any other request may change their responses.
+    response_cache = _get_response_cache()
+    cache_key = None
+    if response_cache is not None:
+        if method == 'get':
+            cache_key = (
+                url,
+                json.dumps(data_or_params, sort_keys=True, default=unicode),
+                headers['Accept-Language'],
+                raw,
+            )
+            if cache_key in response_cache:
+                dog_stats_api.increment('comment_client.request.coalesced', tags=metric_tags)
+                return copy.deepcopy(response_cache[cache_key])
+        else:
+            response_cache.clear()
+
     request_id = uuid4()
     request_id_dict = {'request_id': request_id}
 
@@ -76,7 +190,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = send_request(
             method,
             url,
             data=data,
@@ -102,6 +216,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
         raise CommentClient500Error(response.text)
     else:
         if raw:
+            if cache_key is not None:
+                response_cache[cache_key] = response.text
             return response.text
         else:
             try:
@@ -129,6 +245,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
+            if cache_key is not None:
+                response_cache[cache_key] = copy.deepcopy(data)
             return data
 
 
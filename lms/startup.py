@@ -37,6 +37,8 @@ def run():
 
     add_mimetypes()
 
+    configure_codejail_worker_pool()
+
     if settings.FEATURES.get('USE_CUSTOM_THEME', False):
         enable_stanford_theme()
 
@@ -68,6 +70,27 @@ def run():
     xmodule.x_module.descriptor_global_local_resource_url = lms_xblock.runtime.local_resource_url
 
 
+def configure_codejail_worker_pool():
+    """
+    Enable the pool of sandboxed Pythons which run the code of capa problems,
+    if a sandboxed Python and the size of the pool are configured.
+    """
+    code_jail = getattr(settings, 'CODE_JAIL', {})
+    pool_settings = code_jail.get('worker_pool', {})
+    if not code_jail.get('python_bin') or not pool_settings.get('size'):
+        return
+
+    from capa.safe_exec import worker_pool
+    from capa.safe_exec.safe_exec import ASSUMED_IMPORTS
+    worker_pool.configure(
+        code_jail['python_bin'],
+        user=code_jail.get('user'),
+        size=pool_settings['size'],
+        max_jobs=pool_settings.get('max_jobs', 100),
+        module_names=[modname for __, modname in ASSUMED_IMPORTS],
+    )
+
+
 def add_mimetypes():
     """
     Add extra mimetypes. Used in xblock_resource.
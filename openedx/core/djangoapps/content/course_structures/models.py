@@ -5,6 +5,7 @@ import json
 import logging
 
 from collections import OrderedDict
+from dateutil.parser import parse as parse_datetime
 from model_utils.models import TimeStampedModel
 
 from util.models import CompressedTextField
@@ -34,6 +35,9 @@ class CourseStructure(TimeStampedModel):
     # JSON mapping of discussion ids to usage keys for the corresponding discussion modules
     discussion_id_map_json = CompressedTextField(verbose_name='Discussion ID Map JSON', blank=True, null=True)
 
+    # JSON list of the metadata of the discussion modules, from which the discussion category map is built
+    discussion_entries_json = CompressedTextField(verbose_name='Discussion Entries JSON', blank=True, null=True)
+
     @property
     def structure(self):
         """
@@ -66,6 +70,24 @@ class CourseStructure(TimeStampedModel):
             return result
         return None
 
+    @property
+    def discussion_entries(self):
+        """
+        Return the list of the metadata of the discussion modules which have a discussion id, category and target.
+
+        Each entry is a dict with the "id", "category", "target", "sort_key", "start" and "location" of the module,
+        and "restricted", which is False if every user who can load the course can load the module once started.
+        """
+        if self.discussion_entries_json is None:
+            return None
+        entries = json.loads(self.discussion_entries_json)
+        for entry in entries:
+            # Usage key strings might not include the course run, so we add it back in with map_into_course
+            entry['location'] = UsageKey.from_string(entry['location']).map_into_course(self.course_id)
+            if entry['start'] is not None:
+                entry['start'] = parse_datetime(entry['start'])
+        return entries
+
     def _traverse_tree(self, block, unordered_structure, ordered_blocks, parent=None):
         """
         Traverses the tree and fills in the ordered_blocks OrderedDict with the blocks in
@@ -12,6 +12,29 @@ from xmodule.modulestore.django import modulestore
 log = logging.getLogger('edx.celery.task')
 
 
+def _discussion_entry(block):
+    """
+    Returns the metadata of the discussion block from which the discussion category map is built, or None if the
+    block is missing its discussion id, category or target.
+    """
+    if any(getattr(block, key, None) is None for key in ('discussion_id', 'discussion_category', 'discussion_target')):
+        return None
+
+    # Only the access to unrestricted blocks which have started can be granted without loading them.
+    merged_group_access = getattr(block, 'merged_group_access', None)
+    return {
+        "id": block.discussion_id,
+        "category": block.discussion_category,
+        "target": block.discussion_target,
+        "sort_key": block.sort_key,
+        "start": block.start.isoformat() if block.start else None,
+        "location": unicode(block.scope_ids.usage_id),
+        "restricted": bool(
+            getattr(block, "visible_to_staff_only", False) or merged_group_access or merged_group_access is None
+        ),
+    }
+
+
 def _generate_course_structure(course_key):
     """
     Generates a course structure dictionary for the specified course.
@@ -21,6 +44,7 @@ def _generate_course_structure(course_key):
         blocks_stack = [course]
         blocks_dict = {}
         discussions = {}
+        discussion_entries = []
         while blocks_stack:
             curr_block = blocks_stack.pop()
             children = curr_block.get_children() if curr_block.has_children else []
@@ -36,6 +60,9 @@ def _generate_course_structure(course_key):
                     hasattr(curr_block, 'discussion_id') and
                     curr_block.discussion_id):
                 discussions[curr_block.discussion_id] = unicode(curr_block.scope_ids.usage_id)
+                discussion_entry = _discussion_entry(curr_block)
+                if discussion_entry:
+                    discussion_entries.append(discussion_entry)
 
             # Retrieve these attributes separately so that we can fail gracefully
             # if the block doesn't have the attribute.
@@ -56,7 +83,8 @@ def _generate_course_structure(course_key):
                 "root": unicode(course.scope_ids.usage_id),
                 "blocks": blocks_dict
             },
-            'discussion_id_map': discussions
+            'discussion_id_map': discussions,
+            'discussion_entries': discussion_entries,
         }
 
 
@@ -83,16 +111,19 @@ def update_course_structure(course_key):
 
     structure_json = json.dumps(structure['structure'])
     discussion_id_map_json = json.dumps(structure['discussion_id_map'])
+    discussion_entries_json = json.dumps(structure['discussion_entries'])
 
     structure_model, created = CourseStructure.objects.get_or_create(
         course_id=course_key,
         defaults={
             'structure_json': structure_json,
-            'discussion_id_map_json': discussion_id_map_json
+            'discussion_id_map_json': discussion_id_map_json,
+            'discussion_entries_json': discussion_entries_json,
         }
     )
 
     if not created:
         structure_model.structure_json = structure_json
         structure_model.discussion_id_map_json = discussion_id_map_json
+        structure_model.discussion_entries_json = discussion_entries_json
         structure_model.save()
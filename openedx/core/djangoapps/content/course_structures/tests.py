@@ -1,8 +1,11 @@
 """
 Course Structure Content sub-application test cases
 """
+import datetime
 import json
 
+from pytz import UTC
+
 from xmodule_django.models import UsageKey
 from xmodule.modulestore.django import SignalHandler
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -187,6 +190,63 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
         actual = _generate_course_structure(self.course.id)
         self.assertEqual(actual['discussion_id_map'], id_map)
 
+    def test_generate_discussion_entries(self):
+        staff_only_discussion = ItemFactory.create(
+            parent=self.section,
+            category='discussion',
+            discussion_id='staff_only_discussion_id',
+            visible_to_staff_only=True
+        )
+
+        entries = {
+            entry['id']: entry
+            for entry in _generate_course_structure(self.course.id)['discussion_entries']
+        }
+
+        self.assertEqual(
+            set(entries.keys()),
+            set(['test_discussion_id_1', 'test_discussion_id_2', 'staff_only_discussion_id'])
+        )
+        self.assertEqual(entries['test_discussion_id_1'], {
+            'id': 'test_discussion_id_1',
+            'category': self.discussion_module_1.discussion_category,
+            'target': self.discussion_module_1.discussion_target,
+            'sort_key': self.discussion_module_1.sort_key,
+            'start': self.discussion_module_1.start.isoformat(),
+            'location': unicode(self.discussion_module_1.location),
+            'restricted': False,
+        })
+        self.assertEqual(entries['staff_only_discussion_id']['location'], unicode(staff_only_discussion.location))
+        self.assertTrue(entries['staff_only_discussion_id']['restricted'])
+
+    def test_discussion_entries(self):
+        start = datetime.datetime(2015, 3, 4, 5, 6, 7, 8, tzinfo=UTC)
+        entries = [
+            {
+                'id': 'discussion_id_1',
+                'category': 'Week 1',
+                'target': 'Discussion',
+                'sort_key': None,
+                'start': start.isoformat(),
+                'location': 'i4x://TestX/TS101/discussion/466f474fa4d045a8b7bde1b911e095ca',
+                'restricted': False,
+            },
+        ]
+        structure = CourseStructure.objects.create(
+            course_id=self.course.id, discussion_entries_json=json.dumps(entries)
+        )
+
+        entry = structure.discussion_entries[0]
+        self.assertEqual(entry['start'], start)
+        self.assertEqual(
+            entry['location'],
+            UsageKey.from_string(entries[0]['location']).map_into_course(self.course.id)
+        )
+
+    def test_discussion_entries_missing(self):
+        structure = CourseStructure.objects.create(course_id=self.course.id)
+        self.assertIsNone(structure.discussion_entries)
+
     def test_discussion_id_map_json(self):
         id_map = {
             'discussion_id_1': 'module_location_1',
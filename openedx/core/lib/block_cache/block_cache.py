@@ -1,6 +1,6 @@
 """
 Top-level module for the Block Cache framework with higher order
-functions for getting and clearing cached blocks.
+functions for getting, updating and clearing cached blocks.
 """
 from .block_structure_factory import BlockStructureFactory
 from .exceptions import TransformerException
@@ -57,20 +57,7 @@ def get_blocks(cache, modulestore, usage_info, root_block_usage_key, transformer
 
     # On cache miss, execute the collect phase and update the cache.
     if not root_block_structure:
-
-        # Create the block structure from the modulestore.
-        root_block_structure = BlockStructureFactory.create_from_modulestore(root_block_usage_key, modulestore)
-
-        # Collect data from each registered transformer.
-        for transformer in TransformerRegistry.get_registered_transformers():
-            root_block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(root_block_structure)
-
-        # Collect all fields that were requested by the transformers.
-        root_block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
-
-        # Cache this information.
-        BlockStructureFactory.serialize_to_cache(root_block_structure, cache)
+        root_block_structure = update_block_cache(cache, modulestore, root_block_usage_key)
 
     # Execute requested transforms on block structure.
     for transformer in transformers:
@@ -82,6 +69,47 @@ def get_blocks(cache, modulestore, usage_info, root_block_usage_key, transformer
     return root_block_structure
 
 
+def update_block_cache(cache, modulestore, root_block_usage_key):
+    """
+    Executes the collect phase of all registered transformers on the
+    block structure starting at root_block_usage_key and replaces the
+    block structure in the cache with the collected one.
+
+    Any previously cached block structure remains available to readers
+    until it is replaced.
+
+    Arguments:
+        cache (django.core.cache.backends.base.BaseCache) - The
+            cache to use for storing the block structure's collected
+            data.
+
+        modulestore (ModuleStoreRead) - The modulestore that
+            contains the data for the xBlock objects corresponding to
+            the block structure.
+
+        root_block_usage_key (UsageKey) - The usage_key for the root
+            of the block structure that is to be collected.
+
+    Returns:
+        BlockStructureModulestoreData - The collected block structure,
+            starting at root_block_usage_key.
+    """
+    # Create the block structure from the modulestore.
+    root_block_structure = BlockStructureFactory.create_from_modulestore(root_block_usage_key, modulestore)
+
+    # Collect data from each registered transformer.
+    for transformer in TransformerRegistry.get_registered_transformers():
+        root_block_structure._add_transformer(transformer)  # pylint: disable=protected-access
+        transformer.collect(root_block_structure)
+
+    # Collect all fields that were requested by the transformers.
+    root_block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+
+    # Cache this information.
+    BlockStructureFactory.serialize_to_cache(root_block_structure, cache)
+    return root_block_structure
+
+
 def clear_block_cache(cache, root_block_usage_key):
     """
     Removes the block structure associated with the given root block
@@ -514,12 +514,15 @@ class BlockStructureBlockData(BlockStructure):
 
     def _add_transformer(self, transformer):
         """
-        Adds the given transformer to the block structure by recording
-        its current version number.
+        Adds the given transformer, and the transformers it depends on
+        for its collected data, to the block structure by recording
+        their current version numbers.
         """
         if transformer.VERSION == 0:
             raise TransformerException('VERSION attribute is not set on transformer {0}.', transformer.name())
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.VERSION)
+        for dependency in transformer.COLLECT_DEPENDENCIES:
+            self._add_transformer(dependency)
 
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
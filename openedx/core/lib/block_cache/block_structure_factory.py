@@ -4,9 +4,8 @@ Module for factory class for BlockStructure objects.
 # pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
-
-from .block_structure import BlockStructureBlockData, BlockStructureModulestoreData
+from .block_structure import BlockStructureModulestoreData
+from .block_structure_serializer import BlockStructureSerializer
 
 
 logger = getLogger(__name__)  # pylint: disable=C0103
@@ -67,12 +66,20 @@ class BlockStructureFactory(object):
     @classmethod
     def serialize_to_cache(cls, block_structure, cache):
         """
-        Store a compressed and pickled serialization of the given
-        block structure into the given cache.
+        Store a compact serialization of the given block structure
+        into the given cache.
+
+        The structure's block relations and xBlock fields are stored
+        under the key 'root.key.<root_block_usage_key>'.  Each
+        transformer's collected data is stored separately under the key
+        'transformer.data.<transformer_name>.<collection_id>.<root_block_usage_key>',
+        so it can be loaded only when that transformer is requested.
+        All values use the versioned format of BlockStructureSerializer.
 
-        The key in the cache is 'root.key.<root_block_usage_key>'.
-        The data stored in the cache includes the structure's
-        block relations, transformer data, and block data.
+        The transformers' data is written to keys of its own collection
+        before the root key is updated, so readers keep loading any
+        previously cached block structure until it is replaced in a
+        single write.
 
         Arguments:
             block_structure (BlockStructure) - The block structure
@@ -82,20 +89,24 @@ class BlockStructureFactory(object):
                 cache into which cacheable data of the block structure
                 is to be serialized.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure._transformer_data,
-            block_structure._block_data_map
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
-        cache.set(
-            cls._encode_root_cache_key(block_structure.root_block_usage_key),
-            zp_data_to_cache
-        )
+        root_block_usage_key = block_structure.root_block_usage_key
+        serialized_structure, serialized_transformer_data = BlockStructureSerializer.serialize(block_structure)
+
+        collection_id = BlockStructureSerializer.get_collection_id(serialized_structure)
+        cache.set_many({
+            cls._encode_transformer_cache_key(root_block_usage_key, transformer_name, collection_id): serialized_data
+            for transformer_name, serialized_data in serialized_transformer_data.iteritems()
+        })
+        cache.set(cls._encode_root_cache_key(root_block_usage_key), serialized_structure)
+
         logger.debug(
-            "Wrote BlockStructure %s to cache, size: %s",
-            block_structure.root_block_usage_key,
-            len(zp_data_to_cache),
+            "Wrote BlockStructure %s to cache, size: %s, transformer data sizes: %s",
+            root_block_usage_key,
+            len(serialized_structure),
+            {
+                transformer_name: len(serialized_data)
+                for transformer_name, serialized_data in serialized_transformer_data.iteritems()
+            },
         )
 
     @classmethod
@@ -107,6 +118,10 @@ class BlockStructureFactory(object):
         The given root_block_usage_key must equate the root_block_usage_key
         previously passed to serialize_to_cache.
 
+        Only the collected data of the given transformers, and of the
+        transformers they depend on for their collected data, is
+        fetched and deserialized.
+
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
                 of the block structure that is to be deserialized from
@@ -118,20 +133,22 @@ class BlockStructureFactory(object):
 
             transformers ([BlockStructureTransformer]) - A list of
                 transformers for which the block structure will be
-                transformed.
+                transformed.  Data collected by other transformers, on
+                which they don't depend, is not loaded.
 
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found in the cache.
 
-            NoneType - If the root_block_usage_key is not found in the cache
+            NoneType - If the root_block_usage_key is not found in the cache,
+            if the cached data was serialized in an outdated format,
             or if the cached data is outdated for one or more of the
             given transformers.
         """
 
         # Find root_block_usage_key in the cache.
-        zp_data_from_cache = cache.get(cls._encode_root_cache_key(root_block_usage_key))
-        if not zp_data_from_cache:
+        serialized_structure = cache.get(cls._encode_root_cache_key(root_block_usage_key))
+        if not serialized_structure:
             logger.debug(
                 "BlockStructure %r not found in the cache.",
                 root_block_usage_key,
@@ -141,15 +158,44 @@ class BlockStructureFactory(object):
             logger.debug(
                 "Read BlockStructure %r from cache, size: %s",
                 root_block_usage_key,
-                len(zp_data_from_cache),
+                len(serialized_structure),
+            )
+
+        # Verify that the block structure was cached with the latest
+        # version of the serialization format.
+        cached_serialization_version = BlockStructureSerializer.get_version(serialized_structure)
+        if cached_serialization_version != BlockStructureSerializer.VERSION:
+            logger.info(
+                "BlockStructure %r was cached with serialization version %s, expected %s.",
+                root_block_usage_key,
+                cached_serialization_version,
+                BlockStructureSerializer.VERSION,
             )
+            return None
 
-        # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
-        block_structure = BlockStructureBlockData(root_block_usage_key)
-        block_structure._block_relations = block_relations
-        block_structure._transformer_data = transformer_data
-        block_structure._block_data_map = block_data_map
+        # Find the data of the requested transformers and of their
+        # dependencies, of the same collection, in the cache.
+        transformers = cls._with_collect_dependencies(transformers)
+        collection_id = BlockStructureSerializer.get_collection_id(serialized_structure)
+        transformer_cache_keys = {
+            cls._encode_transformer_cache_key(root_block_usage_key, transformer.name(), collection_id):
+            transformer.name()
+            for transformer in transformers
+        }
+        data_from_cache = cache.get_many(transformer_cache_keys.keys())
+
+        # Deserialize and construct the block structure.  Transformers
+        # whose data is not in the cache are reported as outdated below.
+        serialized_transformer_data = {
+            transformer_name: data_from_cache[cache_key]
+            for cache_key, transformer_name in transformer_cache_keys.iteritems()
+            if cache_key in data_from_cache
+        }
+        block_structure = BlockStructureSerializer.deserialize(
+            serialized_structure, serialized_transformer_data, root_block_usage_key
+        )
+        if block_structure is None:
+            return None
 
         # Verify that the cached data for all the given transformers are
         # for their latest versions.
@@ -170,6 +216,23 @@ class BlockStructureFactory(object):
 
         return block_structure
 
+    @classmethod
+    def _with_collect_dependencies(cls, transformers):
+        """
+        Returns the given transformers followed by all the transformers
+        they depend on for their collected data, each listed once.
+        """
+        all_transformers = []
+        names = set()
+        pending = list(transformers)
+        while pending:
+            transformer = pending.pop(0)
+            if transformer.name() not in names:
+                names.add(transformer.name())
+                all_transformers.append(transformer)
+                pending.extend(transformer.COLLECT_DEPENDENCIES)
+        return all_transformers
+
     @classmethod
     def remove_from_cache(cls, root_block_usage_key, cache):
         """
@@ -185,8 +248,9 @@ class BlockStructureFactory(object):
                 cache from which the block structure is to be
                 removed.
         """
+        # The transformers' data is left to expire, since it is never
+        # used without the structure stored under the root key.
         cache.delete(cls._encode_root_cache_key(root_block_usage_key))
-        # TODO also remove all block data?
 
     @classmethod
     def _encode_root_cache_key(cls, root_block_usage_key):
@@ -195,3 +259,12 @@ class BlockStructureFactory(object):
         for the given root_block_usage_key.
         """
         return "root.key." + unicode(root_block_usage_key)
+
+    @classmethod
+    def _encode_transformer_cache_key(cls, root_block_usage_key, transformer_name, collection_id):
+        """
+        Returns the cache key to use for storing the given
+        transformer's collected data from the given collection of the
+        block structure for the given root_block_usage_key.
+        """
+        return u"transformer.data.{}.{}.{}".format(transformer_name, collection_id, unicode(root_block_usage_key))
@@ -0,0 +1,288 @@
+"""
+Module for the compact, versioned serialization format of
+BlockStructure objects stored in the cache.
+
+The format interns every usage key in the structure to an integer id
+and stores:
+    * The block relations as flat arrays of ids, with an offsets array
+      per direction (children and parents) indexed by block id.
+    * The collected xBlock fields and the block-specific transformer
+      data column-wise, as a pair of (block ids, values) per field,
+      instead of as one dict per block.
+
+The data is split into separately serialized chunks: one for the
+structure itself (block keys, relations and xBlock fields) and one per
+transformer (its transformer-wide data and its block-specific data), so
+that callers need to fetch and decode only the transformers they use.
+
+Each serialized chunk starts with an uncompressed header carrying a
+magic marker, the schema version and the id of the collection the chunk
+was written by.  Data written by an older (or newer) version of the
+code is detected and rejected without decompressing or unpickling the
+rest of the payload, and chunks from different collections are never
+mixed.
+"""
+# pylint: disable=protected-access
+from array import array
+from collections import defaultdict
+from itertools import izip
+from logging import getLogger
+import struct
+from uuid import uuid4
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .block_structure import BlockStructureBlockData, _BlockRelations
+
+
+logger = getLogger(__name__)  # pylint: disable=invalid-name
+
+
+class BlockStructureSerializer(object):
+    """
+    Serializes and deserializes the cacheable data of a
+    BlockStructureBlockData to and from compact byte strings.
+    """
+    # Increment whenever the layout of the serialized payload changes.
+    VERSION = 3
+
+    # Marker that distinguishes this format from other cached values,
+    # such as the zpickled tuples written by earlier releases.
+    MAGIC = 'BS'
+
+    # Header: magic marker, unsigned short version, and hex collection
+    # id.  The magic marker and version are kept as the leading bytes
+    # of every version of the format.
+    VERSION_HEADER = struct.Struct('!2sH')
+    HEADER = struct.Struct('!2sH32s')
+
+    # Typecode of the arrays used to store block ids and offsets.
+    ID_TYPECODE = 'i'
+
+    @classmethod
+    def serialize(cls, block_structure):
+        """
+        Serializes the given block structure.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - The block
+                structure that is to be serialized.
+
+        Returns:
+            (str, {string: str}) - The serialized block relations and
+                xBlock fields of the structure, and a map of each
+                transformer's name to its serialized transformer data.
+        """
+        collection_id = uuid4().hex
+        block_keys, block_ids, num_blocks = cls._intern_block_keys(block_structure)
+
+        children_offsets, children_ids = cls._flatten_relations(
+            block_keys[:num_blocks], block_ids, block_structure._block_relations, 'children'
+        )
+        parents_offsets, parents_ids = cls._flatten_relations(
+            block_keys[:num_blocks], block_ids, block_structure._block_relations, 'parents'
+        )
+
+        xblock_field_columns = defaultdict(lambda: (array(cls.ID_TYPECODE), []))
+        transformer_block_columns = defaultdict(
+            lambda: defaultdict(lambda: (array(cls.ID_TYPECODE), []))
+        )
+        for usage_key, block_data in block_structure._block_data_map.iteritems():
+            block_id = block_ids[usage_key]
+            for field_name, value in block_data.xblock_fields.iteritems():
+                cls._append_to_column(xblock_field_columns[field_name], block_id, value)
+            for transformer_name, transformer_block_data in block_data.transformer_data.iteritems():
+                for key, value in transformer_block_data.iteritems():
+                    cls._append_to_column(
+                        transformer_block_columns[transformer_name][key], block_id, value
+                    )
+
+        serialized_structure = cls._dumps(collection_id, (
+            block_keys,
+            num_blocks,
+            children_offsets,
+            children_ids,
+            parents_offsets,
+            parents_ids,
+            dict(xblock_field_columns),
+        ))
+
+        transformer_names = set(block_structure._transformer_data) | set(transformer_block_columns)
+        serialized_transformer_data = {
+            transformer_name: cls._dumps(collection_id, (
+                block_structure._transformer_data.get(transformer_name, {}),
+                dict(transformer_block_columns.get(transformer_name, {})),
+            ))
+            for transformer_name in transformer_names
+        }
+        return serialized_structure, serialized_transformer_data
+
+    @classmethod
+    def deserialize(cls, serialized_structure, serialized_transformer_data, root_block_usage_key):
+        """
+        Returns a BlockStructureBlockData rooted at the given
+        root_block_usage_key, constructed from the given serialized
+        structure and only the given transformers' serialized data.
+        Returns None if any of the serialized data was not written by
+        the current version of this serializer or by the same call to
+        serialize.
+
+        Arguments:
+            serialized_structure (str) - The serialized structure
+                previously returned by serialize.
+
+            serialized_transformer_data ({string: str}) - A map of
+                transformer names to serialized transformer data
+                previously returned by serialize, for the transformers
+                whose data is to be loaded.
+
+            root_block_usage_key (UsageKey) - The usage_key for the
+                root of the block structure.
+        """
+        structure_payload = cls._loads(serialized_structure, root_block_usage_key)
+        if structure_payload is None:
+            return None
+        collection_id = cls.get_collection_id(serialized_structure)
+        (
+            block_keys,
+            num_blocks,
+            children_offsets,
+            children_ids,
+            parents_offsets,
+            parents_ids,
+            xblock_field_columns,
+        ) = structure_payload
+
+        transformer_payloads = {}
+        for transformer_name, serialized_data in serialized_transformer_data.iteritems():
+            transformer_payload = cls._loads(serialized_data, root_block_usage_key)
+            if transformer_payload is None:
+                return None
+            if cls.get_collection_id(serialized_data) != collection_id:
+                logger.info(
+                    "Serialized data of transformer %s for BlockStructure %r is from another collection.",
+                    transformer_name,
+                    root_block_usage_key,
+                )
+                return None
+            transformer_payloads[transformer_name] = transformer_payload
+
+        block_structure = BlockStructureBlockData(root_block_usage_key)
+
+        # Resolve the flat id arrays to usage keys once, so that each
+        # block's relations are a plain list slice.
+        children_keys = [block_keys[block_id] for block_id in children_ids]
+        parents_keys = [block_keys[block_id] for block_id in parents_ids]
+        block_relations = defaultdict(_BlockRelations)
+        for block_id in xrange(num_blocks):
+            relations = block_relations[block_keys[block_id]]
+            relations.children = children_keys[children_offsets[block_id]:children_offsets[block_id + 1]]
+            relations.parents = parents_keys[parents_offsets[block_id]:parents_offsets[block_id + 1]]
+        block_structure._block_relations = block_relations
+
+        block_data_map = block_structure._block_data_map
+        for field_name, (column_ids, values) in xblock_field_columns.iteritems():
+            for block_id, value in izip(column_ids, values):
+                block_data_map[block_keys[block_id]].xblock_fields[field_name] = value
+
+        for transformer_name, (transformer_data, block_columns) in transformer_payloads.iteritems():
+            block_structure._transformer_data[transformer_name] = transformer_data
+            for key, (column_ids, values) in block_columns.iteritems():
+                for block_id, value in izip(column_ids, values):
+                    block_data_map[block_keys[block_id]].transformer_data[transformer_name][key] = value
+
+        return block_structure
+
+    @classmethod
+    def get_version(cls, serialized_data):
+        """
+        Returns the schema version recorded in the header of the given
+        serialized string, or None if the string is not in this format.
+        """
+        if len(serialized_data) < cls.VERSION_HEADER.size:
+            return None
+        magic, version = cls.VERSION_HEADER.unpack_from(serialized_data)
+        return version if magic == cls.MAGIC else None
+
+    @classmethod
+    def get_collection_id(cls, serialized_data):
+        """
+        Returns the id of the collection recorded in the header of the
+        given serialized string, which must be of the current version.
+        All the chunks returned by a single call to serialize share
+        the same collection id.
+        """
+        return cls.HEADER.unpack_from(serialized_data)[2]
+
+    @classmethod
+    def _dumps(cls, collection_id, payload):
+        """
+        Returns the given payload compressed and pickled, prefixed with
+        the header for the current version and the given collection id.
+        """
+        return cls.HEADER.pack(cls.MAGIC, cls.VERSION, collection_id) + zpickle(payload)
+
+    @classmethod
+    def _loads(cls, serialized_data, root_block_usage_key):
+        """
+        Returns the payload of the given serialized string, or None if
+        it was not written by the current version of this serializer.
+        """
+        version = cls.get_version(serialized_data)
+        if version != cls.VERSION:
+            logger.info(
+                "Serialized BlockStructure %r has version %s, expected %s.",
+                root_block_usage_key,
+                version,
+                cls.VERSION,
+            )
+            return None
+        return zunpickle(serialized_data[cls.HEADER.size:])
+
+    @classmethod
+    def _intern_block_keys(cls, block_structure):
+        """
+        Returns a list of all the usage keys in the given block
+        structure, a map of each usage key to its index in that list,
+        and the number of keys that are blocks of the structure.
+
+        The root comes first, followed by the remaining blocks of the
+        structure and then by any keys that only have block data.
+        """
+        block_keys = [block_structure.root_block_usage_key]
+        block_ids = {block_structure.root_block_usage_key: 0}
+        for usage_key in block_structure._block_relations:
+            if usage_key not in block_ids:
+                block_ids[usage_key] = len(block_keys)
+                block_keys.append(usage_key)
+        num_blocks = len(block_keys)
+        for usage_key in block_structure._block_data_map:
+            if usage_key not in block_ids:
+                block_ids[usage_key] = len(block_keys)
+                block_keys.append(usage_key)
+        return block_keys, block_ids, num_blocks
+
+    @classmethod
+    def _flatten_relations(cls, block_keys, block_ids, block_relations, relation_name):
+        """
+        Returns a pair of arrays (offsets, ids) for the given relation
+        ('children' or 'parents') such that the related ids of the block
+        with id N are ids[offsets[N]:offsets[N + 1]].
+        """
+        offsets = array(cls.ID_TYPECODE, [0])
+        related_ids = array(cls.ID_TYPECODE)
+        for usage_key in block_keys:
+            relations = block_relations[usage_key]
+            related_ids.extend(block_ids[related_key] for related_key in getattr(relations, relation_name))
+            offsets.append(len(related_ids))
+        return offsets, related_ids
+
+    @staticmethod
+    def _append_to_column(column, block_id, value):
+        """
+        Appends the given block_id and value to the given
+        (ids, values) column.
+        """
+        column_ids, values = column
+        column_ids.append(block_id)
+        values.append(value)
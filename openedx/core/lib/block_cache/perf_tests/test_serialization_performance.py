@@ -0,0 +1,108 @@
+"""
+Performance test comparing the compact BlockStructure serialization
+format against zpickling the block structure's internal dicts.
+
+Timings are recorded by CodeBlockTimer in its sqlite database, as
+"BlockStructureLoad:<course shape>:<format>".
+"""
+# pylint: disable=protected-access
+import unittest
+
+import ddt
+from nose.plugins.skip import SkipTest
+from opaque_keys.edx.locator import CourseLocator
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from ..block_structure import BlockStructureBlockData
+from ..block_structure_serializer import BlockStructureSerializer
+from ..tests.test_utils import MockTransformer
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of (chapters, sequentials per chapter, verticals per sequential,
+# problems per vertical) in the generated course structures.
+COURSE_SHAPES = (
+    (5, 5, 5, 2),
+    (20, 10, 5, 4),
+    (40, 10, 10, 4),
+)
+
+# Number of times each load is timed.
+LOAD_REPETITIONS = 10
+
+
+@ddt.ddt
+@unittest.skip
+class BlockStructureSerializationPerformance(unittest.TestCase):
+    """
+    Times loading and measures the size of a collected block structure
+    for both serialization formats.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def create_block_structure(self, shape):
+        """
+        Returns a collected block structure of a course with the given
+        shape, with the xBlock fields and transformer data typically
+        collected by the course_blocks transformers.
+        """
+        course_key = CourseLocator('PerfX', 'Serialization', 'Run')
+        root_key = course_key.make_usage_key('course', 'course')
+        block_structure = BlockStructureBlockData(root_key)
+        block_structure._add_transformer(MockTransformer)
+
+        def add_children(parent_key, block_types, counts):
+            """
+            Recursively adds generated children to the given parent.
+            """
+            if not block_types:
+                return
+            for index in range(counts[0]):
+                child_key = course_key.make_usage_key(
+                    block_types[0], '{}_{}'.format(parent_key.block_id, index)
+                )
+                block_structure._add_relation(parent_key, child_key)
+                block_data = block_structure._block_data_map[child_key]
+                block_data.xblock_fields['display_name'] = u'{} {}'.format(block_types[0], index)
+                block_data.xblock_fields['graded'] = bool(index % 2)
+                block_data.xblock_fields['format'] = 'Homework' if index % 2 else None
+                transformer_data = block_data.transformer_data[MockTransformer.name()]
+                transformer_data['merged_visible_to_staff_only'] = False
+                transformer_data['merged_start_date'] = None
+                add_children(child_key, block_types[1:], counts[1:])
+
+        add_children(root_key, ('chapter', 'sequential', 'vertical', 'problem'), shape)
+        return block_structure
+
+    @ddt.data(*COURSE_SHAPES)
+    def test_load_time_and_size(self, shape):
+        if CodeBlockTimer is None:
+            raise SkipTest("CodeBlockTimer undefined.")
+
+        block_structure = self.create_block_structure(shape)
+        root_key = block_structure.root_block_usage_key
+
+        zpickled_data = zpickle(
+            (block_structure._block_relations, block_structure._transformer_data, block_structure._block_data_map)
+        )
+        serialized_structure, serialized_transformer_data = BlockStructureSerializer.serialize(block_structure)
+        serialized_size = len(serialized_structure) + sum(len(data) for data in serialized_transformer_data.values())
+
+        desc = "BlockStructureLoad:{}".format('x'.join(str(count) for count in shape))
+        with CodeBlockTimer("{}:zpickle".format(desc)):
+            for __ in range(LOAD_REPETITIONS):
+                zunpickle(zpickled_data)
+
+        with CodeBlockTimer("{}:serializer".format(desc)):
+            for __ in range(LOAD_REPETITIONS):
+                BlockStructureSerializer.deserialize(serialized_structure, serialized_transformer_data, root_key)
+
+        self.assertLess(serialized_size, len(zpickled_data))
@@ -6,6 +6,7 @@ from mock import patch
 from unittest import TestCase
 
 from ..block_structure_factory import BlockStructureFactory
+from ..block_structure_serializer import BlockStructureSerializer
 from .test_utils import (
     MockCache, MockModulestoreFactory, MockTransformer, ChildrenMapTestMixin
 )
@@ -94,6 +95,84 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
         self.assert_block_structure(from_cache_block_structure, self.children_map)
         self.assertEquals(self.modulestore.get_items_call_count, 0)
 
+    def test_cache_subset_of_transformers(self):
+        cache = MockCache()
+
+        class OtherMockTransformer(MockTransformer):
+            """
+            A second transformer whose data is collected but not requested.
+            """
+            pass
+
+        self.transformers.append(OtherMockTransformer)
+
+        # collect transformer data for both transformers
+        self.add_transformers()
+        BlockStructureFactory.serialize_to_cache(self.block_structure, cache)
+
+        # re-create from cache for only the first transformer
+        with patch.object(cache, 'get_many', wraps=cache.get_many) as mock_get_many:
+            from_cache_block_structure = BlockStructureFactory.create_from_cache(
+                root_block_usage_key=0,
+                cache=cache,
+                transformers=[MockTransformer],
+            )
+        self.assertIsNotNone(from_cache_block_structure)
+        self.assertEquals(len(mock_get_many.call_args[0][0]), 1)
+        self.assertEquals(
+            from_cache_block_structure.get_transformer_block_field(0, MockTransformer, 'test'),
+            'MockTransformer val',
+        )
+        self.assertIsNone(
+            from_cache_block_structure.get_transformer_block_field(0, OtherMockTransformer, 'test')
+        )
+
+    def test_cache_collect_dependencies(self):
+        cache = MockCache()
+
+        class DependencyMockTransformer(MockTransformer):
+            """
+            A transformer whose data is collected and read by another transformer.
+            """
+            pass
+
+        class CompositeMockTransformer(MockTransformer):
+            """
+            A transformer that depends on the data of another transformer.
+            """
+            COLLECT_DEPENDENCIES = (DependencyMockTransformer,)
+
+        self.transformers = [CompositeMockTransformer, DependencyMockTransformer]
+        self.add_transformers()
+        BlockStructureFactory.serialize_to_cache(self.block_structure, cache)
+
+        # the dependency's data is loaded along with the requested transformer's
+        from_cache_block_structure = BlockStructureFactory.create_from_cache(
+            root_block_usage_key=0,
+            cache=cache,
+            transformers=[CompositeMockTransformer],
+        )
+        self.assertIsNotNone(from_cache_block_structure)
+        self.assertEquals(
+            from_cache_block_structure.get_transformer_block_field(0, DependencyMockTransformer, 'test'),
+            'DependencyMockTransformer val',
+        )
+
+        # and the block structure is outdated without the dependency's data
+        dependency_cache_key = BlockStructureFactory._encode_transformer_cache_key(
+            0, DependencyMockTransformer.name(), BlockStructureSerializer.get_collection_id(
+                cache.get(BlockStructureFactory._encode_root_cache_key(0))
+            )
+        )
+        cache.delete(dependency_cache_key)
+        self.assertIsNone(
+            BlockStructureFactory.create_from_cache(
+                root_block_usage_key=0,
+                cache=cache,
+                transformers=[CompositeMockTransformer],
+            )
+        )
+
     def test_remove_from_cache(self):
         cache = MockCache()
 
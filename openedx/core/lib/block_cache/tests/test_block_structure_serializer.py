@@ -0,0 +1,129 @@
+"""
+Tests for block_structure_serializer.py
+"""
+# pylint: disable=protected-access
+import ddt
+from unittest import TestCase
+
+from openedx.core.lib.cache_utils import zpickle
+
+from ..block_structure import BlockStructureBlockData
+from ..block_structure_serializer import BlockStructureSerializer
+from .test_utils import MockTransformer, ChildrenMapTestMixin
+
+
+@ddt.ddt
+class TestBlockStructureSerializer(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for BlockStructureSerializer
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        xBlock fields and transformer data set on each block.
+        """
+        block_structure = self.create_block_structure(BlockStructureBlockData, children_map)
+        block_structure._add_transformer(MockTransformer)
+        block_structure.set_transformer_data(MockTransformer, 'course_wide', 'value')
+        for block_key in range(len(children_map)):
+            block_structure._block_data_map[block_key].xblock_fields['display_name'] = 'Block {}'.format(block_key)
+            if block_key % 2:
+                block_structure._block_data_map[block_key].xblock_fields['graded'] = True
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'depth', block_key * 10)
+        return block_structure
+
+    def round_trip(self, block_structure):
+        """
+        Serializes the given block structure with all its transformer
+        data and returns the deserialized block structure.
+        """
+        serialized_structure, serialized_transformer_data = BlockStructureSerializer.serialize(block_structure)
+        return BlockStructureSerializer.deserialize(
+            serialized_structure, serialized_transformer_data, root_block_usage_key=0
+        )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+
+        deserialized = self.round_trip(block_structure)
+
+        self.assert_block_structure(deserialized, children_map)
+        for block_key in range(len(children_map)):
+            self.assertEquals(deserialized.get_children(block_key), block_structure.get_children(block_key))
+            self.assertEquals(deserialized.get_parents(block_key), block_structure.get_parents(block_key))
+            self.assertEquals(
+                deserialized.get_xblock_field(block_key, 'display_name'), 'Block {}'.format(block_key)
+            )
+            self.assertEquals(
+                deserialized.get_xblock_field(block_key, 'graded'), True if block_key % 2 else None
+            )
+            self.assertEquals(
+                deserialized.get_transformer_block_field(block_key, MockTransformer, 'depth'), block_key * 10
+            )
+        self.assertEquals(deserialized.get_transformer_data(MockTransformer, 'course_wide'), 'value')
+        self.assertEquals(deserialized._get_transformer_data_version(MockTransformer), MockTransformer.VERSION)
+
+    def test_block_data_without_relations(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.set_transformer_block_field(100, MockTransformer, 'orphan', True)
+
+        deserialized = self.round_trip(block_structure)
+
+        self.assertFalse(deserialized.has_block(100))
+        self.assertTrue(deserialized.get_transformer_block_field(100, MockTransformer, 'orphan'))
+
+    def test_subset_of_transformers(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+
+        serialized_structure, serialized_transformer_data = BlockStructureSerializer.serialize(block_structure)
+        self.assertEquals(serialized_transformer_data.keys(), [MockTransformer.name()])
+
+        deserialized = BlockStructureSerializer.deserialize(serialized_structure, {}, root_block_usage_key=0)
+        self.assert_block_structure(deserialized, self.SIMPLE_CHILDREN_MAP)
+        self.assertEquals(deserialized.get_xblock_field(1, 'display_name'), 'Block 1')
+        self.assertIsNone(deserialized.get_transformer_block_field(1, MockTransformer, 'depth'))
+        self.assertEquals(deserialized._get_transformer_data_version(MockTransformer), 0)
+
+    def test_mixed_collections(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_structure, _ = BlockStructureSerializer.serialize(block_structure)
+        _, serialized_transformer_data = BlockStructureSerializer.serialize(block_structure)
+
+        self.assertIsNone(
+            BlockStructureSerializer.deserialize(
+                serialized_structure, serialized_transformer_data, root_block_usage_key=0
+            )
+        )
+
+    def test_version(self):
+        serialized_structure, serialized_transformer_data = BlockStructureSerializer.serialize(
+            self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        )
+        self.assertEquals(
+            BlockStructureSerializer.get_version(serialized_structure), BlockStructureSerializer.VERSION
+        )
+
+        outdated_structure = (
+            BlockStructureSerializer.VERSION_HEADER.pack(
+                BlockStructureSerializer.MAGIC, BlockStructureSerializer.VERSION + 1
+            ) +
+            serialized_structure[BlockStructureSerializer.VERSION_HEADER.size:]
+        )
+        self.assertIsNone(
+            BlockStructureSerializer.deserialize(
+                outdated_structure, serialized_transformer_data, root_block_usage_key=0
+            )
+        )
+
+    def test_unversioned_data(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        legacy_data = zpickle(
+            (block_structure._block_relations, block_structure._transformer_data, block_structure._block_data_map)
+        )
+        self.assertIsNone(BlockStructureSerializer.get_version(legacy_data))
+        self.assertIsNone(BlockStructureSerializer.deserialize(legacy_data, {}, root_block_usage_key=0))
@@ -28,6 +28,13 @@ class BlockStructureTransformer(object):
     #
     VERSION = 0
 
+    # Transformers whose collect methods are called from this
+    # transformer's collect method, and whose collected data is read by
+    # its transform method.  Their collected data is stored under their
+    # own names, along with their own versions, and is loaded from the
+    # cache whenever this transformer is requested.
+    COLLECT_DEPENDENCIES = ()
+
     @classmethod
     def name(cls):
         """